@@ -0,0 +1,240 @@
+#coding:utf8
+
+# Bancs d'essai des étapes coûteuses de chaque séance
+# Chaque banc déclare la séance, les tailles mesurées (nombre de lignes, de points ou de diagrammes)
+# et une fonction preparer(n, graine, dossier) qui construit les données hors chronométrage et
+# renvoie la fonction à chronométrer. Le code mesuré est celui des séances (modules de src/, et
+# fonctions de main.py pour les scripts sans module).
+
+import os
+import sys
+import ast
+import types
+
+import numpy as np
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEANCES = ["seance-02", "seance-03", "seance-04", "seance-05", "seance-06"]
+
+# Modules des séances et paquet commun : aucun nom de module n'est partagé entre deux séances
+sys.path.append(RACINE)
+for _seance in SEANCES:
+    sys.path.append(os.path.join(RACINE, _seance, "src"))
+
+import generateurs
+
+ECHELLE = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+# Fonction pour charger les fonctions d'un script main.py sans l'exécuter
+# Seuls les imports et les définitions de fonctions du script sont exécutés
+def fonctions_script(seance, *noms):
+    chemin = os.path.join(RACINE, seance, "src", "main.py")
+    with open(chemin, "r", encoding="utf-8") as fichier:
+        arbre = ast.parse(fichier.read(), chemin)
+    arbre.body = [n for n in arbre.body if isinstance(n, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+    module = types.ModuleType(f"{seance.replace('-', '_')}_main")
+    module.__file__ = chemin
+    exec(compile(arbre, chemin, "exec"), module.__dict__)
+    return [getattr(module, nom) for nom in noms]
+
+# Séance 02 - rendu des diagrammes en barres par département (tous les cœurs)
+def preparer_diagrammes(n, graine, dossier):
+    from rendu_graphiques import rendre_diagrammes
+    departements, _ = generateurs.resultats(n, graine)
+    codes = departements["Code du département"].to_numpy()
+    colonnes = [departements["Inscrits"].to_numpy(), departements["Votants"].to_numpy()]
+    return lambda: rendre_diagrammes("bar", codes, colonnes, dossier, workers=os.cpu_count() or 1)
+
+# Séances 02 et 03 - lecture typée du CSV des résultats (sans cache)
+def preparer_lecture_resultats(n, graine, dossier):
+    from donnees.resultats import lire_resultats
+    chemin = generateurs.csv_resultats(n, graine)
+    return lambda: lire_resultats(chemin)
+
+# Séances 02 et 03 - sommes, agrégats par département et voix par candidat, lecture par partitions
+def preparer_agregats(n, graine, dossier):
+    from donnees.blocs import agreger_resultats
+    chemin = generateurs.csv_resultats(n, graine)
+    return lambda: agreger_resultats(chemin, workers=os.cpu_count() or 1, taille_partition=8 * 2 ** 20)
+
+# Séance 03 - paramètres des étapes 5 et 7 de main.py (table en mémoire)
+def preparer_parametres(n, graine, dossier):
+    departements, _ = generateurs.resultats(n, graine)
+    num = departements[["Inscrits", "Votants", "Blancs", "Nuls", "Exprimés", "Abstentions"]].astype("float64")
+    def parametres():
+        num.mean(), num.median(), num.mode().iloc[0], num.std(ddof=0)
+        num.apply(lambda s: np.abs(s - s.mean()).mean())
+        num.max() - num.min()
+        num.quantile([0.10, 0.25, 0.75, 0.90])
+    return parametres
+
+# Séance 03 - paramètres en flux (MODE_FLUX=1), lecture du CSV bloc par bloc
+def preparer_flux(n, graine, dossier):
+    from statistiques_flux import accumuler_csv, parametres_statistiques
+    chemin = generateurs.csv_resultats(n, graine)
+    colonnes = ["Inscrits", "Votants", "Blancs", "Nuls", "Exprimés", "Abstentions"]
+    return lambda: parametres_statistiques(accumuler_csv(chemin, colonnes))
+
+# Séance 03 - paramètres des voix par candidat (table longue, n départements x 12 candidats)
+def preparer_groupes(n, graine, dossier):
+    from statistiques_groupes import parametres_par_groupe
+    candidats = generateurs.candidats_long(*generateurs.resultats(n, graine))
+    return lambda: parametres_par_groupe(candidats, ["Nom", "Prénom"], ["Voix"])
+
+# Séance 03 - export d'une table de n lignes (un banc par format)
+def preparateur_export(format_export):
+    def preparer(n, graine, dossier):
+        from export_tables import exporter
+        departements, _ = generateurs.resultats(n, graine)
+        return lambda: exporter(departements, os.path.join(dossier, "export"), [format_export], index=False)
+    return preparer
+
+# Séance 04 - évaluation vectorisée d'une loi sur une grille de n points (cache vidé à chaque appel)
+def preparateur_evaluation(nom, grille, *parametres):
+    def preparer(n, graine, dossier):
+        from evaluation_lois import evaluer, vider_cache
+        x = grille(n)
+        def evaluation():
+            vider_cache()
+            return evaluer(nom, x, *parametres)
+        return evaluation
+    return preparer
+
+# Séance 04 - balayage de 10 valeurs de lambda de la loi de Poisson sur n points
+def preparer_balayage(n, graine, dossier):
+    from evaluation_lois import balayage, vider_cache
+    k = np.arange(n, dtype=np.float64)
+    mus = np.linspace(0.5, 0.01 * n, 10)
+    def evaluation():
+        vider_cache()
+        return balayage("poisson", k, "mu", mus)
+    return evaluation
+
+# Séance 05 - intervalles de confiance de n échantillons (une méthode par banc)
+def preparateur_intervalles(methode):
+    def preparer(n, graine, dossier):
+        from intervalles import table_intervalles
+        comptes = generateurs.echantillons(n, graine)
+        return lambda: table_intervalles(comptes, niveau=0.95, methode=methode)
+    return preparer
+
+# Séance 05 - batterie de tests de normalité sur deux colonnes de n valeurs
+def preparer_normalite(n, graine, dossier):
+    from tests_normalite import batterie_normalite
+    tests = generateurs.loi_normale(n, graine)
+    return lambda: batterie_normalite(tests, workers=1, graine=graine)
+
+# Séance 05 - intervalles bootstrap BCa (10^5 rééchantillons) des fréquences de n réponses
+def preparer_bootstrap_frequences(n, graine, dossier):
+    from donnees.reechantillonnage import intervalle_bootstrap
+    reponses = generateurs.reponses(n, graine)
+    return lambda: intervalle_bootstrap(reponses, "frequences", nb_reechantillons=10 ** 5, graine=graine)
+
+# Séance 05 - intervalle bootstrap BCa (10^3 rééchantillons) de la médiane de n valeurs continues
+def preparer_bootstrap_mediane(n, graine, dossier):
+    from donnees.reechantillonnage import intervalle_bootstrap
+    valeurs = generateurs.loi_normale(n, graine)["Test 1"].to_numpy()
+    return lambda: intervalle_bootstrap(valeurs, "mediane", nb_reechantillons=10 ** 3, graine=graine)
+
+# Séance 03 - classes de surfaces des îles (bords fixes, comptage par blocs de donnees/histogrammes.py)
+def preparer_classes_surfaces(n, graine, dossier):
+    from donnees.histogrammes import histogramme_tableau
+    valeurs = generateurs.surfaces(n, graine)
+    bords = [0, 10, 25, 50, 100, 2500, 5000, 10000, np.inf]
+    return lambda: histogramme_tableau(valeurs, bords, droite=True)
+
+# Séance 06 - ordrePopulation (tri de listes [valeur, nom]) sur n États
+def preparer_ordre_population(n, graine, dossier):
+    ordrePopulation, = fonctions_script("seance-06", "ordrePopulation")
+    monde = generateurs.etats_du_monde(n, graine)
+    pop, etats = list(monde["Pop 2007"]), list(monde["État"])
+    return lambda: ordrePopulation(pop, etats)
+
+# Séance 06 - 10 plus grandes surfaces parmi n (argpartition, sans tri complet)
+def preparer_top_k(n, graine, dossier):
+    from classements import top_k
+    valeurs = generateurs.surfaces(n, graine)
+    return lambda: top_k(valeurs, 10)
+
+# Séance 06 - rangs moyens (ex aequo) de n valeurs avec valeurs manquantes, en un appel
+def preparer_rangs(n, graine, dossier):
+    from classements import rangs
+    valeurs = generateurs.etats_du_monde(n, graine)["Pop 2007"].to_numpy()
+    return lambda: rangs(valeurs, "moyen")
+
+# Séance 06 - classementPays entre deux classements de n États
+def preparer_classement_pays(n, graine, dossier):
+    ordrePopulation, classementPays = fonctions_script("seance-06", "ordrePopulation", "classementPays")
+    monde = generateurs.etats_du_monde(n, graine, taux_manquants=0)
+    ordre1 = ordrePopulation(list(monde["Pop 2007"]), list(monde["État"]))
+    ordre2 = ordrePopulation(list(monde["Densité 2025"]), list(monde["État"]))
+    return lambda: classementPays(ordre1, ordre2)
+
+# Séance 06 - classements Pop 2007 ... 2025 joints par code ISO
+def preparer_comparer_classements(n, graine, dossier):
+    from classements import comparer_classements
+    monde = generateurs.etats_du_monde(n, graine)
+    colonnes = [c for c in monde.columns if c.startswith("Pop ")]
+    return lambda: comparer_classements(monde, "Code ISO_3", colonnes)
+
+# Séance 06 - matrices de corrélation de rangs 38 x 38 (Pop et Densité 2007 ... 2025)
+def preparateur_correlations(methode):
+    def preparer(n, graine, dossier):
+        from correlations_rangs import correlations_panel
+        monde = generateurs.etats_du_monde(n, graine)
+        colonnes = [c for c in monde.columns if c.startswith("Pop ") or c.startswith("Densité ")]
+        return lambda: correlations_panel(monde, colonnes, methodes=(methode,), workers=os.cpu_count() or 1)
+    return preparer
+
+# Séance 06 - p-valeur par permutations (10^4) du rho de Spearman Pop 2007 / Densité 2007 sur n États
+def preparer_permutation_spearman(n, graine, dossier):
+    from donnees.reechantillonnage import permutation_correlation
+    monde = generateurs.etats_du_monde(n, graine)
+    x, y = monde["Pop 2007"].to_numpy(), monde["Densité 2007"].to_numpy()
+    return lambda: permutation_correlation(x, y, "spearman", 10 ** 4, graine=graine)
+
+# Séance 06 - ajustement de la loi rang-taille (MCO, Gabaix-Ibragimov, Huber, Clauset) sur n surfaces
+def preparer_rang_taille(n, graine, dossier):
+    from rang_taille import ajuster_rang_taille
+    valeurs = generateurs.surfaces(n, graine)
+    return lambda: ajuster_rang_taille(valeurs)
+
+# nom -> séance, tailles mesurées, préparation
+BANCS = {
+    "diagrammes_barres": {"seance": "seance-02", "tailles": [10 ** 2, 10 ** 3], "preparer": preparer_diagrammes},
+    "lecture_resultats": {"seance": "seance-02", "tailles": ECHELLE[:4], "preparer": preparer_lecture_resultats},
+    "agregats_resultats": {"seance": "seance-02", "tailles": ECHELLE[:4], "preparer": preparer_agregats},
+    "parametres": {"seance": "seance-03", "tailles": ECHELLE, "preparer": preparer_parametres},
+    "parametres_flux": {"seance": "seance-03", "tailles": ECHELLE[:4], "preparer": preparer_flux},
+    "parametres_par_candidat": {"seance": "seance-03", "tailles": ECHELLE[:4], "preparer": preparer_groupes},
+    "export_csv": {"seance": "seance-03", "tailles": ECHELLE[:4], "preparer": preparateur_export("csv")},
+    "export_xlsx": {"seance": "seance-03", "tailles": ECHELLE[:3], "preparer": preparateur_export("xlsx")},
+    "export_parquet": {"seance": "seance-03", "tailles": ECHELLE, "preparer": preparateur_export("parquet")},
+    "classes_surfaces": {"seance": "seance-03", "tailles": ECHELLE, "preparer": preparer_classes_surfaces},
+    "pdf_lognormale": {"seance": "seance-04", "tailles": ECHELLE,
+                       "preparer": preparateur_evaluation("lognorm", lambda n: np.linspace(0.01, 10, n), 0.6)},
+    "pdf_gamma": {"seance": "seance-04", "tailles": ECHELLE,
+                  "preparer": preparateur_evaluation("gamma", lambda n: np.linspace(0.01, 10, n), 2.0)},
+    "pmf_zipf_mandelbrot": {"seance": "seance-04", "tailles": ECHELLE,
+                            "preparer": preparateur_evaluation("zipf_mandelbrot",
+                                                               lambda n: np.arange(1, n + 1, dtype=np.float64),
+                                                               1.5, 1.0, 10 ** 7)},
+    "pmf_poisson_balayage": {"seance": "seance-04", "tailles": ECHELLE[:4], "preparer": preparer_balayage},
+    "intervalles_wald": {"seance": "seance-05", "tailles": ECHELLE, "preparer": preparateur_intervalles("wald")},
+    "intervalles_wilson": {"seance": "seance-05", "tailles": ECHELLE, "preparer": preparateur_intervalles("wilson")},
+    "intervalles_clopper_pearson": {"seance": "seance-05", "tailles": ECHELLE,
+                                    "preparer": preparateur_intervalles("clopper_pearson")},
+    "normalite": {"seance": "seance-05", "tailles": ECHELLE, "preparer": preparer_normalite},
+    "bootstrap_frequences": {"seance": "seance-05", "tailles": ECHELLE, "preparer": preparer_bootstrap_frequences},
+    "bootstrap_mediane": {"seance": "seance-05", "tailles": ECHELLE[:3], "preparer": preparer_bootstrap_mediane},
+    "ordre_population": {"seance": "seance-06", "tailles": ECHELLE[:4], "preparer": preparer_ordre_population},
+    "top_k": {"seance": "seance-06", "tailles": ECHELLE, "preparer": preparer_top_k},
+    "rangs": {"seance": "seance-06", "tailles": ECHELLE[:4], "preparer": preparer_rangs},
+    "classement_pays": {"seance": "seance-06", "tailles": ECHELLE[:4], "preparer": preparer_classement_pays},
+    "comparer_classements": {"seance": "seance-06", "tailles": ECHELLE[:4], "preparer": preparer_comparer_classements},
+    "spearman_panel": {"seance": "seance-06", "tailles": ECHELLE[:4], "preparer": preparateur_correlations("spearman")},
+    "kendall_panel": {"seance": "seance-06", "tailles": ECHELLE[:3], "preparer": preparateur_correlations("kendall")},
+    "permutation_spearman": {"seance": "seance-06", "tailles": ECHELLE[:3],
+                             "preparer": preparer_permutation_spearman},
+    "rang_taille": {"seance": "seance-06", "tailles": ECHELLE, "preparer": preparer_rang_taille},
+}
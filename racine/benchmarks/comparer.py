@@ -0,0 +1,42 @@
+#coding:utf8
+
+# Comparaison de deux exécutions des bancs d'essai (fichiers JSON de resultats/)
+# python comparer.py [reference.json nouveau.json] : par défaut, les deux exécutions les plus récentes
+# Rapport des durées minimales pour chaque banc et chaque taille mesurés dans les deux exécutions ;
+# un rapport supérieur à SEUIL_REGRESSION (1.2 par défaut) est signalé comme régression.
+
+import os
+import sys
+import json
+
+from main import DOSSIER_RESULTATS
+
+SEUIL_REGRESSION = float(os.environ.get("SEUIL_REGRESSION", 1.2))
+
+def lire_execution(chemin):
+    with open(chemin, "r", encoding="utf-8") as fichier:
+        execution = json.load(fichier)
+    return execution, {(m["banc"], m["taille"]): m["min"] for m in execution["mesures"]}
+
+# Fonction pour les deux exécutions les plus récentes (noms de fichiers horodatés)
+def dernieres_executions():
+    fichiers = sorted(f for f in os.listdir(DOSSIER_RESULTATS) if f.endswith(".json"))
+    if len(fichiers) < 2:
+        raise FileNotFoundError(f"Il faut au moins deux exécutions dans {DOSSIER_RESULTATS}")
+    return [os.path.join(DOSSIER_RESULTATS, f) for f in fichiers[-2:]]
+
+if __name__ == "__main__":
+    chemins = sys.argv[1:3] if len(sys.argv) >= 3 else dernieres_executions()
+    (reference, mesures_reference), (nouveau, mesures_nouveau) = [lire_execution(c) for c in chemins]
+    print(f"Référence : {reference['commit']} ({reference['date']})")
+    print(f"Nouveau   : {nouveau['commit']} ({nouveau['date']})\n")
+    regressions = 0
+    for cle in sorted(set(mesures_reference) & set(mesures_nouveau)):
+        rapport = mesures_nouveau[cle] / mesures_reference[cle] if mesures_reference[cle] > 0 else float("inf")
+        signal = "régression" if rapport > SEUIL_REGRESSION else ("gain" if rapport < 1 / SEUIL_REGRESSION else "")
+        regressions += signal == "régression"
+        banc, taille = cle
+        print(f"{banc:28} n={taille:>9} {mesures_reference[cle]:9.4f} s -> {mesures_nouveau[cle]:9.4f} s "
+              f"x{rapport:5.2f} {signal}")
+    print(f"\n{regressions} régression(s) au-delà de x{SEUIL_REGRESSION:g}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,113 @@
+#coding:utf8
+
+# Générateurs de données synthétiques (graine fixée) reproduisant la structure des fichiers des séances
+# à n'importe quelle taille (10^3 à 10^7 lignes) :
+# - resultats : élection présidentielle, une ligne par "département" (séances 02 et 03)
+# - etats_du_monde : Pop / Densité 2007 ... 2025 par État, avec valeurs manquantes (séance 06)
+# - echantillons : comptes Pour / Contre / Sans opinion d'échantillons de taille 1000 (séance 05)
+# - loi_normale : colonnes de tests de normalité, l'une normale, l'autre non (séance 05)
+# - surfaces : surfaces d'îles à queue lourde (séances 03 et 06)
+# Les fichiers CSV générés sont conservés dans benchmarks/cache/ et réutilisés d'une exécution à l'autre.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from donnees.resultats import COLONNES_DEPARTEMENT, COLONNES_COMPTES, COLONNES_CANDIDAT
+from donnees.registre import ANNEES_MONDE
+
+DOSSIER_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+CANDIDATS = [
+    ("M", "ARTHAUD", "Nathalie"), ("M", "ROUSSEL", "Fabien"), ("M", "MACRON", "Emmanuel"),
+    ("M", "LASSALLE", "Jean"), ("F", "LE PEN", "Marine"), ("M", "ZEMMOUR", "Éric"),
+    ("M", "MÉLENCHON", "Jean-Luc"), ("F", "HIDALGO", "Anne"), ("M", "JADOT", "Yannick"),
+    ("F", "PÉCRESSE", "Valérie"), ("M", "POUTOU", "Philippe"), ("M", "DUPONT-AIGNAN", "Nicolas"),
+]
+PARTS_CANDIDATS = np.array([0.6, 2.3, 27.9, 3.1, 23.2, 7.1, 22.0, 1.7, 4.6, 4.8, 0.8, 2.1])
+
+POPULATION_MERE = np.array([852, 911, 422])
+
+def generateur(graine, *cles):
+    return np.random.default_rng([graine, *cles])
+
+# Fonction pour les résultats électoraux : (departements, voix) ; voix de forme (n, nb_candidats)
+# Les comptes respectent Votants = Inscrits - Abstentions et Exprimés = Votants - Blancs - Nuls
+def resultats(n, graine=0):
+    g = generateur(graine, 1)
+    inscrits = np.maximum(g.lognormal(12.5, 0.8, n).astype(np.int64), 100)
+    votants = g.binomial(inscrits, 0.74)
+    blancs = g.binomial(votants, 0.012)
+    nuls = g.binomial(votants - blancs, 0.005)
+    exprimes = votants - blancs - nuls
+    voix = g.multinomial(exprimes, PARTS_CANDIDATS / PARTS_CANDIDATS.sum())
+    departements = pd.DataFrame({
+        "Code du département": [f"{i:07d}" for i in range(n)],
+        "Libellé du département": [f"Département {i}" for i in range(n)],
+        "Inscrits": inscrits, "Abstentions": inscrits - votants, "Votants": votants,
+        "Blancs": blancs, "Nuls": nuls, "Exprimés": exprimes,
+    })
+    return departements, voix
+
+# Table longue des voix par candidat (format de la table "candidats" du jeu resultats_2022)
+def candidats_long(departements, voix):
+    n, k = voix.shape
+    return pd.DataFrame({
+        "Code du département": np.repeat(departements["Code du département"].to_numpy(), k),
+        "Sexe": np.tile([c[0] for c in CANDIDATS], n),
+        "Nom": np.tile([c[1] for c in CANDIDATS], n),
+        "Prénom": np.tile([c[2] for c in CANDIDATS], n),
+        "Voix": voix.ravel(),
+    })
+
+# Fonction pour écrire (une seule fois) le CSV large des résultats, au format du fichier d'origine
+def csv_resultats(n, graine=0):
+    chemin = os.path.join(DOSSIER_CACHE, f"resultats-{n}-{graine}.csv")
+    if os.path.exists(chemin):
+        return chemin
+    os.makedirs(DOSSIER_CACHE, exist_ok=True)
+    departements, voix = resultats(n, graine)
+    colonnes = {}
+    for i, (sexe, nom, prenom) in enumerate(CANDIDATS):
+        colonnes.update({f"Sexe_{i}": sexe, f"Nom_{i}": nom, f"Prénom_{i}": prenom, f"Voix_{i}": voix[:, i]})
+    large = pd.concat([departements, pd.DataFrame(colonnes, index=departements.index)], axis=1)
+    entete = COLONNES_DEPARTEMENT + COLONNES_COMPTES + COLONNES_CANDIDAT * len(CANDIDATS)
+    large.to_csv(chemin + ".tmp", index=False, header=entete, encoding="utf-8")
+    os.replace(chemin + ".tmp", chemin)
+    return chemin
+
+# Fonction pour le panel des États du monde : une ligne par État, environ 5 % de valeurs manquantes
+def etats_du_monde(n, graine=0, taux_manquants=0.05):
+    g = generateur(graine, 2)
+    annees = list(ANNEES_MONDE)
+    pop = g.lognormal(15.5, 2.0, n)[:, None] * np.cumprod(1 + g.normal(0.012, 0.01, (n, len(annees))), axis=1)
+    superficie = g.lognormal(11.5, 2.2, n)[:, None]
+    densite = pop / superficie
+    donnees = {"Code ISO_3": [f"E{i:07d}" for i in range(n)], "État": [f"État {i}" for i in range(n)]}
+    for j, a in enumerate(annees):
+        donnees[f"Pop {a}"] = np.where(g.random(n) < taux_manquants, np.nan, pop[:, j])
+    for j, a in enumerate(annees):
+        donnees[f"Densité {a}"] = np.where(g.random(n) < taux_manquants, np.nan, densite[:, j])
+    return pd.DataFrame(donnees)
+
+# Fonction pour n échantillons de taille 1000 tirés dans la population mère
+def echantillons(n, graine=0, taille=1000):
+    g = generateur(graine, 3)
+    comptes = g.multivariate_hypergeometric(POPULATION_MERE, min(taille, POPULATION_MERE.sum()), size=n)
+    return pd.DataFrame(comptes, columns=["Pour", "Contre", "Sans opinion"])
+
+# Fonction pour n réponses individuelles (Pour, Contre, Sans opinion) aux fréquences de la population mère
+def reponses(n, graine=0):
+    g = generateur(graine, 6)
+    return g.choice(np.array(["Pour", "Contre", "Sans opinion"]), n, p=POPULATION_MERE / POPULATION_MERE.sum())
+
+# Fonction pour deux colonnes de test : "Test 1" normale, "Test 2" log-normale
+def loi_normale(n, graine=0):
+    g = generateur(graine, 4)
+    return pd.DataFrame({"Test 1": g.normal(50, 10, n), "Test 2": g.lognormal(3, 0.5, n)})
+
+# Fonction pour n surfaces d'îles (km²), loi de Pareto de paramètre 0.6 au-delà de 0.1 km²
+def surfaces(n, graine=0):
+    g = generateur(graine, 5)
+    return 0.1 * (1 + g.pareto(0.6, n))
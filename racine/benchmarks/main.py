@@ -0,0 +1,109 @@
+#coding:utf8
+
+# Exécution des bancs d'essai (python main.py, depuis racine/benchmarks)
+# Paramètres (variables d'environnement) :
+# - BANCS : noms de bancs ou de séances séparés par des virgules (ex. "seance-05,rang_taille"), tous par défaut
+# - TAILLE_MAX : taille maximale mesurée (10^5 par défaut ; 10^7 pour les courbes complètes)
+# - REPETITIONS : nombre de mesures par banc et par taille (3 par défaut), on retient le minimum
+# - GRAINE : graine des générateurs de données synthétiques
+# Les mesures sont enregistrées dans resultats/<date>-<commit>.json ; comparer.py compare deux exécutions.
+
+import os
+import json
+import time
+import platform
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+import scipy
+
+from bancs import BANCS, RACINE
+
+TAILLE_MAX = int(float(os.environ.get("TAILLE_MAX", 1e5)))
+REPETITIONS = int(os.environ.get("REPETITIONS", 3))
+GRAINE = int(os.environ.get("GRAINE", 0))
+DOSSIER_RESULTATS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultats")
+
+# Fonction pour sélectionner les bancs demandés (par nom ou par séance)
+def selection(filtre):
+    if not filtre:
+        return list(BANCS)
+    demandes = [f.strip() for f in filtre.split(",") if f.strip()]
+    inconnus = [d for d in demandes if d not in BANCS and not any(b["seance"] == d for b in BANCS.values())]
+    if inconnus:
+        raise KeyError(f"Bancs inconnus : {', '.join(inconnus)} (disponibles : {', '.join(BANCS)})")
+    return [nom for nom, banc in BANCS.items() if nom in demandes or banc["seance"] in demandes]
+
+# Fonction pour le commit courant (None hors d'un dépôt git)
+def commit_courant():
+    try:
+        sortie = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True, text=True)
+    except OSError:
+        return None
+    return sortie.stdout.strip() or None
+
+# Fonction pour chronométrer un banc à une taille : données préparées hors chronométrage
+def mesurer(banc, n, repetitions, graine):
+    with tempfile.TemporaryDirectory() as dossier:
+        fonction = banc["preparer"](n, graine, dossier)
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            fonction()
+            durees.append(time.perf_counter() - debut)
+    return durees
+
+# Fonction pour l'exposant de la courbe d'échelle : pente de log(durée) en fonction de log(taille)
+def pente(tailles, durees):
+    if len(tailles) < 2:
+        return None
+    return float(np.polyfit(np.log(tailles), np.log(durees), 1)[0])
+
+if __name__ == "__main__":
+    noms = selection(os.environ.get("BANCS", ""))
+    execution = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit_courant(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+        "machine": platform.machine(),
+        "processeurs": os.cpu_count(),
+        "taille_max": TAILLE_MAX,
+        "repetitions": REPETITIONS,
+        "graine": GRAINE,
+        "mesures": [],
+        "pentes": {},
+    }
+    for nom in noms:
+        banc = BANCS[nom]
+        tailles = [n for n in banc["tailles"] if n <= TAILLE_MAX]
+        if not tailles:
+            continue
+        # exécution à blanc à la plus petite taille : imports différés et compilation hors mesure
+        mesurer(banc, tailles[0], 1, GRAINE)
+        minimums = []
+        for n in tailles:
+            durees = mesurer(banc, n, REPETITIONS, GRAINE)
+            minimums.append(min(durees))
+            execution["mesures"].append({
+                "banc": nom, "seance": banc["seance"], "taille": n, "durees": durees,
+                "min": min(durees), "mediane": float(np.median(durees)),
+            })
+            print(f"{banc['seance']:10} {nom:28} n={n:>9} min={min(durees):9.4f} s "
+                  f"médiane={np.median(durees):9.4f} s", flush=True)
+        execution["pentes"][nom] = pente(tailles, minimums)
+
+    print("\nExposant d'échelle (durée ~ n^a) :")
+    for nom, a in execution["pentes"].items():
+        print(f"{nom:28} a={a:.2f}" if a is not None else f"{nom:28} -")
+
+    os.makedirs(DOSSIER_RESULTATS, exist_ok=True)
+    nom_fichier = time.strftime("%Y%m%d-%H%M%S") + (f"-{execution['commit']}" if execution["commit"] else "") + ".json"
+    chemin = os.path.join(DOSSIER_RESULTATS, nom_fichier)
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        json.dump(execution, fichier, indent=1, ensure_ascii=False)
+    print(f"\nMesures enregistrées dans {chemin}")
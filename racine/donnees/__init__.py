@@ -0,0 +1,30 @@
+#coding:utf8
+
+# Paquet commun des séances : accès aux données (registre des jeux, schémas, cache Parquet, colonnes
+# en mémoire projetée), analyse hors mémoire du fichier des résultats par partitions (blocs.py),
+# histogrammes par blocs fusionnables (histogrammes.py) et esquisse des quantiles qu'ils partagent
+# avec seance-03 (esquisses.py), bootstrap et tests par permutations
+# (reechantillonnage.py) et outils d'exécution des scripts (execution.py : mode sans affichage,
+# instrumentation.py : mesures par étape, pipeline.py : étapes en graphe avec cache et reprise).
+# Monté dans /application/donnees par le docker-compose de chaque séance ; hors conteneur, les
+# scripts ajoutent racine/ au chemin d'import.
+
+from .acces import (
+    JeuDeDonnees,
+    charger,
+    charger_fichier,
+    charger_resultats,
+    ouvrir,
+    ouvrir_fichier,
+)
+from .registre import JEUX
+
+__all__ = [
+    "JEUX",
+    "JeuDeDonnees",
+    "charger",
+    "charger_fichier",
+    "charger_resultats",
+    "ouvrir",
+    "ouvrir_fichier",
+]
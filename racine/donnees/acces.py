@@ -0,0 +1,94 @@
+#coding:utf8
+
+# Accès aux jeux de données : lecture du fichier source une seule fois, puis cache colonnes
+# - ouvrir(nom) : jeu paresseux ; rien n'est lu tant qu'aucune colonne n'est demandée
+# - jeu.colonnes() : noms des colonnes, sans lire les données
+# - jeu.charger(["Surface (km²)"]) / jeu["Surface (km²)"] : seules ces colonnes sont lues du cache
+# - jeu.memmap("Pop 2025") : colonne numérique en mémoire projetée (np.memmap, lecture seule)
+
+import os
+
+from . import cache
+from .registre import JEUX, TABLE, empreinte_schema, jeu_du_fichier, jeu_generique, lire_csv
+
+DOSSIER_DONNEES = "data"
+
+class JeuDeDonnees:
+    def __init__(self, nom, jeu, chemin, dossier_cache=None, utiliser_cache=True):
+        self.nom = nom
+        self.jeu = jeu
+        self.chemin = chemin
+        self.dossier_cache = dossier_cache or os.path.join(os.path.dirname(chemin) or ".", "cache")
+        self.utiliser_cache = utiliser_cache
+        self.dossier = None
+        self.entree = None
+        self.tables = None
+
+    def lire_source(self):
+        lecteur = self.jeu.get("lecteur", lire_csv)
+        return lecteur(self.chemin, self.jeu)
+
+    # Fonction pour s'assurer que l'entrée du cache existe (lecture du fichier source sinon)
+    def preparer(self):
+        if self.entree is not None:
+            return
+        if not self.utiliser_cache:
+            self.tables = self.lire_source()
+            self.entree = {"tables": {t: [str(c) for c in contenu.columns] for t, contenu in self.tables.items()}}
+            return
+        cle = cache.cle_contenu(self.chemin, empreinte_schema(self.jeu), self.dossier_cache, self.nom)
+        self.dossier = cache.dossier_entree(self.dossier_cache, self.nom, cle)
+        self.entree = cache.lire_entree(self.dossier)
+        if self.entree is None:
+            self.entree = cache.ecrire_entree(self.dossier, self.lire_source())
+            cache.purger(self.dossier_cache, self.nom, self.dossier)
+
+    def colonnes(self, table=TABLE):
+        self.preparer()
+        return list(self.entree["tables"][table])
+
+    def charger(self, colonnes=None, table=TABLE):
+        self.preparer()
+        if colonnes is not None:
+            inconnues = [c for c in colonnes if c not in self.entree["tables"][table]]
+            if inconnues:
+                raise KeyError(f"Colonnes absentes du jeu {self.nom} : {', '.join(map(str, inconnues))}")
+        if self.tables is not None:
+            contenu = self.tables[table]
+            return contenu if colonnes is None else contenu[list(colonnes)]
+        return cache.lire_table(self.dossier, table, None if colonnes is None else list(colonnes))
+
+    def __getitem__(self, colonne):
+        return self.charger([colonne])[colonne]
+
+    def memmap(self, colonne, table=TABLE):
+        self.preparer()
+        if self.tables is not None:
+            return self.tables[table][colonne].to_numpy()
+        return cache.colonne_memmap(self.dossier, table, self.entree["tables"][table], colonne)
+
+# Fonction pour ouvrir un jeu du registre, dans le dossier des données de la séance
+def ouvrir(nom, dossier=DOSSIER_DONNEES, **options):
+    if nom not in JEUX:
+        raise KeyError(f"Jeu de données inconnu : {nom} (disponibles : {', '.join(JEUX)})")
+    jeu = JEUX[nom]
+    return JeuDeDonnees(nom, jeu, os.path.join(dossier, jeu["fichier"]), **options)
+
+# Fonction pour ouvrir un fichier par son chemin : schéma du registre si le fichier y est déclaré,
+# lecture CSV par défaut sinon (avec le même cache)
+def ouvrir_fichier(chemin, **options):
+    nom, jeu = jeu_du_fichier(chemin) or jeu_generique(chemin)
+    return JeuDeDonnees(nom, jeu, chemin, **options)
+
+def charger(nom, colonnes=None, table=TABLE, dossier=DOSSIER_DONNEES, **options):
+    return ouvrir(nom, dossier, **options).charger(colonnes, table)
+
+def charger_fichier(chemin, colonnes=None, table=TABLE, **options):
+    return ouvrir_fichier(chemin, **options).charger(colonnes, table)
+
+# Fonction pour les résultats de l'élection présidentielle : renvoie (departements, candidats)
+# departements : une ligne par département, comptes en int32, code et libellé en catégories
+# candidats : table longue (département, sexe, nom, prénom, voix)
+def charger_resultats(chemin, dossier_cache=None, utiliser_cache=True):
+    jeu = ouvrir_fichier(chemin, dossier_cache=dossier_cache, utiliser_cache=utiliser_cache)
+    return jeu.charger(table="departements"), jeu.charger(table="candidats")
@@ -0,0 +1,220 @@
+#coding:utf8
+
+# Analyse hors mémoire du fichier des résultats (départements ou bureaux de vote)
+# Le fichier est découpé en partitions d'environ TAILLE_PARTITION octets, coupées en début de ligne.
+# Chaque processus du pool lit sa partition (moteur C de pandas, colonnes utiles seulement) et
+# calcule des résultats partiels, fusionnés ensuite dans le processus principal. Seules les bornes
+# des partitions transitent vers les processus : le pic de mémoire est d'environ workers partitions,
+# quelle que soit la taille du fichier.
+# - schema_resultats(chemin) : séparateur, encodage et blocs candidats, d'après l'en-tête et la
+#   première ligne (fichier par département de data.gouv.fr ou fichier par bureau de vote, dont
+#   seuls les noms du premier bloc candidat figurent dans l'en-tête)
+# - analyser(chemin, calculs) : calculs = {nom: {"calculer": f(table), "fusionner": g(a, b),
+#   "finaliser": h(resultat) (facultatif), "table": "lignes" ou "candidats"}}, fonctions nommées
+#   (transmises aux processus)
+# - CALCULS : sommes des colonnes de comptes, agrégats par département, voix par candidat (au
+#   total et par département)
+# - histogramme_resultats(chemin, "Inscrits") : histogramme d'une colonne (donnees/histogrammes.py) ;
+#   pandas ne sait pas lire directement le fichier par bureau (lignes plus longues que l'en-tête)
+# Les champs entre guillemets ne doivent pas contenir de retour à la ligne (cas des fichiers de
+# résultats), sans quoi une partition pourrait commencer au milieu d'une ligne.
+
+import io
+import os
+import csv
+import copy
+import functools
+import multiprocessing
+
+import pandas as pd
+
+from . import histogrammes
+from .registre import detecter_separateur
+from .resultats import COLONNES_DEPARTEMENT, COLONNES_COMPTES, COLONNES_CANDIDAT
+
+TAILLE_PARTITION = int(os.environ.get("TAILLE_PARTITION", 64 * 2 ** 20))
+
+# Fonction pour détecter l'encodage : UTF-8 si le début du fichier se décode, Latin-1 sinon
+# (fichiers de bureaux de vote du ministère de l'Intérieur)
+def detecter_encodage(chemin, taille=1 << 16):
+    with open(chemin, "rb") as fichier:
+        debut = fichier.read(taille)
+    try:
+        debut.decode("utf-8")
+    except UnicodeDecodeError as erreur:
+        # caractère coupé par la fin de la lecture
+        if erreur.start < len(debut) - 3:
+            return "latin-1"
+    return "utf-8"
+
+# Fonction pour décrire le fichier : noms uniques de tous les champs (Voix_0, ..., Voix_11),
+# colonnes de lieu (département, circonscription, commune, bureau...) et nombre de candidats
+def schema_resultats(chemin):
+    encodage = detecter_encodage(chemin)
+    separateur = detecter_separateur(chemin, encodage, candidats=(",", ";", "\t"))
+    with open(chemin, "r", encoding=encodage, newline="") as fichier:
+        lecteur = csv.reader(fichier, delimiter=separateur)
+        entete = next(lecteur)
+        premiere = next(lecteur, entete)
+    manquantes = [c for c in COLONNES_DEPARTEMENT + COLONNES_COMPTES if c not in entete]
+    if manquantes or COLONNES_CANDIDAT[0] not in entete:
+        raise ValueError(f"En-tête inattendu dans {chemin} : colonnes manquantes {manquantes or COLONNES_CANDIDAT[:1]}")
+    debut = entete.index(COLONNES_CANDIDAT[0])
+    if debut > 0 and entete[debut - 1] == "N°Panneau":
+        debut -= 1
+    # bloc candidat : colonnes nommées jusqu'à la répétition du premier nom ou une colonne sans nom
+    largeur = 1
+    while debut + largeur < len(entete) and entete[debut + largeur] not in ("", entete[debut]):
+        largeur += 1
+    bloc = entete[debut:debut + largeur]
+    if any(c not in bloc for c in COLONNES_CANDIDAT):
+        raise ValueError(f"Bloc candidat inattendu dans {chemin} : {bloc}")
+    nb_champs = max(len(entete), len(premiere))
+    nb_candidats = (nb_champs - debut) // largeur
+    noms = entete[:debut] + [f"{c}_{i}" for i in range(nb_candidats) for c in bloc]
+    noms += [f"_reste_{i}" for i in range(nb_champs - len(noms))]
+    return {
+        "separateur": separateur,
+        "encodage": encodage,
+        "noms": noms,
+        "lieux": [c for c in entete[:debut] if c not in COLONNES_COMPTES and not c.startswith("%")],
+        "nb_candidats": nb_candidats,
+    }
+
+# Fonction pour découper le fichier en partitions (début, fin) en octets, en début de ligne
+def partitions(chemin, taille_partition=TAILLE_PARTITION):
+    taille = os.path.getsize(chemin)
+    with open(chemin, "rb") as fichier:
+        fichier.readline()
+        bornes = [fichier.tell()]
+        while bornes[-1] + taille_partition < taille:
+            fichier.seek(bornes[-1] + taille_partition)
+            fichier.readline()
+            if fichier.tell() >= taille:
+                break
+            bornes.append(fichier.tell())
+    bornes.append(taille)
+    return [(a, b) for a, b in zip(bornes[:-1], bornes[1:]) if b > a]
+
+# Fonction pour lire une partition : colonnes de lieu (texte), comptes et voix (int64) ; sexe, nom
+# et prénom en catégories (quelques valeurs répétées sur toutes les lignes)
+def lire_partition(chemin, schema, debut, fin):
+    with open(chemin, "rb") as fichier:
+        fichier.seek(debut)
+        contenu = fichier.read(fin - debut)
+    candidats = [f"{c}_{i}" for i in range(schema["nb_candidats"]) for c in COLONNES_CANDIDAT]
+    dtypes = {c: str for c in schema["lieux"]}
+    dtypes.update({c: "int64" for c in COLONNES_COMPTES})
+    dtypes.update({c: ("int64" if c.startswith("Voix_") else "category") for c in candidats})
+    return pd.read_csv(
+        io.BytesIO(contenu), sep=schema["separateur"], header=None, names=schema["noms"],
+        usecols=schema["lieux"] + COLONNES_COMPTES + candidats, dtype=dtypes,
+        encoding=schema["encodage"], engine="c",
+    )
+
+# Fonction pour la table longue (lieux, Sexe, Nom, Prénom, Voix) d'une partition
+def candidats_partition(table, schema):
+    morceaux = []
+    for i in range(schema["nb_candidats"]):
+        morceau = table[schema["lieux"] + [f"{c}_{i}" for c in COLONNES_CANDIDAT]]
+        morceau.columns = schema["lieux"] + COLONNES_CANDIDAT
+        morceaux.append(morceau)
+    return pd.concat(morceaux, ignore_index=True)
+
+# Fonction exécutée par un processus du pool : lecture d'une partition et résultats partiels
+def traiter_partition(argument):
+    chemin, schema, (debut, fin), calculs = argument
+    lignes = lire_partition(chemin, schema, debut, fin)
+    tables = {"lignes": lignes}
+    if any(c.get("table") == "candidats" for c in calculs.values()):
+        tables["candidats"] = candidats_partition(lignes, schema)
+    return {nom: calcul["calculer"](tables[calcul.get("table", "lignes")]) for nom, calcul in calculs.items()}
+
+# Fonction principale : un résultat fusionné par calcul
+def analyser(chemin, calculs, workers=1, taille_partition=TAILLE_PARTITION):
+    schema = schema_resultats(chemin)
+    arguments = [(chemin, schema, p, calculs) for p in partitions(chemin, taille_partition)]
+    resultats = {}
+    def fusionner(partiels):
+        for nom, partiel in partiels.items():
+            resultats[nom] = partiel if nom not in resultats else calculs[nom]["fusionner"](resultats[nom], partiel)
+    if workers <= 1 or len(arguments) <= 1:
+        for argument in arguments:
+            fusionner(traiter_partition(argument))
+    else:
+        methode = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        with multiprocessing.get_context(methode).Pool(min(workers, len(arguments))) as pool:
+            for partiels in pool.imap_unordered(traiter_partition, arguments):
+                fusionner(partiels)
+    for nom, resultat in resultats.items():
+        if "finaliser" in calculs[nom]:
+            resultats[nom] = calculs[nom]["finaliser"](resultat)
+    return resultats
+
+# Calculs fournis
+
+# Sommes des colonnes de comptes (étape 9 de la séance 02)
+def sommes_comptes(lignes):
+    return lignes[COLONNES_COMPTES].sum()
+
+def additionner(a, b):
+    return a.add(b, fill_value=0).astype(a.dtype)
+
+# Comptes et nombre de lignes (bureaux de vote) par département
+# Les tables partielles sont regroupées une seule fois à la fin (un département peut être à cheval
+# sur deux partitions) : pas de nouveau regroupement de tout le résultat à chaque fusion
+def agreger_departements(lignes):
+    groupes = lignes.groupby(COLONNES_DEPARTEMENT, sort=False)
+    agregats = groupes[COLONNES_COMPTES].sum()
+    agregats["Lignes"] = groupes.size()
+    # colonnes plutôt qu'index multiple : la concaténation d'index multiples est très lente
+    return [agregats.reset_index()]
+
+def concatener(a, b):
+    return a + b
+
+def regrouper_departements(partiels):
+    return pd.concat(partiels, ignore_index=True).groupby(COLONNES_DEPARTEMENT, sort=True, as_index=False).sum()
+
+# Voix par candidat (Sexe, Nom, Prénom)
+def voix_candidats(candidats):
+    return candidats.groupby(COLONNES_CANDIDAT[:3], sort=False, observed=True)["Voix"].sum()
+
+# Voix par département et par candidat, candidats dans l'ordre des blocs du fichier (table longue
+# des départements, voir resultats.remettre_en_large)
+def agreger_voix_departements(candidats):
+    cles = COLONNES_DEPARTEMENT + COLONNES_CANDIDAT[:3]
+    return [candidats.groupby(cles, sort=False, observed=True)["Voix"].sum().reset_index()]
+
+def regrouper_voix_departements(partiels):
+    cles = COLONNES_DEPARTEMENT + COLONNES_CANDIDAT[:3]
+    voix = pd.concat(partiels, ignore_index=True).astype({c: str for c in cles})
+    return voix.groupby(cles, sort=False, as_index=False)["Voix"].sum()
+
+CALCULS = {
+    "sommes": {"calculer": sommes_comptes, "fusionner": additionner},
+    "departements": {"calculer": agreger_departements, "fusionner": concatener, "finaliser": regrouper_departements},
+    "voix": {"calculer": voix_candidats, "fusionner": additionner, "table": "candidats"},
+    "voix_departements": {"calculer": agreger_voix_departements, "fusionner": concatener,
+                          "finaliser": regrouper_voix_departements, "table": "candidats"},
+}
+
+# Fonction pour les agrégats usuels : sommes (Series), departements (une ligne par département,
+# triée par code, colonnes du fichier par département et nombre de lignes lues), voix (Series) et
+# voix_departements (table longue département, candidat, voix)
+def agreger_resultats(chemin, workers=1, taille_partition=TAILLE_PARTITION, calculs=None):
+    return analyser(chemin, {**CALCULS, **(calculs or {})}, workers, taille_partition)
+
+# Fonction pour l'histogramme d'une colonne, partition par partition (deux passages pour les bords
+# adaptatifs, voir donnees/histogrammes.py)
+def accumuler_colonne(vide, colonne, lignes):
+    return histogrammes.ajouter_bloc(copy.deepcopy(vide), lignes[colonne].to_numpy())
+
+def histogramme_resultats(chemin, colonne, bords="lineaires", nb_classes=10, droite=False, workers=1,
+                          taille_partition=TAILLE_PARTITION):
+    def passage(vide):
+        calcul = {"calculer": functools.partial(accumuler_colonne, vide, colonne), "fusionner": histogrammes.fusionner}
+        return analyser(chemin, {"histogramme": calcul}, workers, taille_partition)["histogramme"]
+    if isinstance(bords, str):
+        bords = histogrammes.bords_adaptatifs(passage(histogrammes.nouvelle_esquisse()), bords, nb_classes)
+    return passage(histogrammes.nouvel_histogramme(bords, droite))
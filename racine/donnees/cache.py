@@ -0,0 +1,111 @@
+#coding:utf8
+
+# Cache binaire des jeux de données, indexé par l'empreinte du contenu du fichier source
+# <dossier des données>/cache/<jeu>-<clé>/<table>.parquet : une table par fichier (pickle si pyarrow
+#     est absent) ; le format colonnes permet de ne lire que les colonnes demandées
+# <dossier des données>/cache/<jeu>-<clé>/<table>.<n° de colonne>.npy : colonnes numériques écrites
+#     à la demande, lues par np.load(mmap_mode="r") sans charger le fichier en mémoire
+# La clé combine le SHA-1 du fichier et l'empreinte du schéma déclaré : modifier l'un ou l'autre
+# crée une nouvelle entrée. Le SHA-1 n'est recalculé que si la date ou la taille du fichier changent
+# (index <jeu>.index.json).
+
+import os
+import json
+import shutil
+import hashlib
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# pyarrow n'est importé (par pandas) qu'à la première lecture ou écriture d'une table
+FORMAT_CACHE = "parquet" if importlib.util.find_spec("pyarrow") is not None else "pickle"
+
+EXTENSIONS = {"parquet": ".parquet", "pickle": ".pkl"}
+
+# Fonction pour calculer l'empreinte SHA-1 d'un fichier (lecture par blocs)
+def empreinte_fichier(chemin, taille_bloc=1 << 20):
+    h = hashlib.sha1()
+    with open(chemin, "rb") as fichier:
+        for bloc in iter(lambda: fichier.read(taille_bloc), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+def lire_json(chemin):
+    try:
+        with open(chemin, "r", encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except (OSError, ValueError):
+        return None
+
+# Ecriture atomique : fichier temporaire puis renommage
+def ecrire_json(contenu, chemin):
+    with open(chemin + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(contenu, fichier, indent=1, ensure_ascii=False)
+    os.replace(chemin + ".tmp", chemin)
+
+# Fonction pour la clé de cache d'un fichier : SHA-1 du contenu (réutilisé tant que la date et la
+# taille du fichier n'ont pas changé) combiné à l'empreinte du schéma
+def cle_contenu(chemin, empreinte_schema, dossier_cache, nom):
+    stat = os.stat(chemin)
+    chemin_index = os.path.join(dossier_cache, f"{nom}.index.json")
+    index = lire_json(chemin_index) or {}
+    if index.get("mtime") == stat.st_mtime_ns and index.get("taille") == stat.st_size and index.get("sha1"):
+        sha1 = index["sha1"]
+    else:
+        sha1 = empreinte_fichier(chemin)
+        os.makedirs(dossier_cache, exist_ok=True)
+        ecrire_json({"mtime": stat.st_mtime_ns, "taille": stat.st_size, "sha1": sha1}, chemin_index)
+    return hashlib.sha1(f"{sha1}:{empreinte_schema}:{FORMAT_CACHE}".encode()).hexdigest()[:20]
+
+def dossier_entree(dossier_cache, nom, cle):
+    return os.path.join(dossier_cache, f"{nom}-{cle}")
+
+def chemin_table(dossier, table):
+    return os.path.join(dossier, table + EXTENSIONS[FORMAT_CACHE])
+
+# Description d'une entrée complète (écrite en dernier) : tables et colonnes, ou None
+def lire_entree(dossier):
+    return lire_json(os.path.join(dossier, "entree.json"))
+
+# Fonction pour écrire les tables d'une entrée ; la description est écrite en dernier, une entrée
+# interrompue n'est donc jamais considérée comme valide
+def ecrire_entree(dossier, tables):
+    os.makedirs(dossier, exist_ok=True)
+    for table, contenu in tables.items():
+        if FORMAT_CACHE == "parquet":
+            contenu.to_parquet(chemin_table(dossier, table), index=False)
+        else:
+            contenu.to_pickle(chemin_table(dossier, table))
+    entree = {"format": FORMAT_CACHE, "tables": {t: [str(c) for c in contenu.columns] for t, contenu in tables.items()}}
+    ecrire_json(entree, os.path.join(dossier, "entree.json"))
+    return entree
+
+# Fonction pour supprimer les anciennes entrées d'un jeu (fichier source ou schéma modifiés)
+def purger(dossier_cache, nom, dossier_garde):
+    prefixe = f"{nom}-"
+    for element in os.listdir(dossier_cache):
+        chemin = os.path.join(dossier_cache, element)
+        if element.startswith(prefixe) and os.path.isdir(chemin) and chemin != dossier_garde:
+            shutil.rmtree(chemin, ignore_errors=True)
+
+# Fonction pour lire une table, éventuellement limitée à quelques colonnes
+def lire_table(dossier, table, colonnes=None):
+    if FORMAT_CACHE == "parquet":
+        return pd.read_parquet(chemin_table(dossier, table), columns=colonnes)
+    contenu = pd.read_pickle(chemin_table(dossier, table))
+    return contenu if colonnes is None else contenu[colonnes]
+
+# Fonction pour accéder à une colonne numérique en mémoire projetée (lecture seule)
+# Le fichier .npy est créé au premier appel à partir de la table en cache
+def colonne_memmap(dossier, table, colonnes, colonne):
+    position = colonnes.index(colonne)
+    chemin = os.path.join(dossier, f"{table}.{position}.npy")
+    if not os.path.exists(chemin):
+        valeurs = lire_table(dossier, table, [colonne])[colonne]
+        if not pd.api.types.is_numeric_dtype(valeurs):
+            raise TypeError(f"La colonne {colonne!r} n'est pas numérique : projection mémoire impossible")
+        with open(chemin + ".tmp", "wb") as fichier:
+            np.save(fichier, valeurs.to_numpy())
+        os.replace(chemin + ".tmp", chemin)
+    return np.load(chemin, mmap_mode="r")
@@ -0,0 +1,115 @@
+#coding:utf8
+
+# Esquisse logarithmique des quantiles (type DDSketch) : précision relative bornée, fusionnable
+# Une valeur x > 0 tombe dans le seau i = ceil(log_gamma(x)) avec gamma = (1 + a) / (1 - a) ;
+# le représentant du seau est à moins de a (en relatif) de toute valeur du seau. Les valeurs
+# négatives vont dans un second magasin de seaux (sur -x), les zéros sont comptés à part.
+# Les seaux sont alignés pour toutes les esquisses de même précision, qui se fusionnent en
+# additionnant leurs comptes. Minimum, maximum et plus petite valeur positive sont exacts.
+# Utilisée par seance-03/src/statistiques_flux.py (quantiles, écart absolu moyen) et par
+# histogrammes.py (bords adaptatifs) ; l'esquisse est un simple dictionnaire, comme leurs accumulateurs.
+
+import numpy as np
+
+PRECISION = 0.01
+
+def nouveau_magasin():
+    return {"indice_min": 0, "comptes": np.zeros(0, dtype=np.int64)}
+
+# Fonction pour ajouter les comptes de seaux consécutifs à partir du seau indice_min
+# (tableau des comptes agrandi si besoin)
+def ajouter_seaux(magasin, indice_min, comptes):
+    if len(comptes) == 0:
+        return
+    debut, fin = indice_min, indice_min + len(comptes) - 1
+    if len(magasin["comptes"]):
+        debut = min(debut, magasin["indice_min"])
+        fin = max(fin, magasin["indice_min"] + len(magasin["comptes"]) - 1)
+    if debut != magasin["indice_min"] or fin - debut + 1 != len(magasin["comptes"]):
+        nouveaux = np.zeros(fin - debut + 1, dtype=np.int64)
+        decalage = magasin["indice_min"] - debut
+        nouveaux[decalage:decalage + len(magasin["comptes"])] = magasin["comptes"]
+        magasin["indice_min"] = debut
+        magasin["comptes"] = nouveaux
+    decalage = indice_min - magasin["indice_min"]
+    magasin["comptes"][decalage:decalage + len(comptes)] += comptes
+
+# "type" distingue l'esquisse des histogrammes dans les accumulateurs de histogrammes.py
+def nouvelle_esquisse(precision=PRECISION):
+    return {
+        "type": "esquisse",
+        "gamma": (1 + precision) / (1 - precision),
+        "positifs": nouveau_magasin(),
+        "negatifs": nouveau_magasin(),
+        "zeros": 0,
+        "manquants": 0,
+        "min": np.inf,
+        "min_positif": np.inf,
+        "max": -np.inf,
+    }
+
+def ajouter_esquisse(esquisse, valeurs):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    manquants = np.isnan(valeurs)
+    valeurs = valeurs[~manquants]
+    esquisse["manquants"] += int(np.count_nonzero(manquants))
+    if len(valeurs) == 0:
+        return esquisse
+    esquisse["min"] = min(esquisse["min"], float(valeurs.min()))
+    esquisse["max"] = max(esquisse["max"], float(valeurs.max()))
+    esquisse["zeros"] += int(np.count_nonzero(valeurs == 0))
+    positifs = valeurs[valeurs > 0]
+    if len(positifs):
+        esquisse["min_positif"] = min(esquisse["min_positif"], float(positifs.min()))
+    log_gamma = np.log(esquisse["gamma"])
+    for cle, partie in (("positifs", positifs), ("negatifs", -valeurs[valeurs < 0])):
+        if len(partie):
+            indices = np.ceil(np.log(partie) / log_gamma).astype(np.int64)
+            bas = int(indices.min())
+            ajouter_seaux(esquisse[cle], bas, np.bincount(indices - bas))
+    return esquisse
+
+def fusionner_esquisses(a, b):
+    if not np.isclose(a["gamma"], b["gamma"]):
+        raise ValueError("Esquisses de précisions différentes : fusion impossible")
+    esquisse = nouvelle_esquisse()
+    esquisse["gamma"] = a["gamma"]
+    for cle in ("positifs", "negatifs"):
+        for source in (a[cle], b[cle]):
+            ajouter_seaux(esquisse[cle], source["indice_min"], source["comptes"])
+    for cle in ("zeros", "manquants"):
+        esquisse[cle] = a[cle] + b[cle]
+    for cle, choix in (("min", min), ("min_positif", min), ("max", max)):
+        esquisse[cle] = choix(a[cle], b[cle])
+    return esquisse
+
+# Fonction pour obtenir (représentants, comptes) de tous les seaux non vides, par valeurs croissantes
+def seaux_tries(esquisse):
+    gamma = esquisse["gamma"]
+    representants = []
+    comptes = []
+    for cle, signe in (("negatifs", -1.0), ("positifs", 1.0)):
+        magasin = esquisse[cle]
+        indices = magasin["indice_min"] + np.arange(len(magasin["comptes"]))
+        valeurs = signe * 2 * gamma ** indices / (gamma + 1)
+        if signe < 0:
+            representants += [valeurs[::-1], np.array([0.0])]
+            comptes += [magasin["comptes"][::-1], np.array([esquisse["zeros"]], dtype=np.int64)]
+        else:
+            representants.append(valeurs)
+            comptes.append(magasin["comptes"])
+    representants = np.concatenate(representants)
+    comptes = np.concatenate(comptes)
+    garde = comptes > 0
+    return representants[garde], comptes[garde]
+
+# Fonction pour estimer les quantiles (rang q * (n - 1), comme pandas)
+def quantiles_esquisse(esquisse, probabilites):
+    representants, comptes = seaux_tries(esquisse)
+    n = comptes.sum()
+    if n == 0:
+        return np.full(len(probabilites), np.nan)
+    rangs = np.asarray(probabilites, dtype=np.float64) * (n - 1)
+    positions = np.searchsorted(np.cumsum(comptes), rangs, side="right")
+    # les représentants ne sortent jamais de l'intervalle réellement observé
+    return np.clip(representants[positions], esquisse["min"], esquisse["max"])
@@ -0,0 +1,62 @@
+#coding:utf8
+
+# Mode d'exécution des scripts des séances
+# - SANS_AFFICHAGE=1 : mode sans écran (conteneurs, traitements par lots) ; matplotlib utilise le
+#   moteur Agg et afficher() ferme la figure au lieu d'ouvrir une fenêtre (plt.show())
+#   SANS_AFFICHAGE=0 : affichage interactif ; par défaut ("auto"), mode sans écran si aucun
+#   serveur graphique n'est disponible (DISPLAY / WAYLAND_DISPLAY absents sous Linux)
+# - fin_demarrage() : durée de démarrage du script (interpréteur et imports) comparée à son budget
+#   (BUDGET_DEMARRAGE en secondes, remplace le budget du script)
+# A importer avant matplotlib.pyplot : le moteur est choisi au premier import de pyplot.
+
+import os
+import sys
+import time
+
+DEBUT_IMPORT = time.perf_counter()
+
+# Fonction pour savoir si le script tourne sans écran
+def mode_sans_affichage():
+    valeur = os.environ.get("SANS_AFFICHAGE", "auto")
+    if valeur == "auto":
+        return sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return valeur != "0"
+
+SANS_AFFICHAGE = mode_sans_affichage()
+
+if SANS_AFFICHAGE:
+    os.environ["MPLBACKEND"] = "Agg"
+    if "matplotlib" in sys.modules:
+        sys.modules["matplotlib"].use("Agg")
+
+# Fonction pour afficher la figure courante (fenêtre interactive) ou seulement la fermer (mode sans écran)
+# La figure doit avoir été enregistrée avant l'appel
+def afficher():
+    import matplotlib.pyplot as plt
+    if SANS_AFFICHAGE:
+        plt.close()
+    else:
+        plt.show()
+
+# Fonction pour la durée écoulée depuis le lancement du processus (Linux : /proc), sinon depuis
+# l'import de ce module
+def duree_depuis_lancement():
+    try:
+        with open("/proc/self/stat", "r") as fichier:
+            # le nom de commande (2e champ) peut contenir des espaces : découpage après la parenthèse fermante
+            champs = fichier.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r") as fichier:
+            uptime = float(fichier.read().split()[0])
+        return uptime - int(champs[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - DEBUT_IMPORT
+
+# Fonction pour afficher la durée de démarrage du script et la comparer à son budget (secondes)
+# Renvoie la durée mesurée
+def fin_demarrage(nom, budget=2.0):
+    budget = float(os.environ.get("BUDGET_DEMARRAGE", budget))
+    duree = duree_depuis_lancement()
+    etat = "ok" if duree <= budget else "dépassé"
+    mode = "sans affichage" if SANS_AFFICHAGE else "interactif"
+    print(f"[{nom}] démarrage : {duree:.2f} s (budget {budget:.2f} s, {etat}, mode {mode})")
+    return duree
@@ -0,0 +1,183 @@
+#coding:utf8
+
+# Histogrammes calculés bloc par bloc, sans garder la colonne en mémoire, et fusionnables
+# (plusieurs fichiers, plusieurs processus)
+# - bords fixes : nouvel_histogramme([0, 10, 25, ..., np.inf], droite=True) puis ajouter() par bloc
+#   (classes (a, b] comme pd.cut avec droite=True, [a, b) comme np.histogram sinon ; la borne
+#   extrême est incluse dans les deux cas, comme include_lowest et la dernière classe de numpy)
+# - bords adaptatifs ("lineaires", "logarithmiques", "quantiles") : un premier passage remplit une
+#   esquisse logarithmique fusionnable (esquisses.py : minimum et maximum exacts, quantiles à
+#   PRECISION près en relatif), les bords en sont déduits, puis un second passage compte exactement
+# - histogramme_tableau() : tableau en mémoire ou projeté (np.memmap), parcouru par tranches
+# - histogramme_csv() : un ou plusieurs CSV lus par blocs, blocs répartis entre processus
+# - tracer_histogramme(axe, histo) : graphique tracé à partir des comptes
+# Chaque accumulateur est un simple dictionnaire, comme l'esquisse et ceux de seance-03/src/statistiques_flux.py.
+
+import itertools
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from .esquisses import PRECISION, ajouter_esquisse, fusionner_esquisses, nouvelle_esquisse, quantiles_esquisse
+
+TAILLE_BLOC = 1_000_000
+BORDS_ADAPTATIFS = ("lineaires", "logarithmiques", "quantiles")
+
+# Etape 1 - Histogramme à bords fixes
+
+def nouvel_histogramme(bords, droite=False):
+    bords = np.asarray(bords, dtype=np.float64)
+    if bords.ndim != 1 or len(bords) < 2 or np.any(np.diff(bords) <= 0):
+        raise ValueError("Les bords doivent être une suite strictement croissante d'au moins deux valeurs")
+    return {
+        "type": "histogramme",
+        "bords": bords,
+        "droite": bool(droite),
+        "comptes": np.zeros(len(bords) - 1, dtype=np.int64),
+        "dessous": 0,
+        "dessus": 0,
+        "manquants": 0,
+    }
+
+# Fonction pour ajouter un bloc de valeurs (recherche dichotomique des classes puis bincount)
+def ajouter(histo, valeurs):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    manquants = np.isnan(valeurs)
+    valeurs = valeurs[~manquants]
+    bords = histo["bords"]
+    nb_classes = len(bords) - 1
+    if histo["droite"]:
+        indices = np.searchsorted(bords, valeurs, side="left") - 1
+        indices[valeurs == bords[0]] = 0
+    else:
+        indices = np.searchsorted(bords, valeurs, side="right") - 1
+        indices[valeurs == bords[-1]] = nb_classes - 1
+    dedans = (indices >= 0) & (indices < nb_classes)
+    histo["comptes"] += np.bincount(indices[dedans], minlength=nb_classes)
+    histo["dessous"] += int(np.count_nonzero(indices < 0))
+    histo["dessus"] += int(np.count_nonzero(indices >= nb_classes))
+    histo["manquants"] += int(np.count_nonzero(manquants))
+    return histo
+
+def fusionner_histogrammes(a, b):
+    if a["droite"] != b["droite"] or not np.array_equal(a["bords"], b["bords"]):
+        raise ValueError("Histogrammes sur des bords différents : fusion impossible")
+    histo = nouvel_histogramme(a["bords"], a["droite"])
+    for cle in ("comptes", "dessous", "dessus", "manquants"):
+        histo[cle] = a[cle] + b[cle]
+    return histo
+
+# Table des classes : libellés, bords, effectifs, fréquences et densités
+def table_histogramme(histo, libelles=None):
+    bords, comptes = histo["bords"], histo["comptes"]
+    total = comptes.sum()
+    if libelles is None:
+        gauche, droite = ("(", "]") if histo["droite"] else ("[", ")")
+        libelles = [f"{gauche}{a:g}, {b:g}{droite}" for a, b in zip(bords[:-1], bords[1:])]
+    largeurs = np.diff(bords)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame({
+            "Classe": libelles,
+            "Borne inférieure": bords[:-1],
+            "Borne supérieure": bords[1:],
+            "Effectif": comptes,
+            "Fréquence": comptes / total if total else np.nan,
+            "Densité": comptes / (total * largeurs) if total else np.nan,
+        })
+
+# Fonction pour tracer l'histogramme à partir des comptes (axe matplotlib, ou le module pyplot)
+# Mêmes barres que hist() sur les valeurs brutes avec les mêmes bords
+def tracer_histogramme(axe, histo, densite=False, **options):
+    bords = histo["bords"]
+    return axe.hist(bords[:-1], bins=bords, weights=histo["comptes"], density=densite, **options)
+
+# Etape 2 - Bords adaptatifs déduits d'une esquisse (esquisses.py)
+
+# Fonction pour déduire les bords adaptatifs d'une esquisse
+# - lineaires : classes de même largeur entre minimum et maximum (comme np.histogram(bins=n))
+# - logarithmiques : classes de même rapport entre le plus petit positif et le maximum
+# - quantiles : classes de même effectif (à la précision près ; bords confondus regroupés)
+def bords_adaptatifs(esquisse, methode, nb_classes=10):
+    if esquisse["max"] < esquisse["min"]:
+        raise ValueError("Aucune valeur : bords impossibles à déterminer")
+    minimum, maximum = esquisse["min"], esquisse["max"]
+    if methode == "lineaires":
+        if minimum == maximum:
+            minimum, maximum = minimum - 0.5, maximum + 0.5
+        return np.linspace(minimum, maximum, nb_classes + 1)
+    if methode == "logarithmiques":
+        if not np.isfinite(esquisse["min_positif"]):
+            raise ValueError("Bords logarithmiques impossibles : aucune valeur positive")
+        if esquisse["min_positif"] == maximum:
+            return np.array([maximum / esquisse["gamma"], maximum * esquisse["gamma"]])
+        return np.geomspace(esquisse["min_positif"], maximum, nb_classes + 1)
+    if methode == "quantiles":
+        bords = quantiles_esquisse(esquisse, np.linspace(0, 1, nb_classes + 1))
+        bords[0], bords[-1] = minimum, maximum
+        bords = np.unique(bords)
+        return bords if len(bords) > 1 else np.array([minimum - 0.5, maximum + 0.5])
+    raise ValueError(f"Bords inconnus : {methode} (disponibles : {', '.join(BORDS_ADAPTATIFS)})")
+
+# Etape 3 - Parcours par blocs : tableau (éventuellement projeté en mémoire) ou fichiers CSV
+
+# Dispatch d'après le type d'accumulateur (fonctions transmises aux processus du pool)
+def ajouter_bloc(accu, valeurs):
+    return (ajouter if accu["type"] == "histogramme" else ajouter_esquisse)(accu, valeurs)
+
+def fusionner(a, b):
+    return (fusionner_histogrammes if a["type"] == "histogramme" else fusionner_esquisses)(a, b)
+
+def accumuler_partiel(argument):
+    vide, valeurs = argument
+    return ajouter_bloc(vide, valeurs)
+
+def tranches(valeurs, taille_bloc):
+    for debut in range(0, len(valeurs), taille_bloc):
+        yield valeurs[debut:debut + taille_bloc]
+
+def blocs_csv(chemins, colonne, taille_bloc, options_csv):
+    for chemin in [chemins] if isinstance(chemins, str) else chemins:
+        for bloc in pd.read_csv(chemin, usecols=[colonne], chunksize=taille_bloc, engine="c", **options_csv):
+            yield pd.to_numeric(bloc[colonne], errors="coerce").to_numpy(dtype=np.float64)
+
+# Fonction pour accumuler des blocs dans accu (copie vide transmise à chaque processus)
+def accumuler(accu, blocs, workers=1):
+    if workers <= 1:
+        for bloc in blocs:
+            ajouter_bloc(accu, bloc)
+        return accu
+    if accu["type"] == "esquisse":
+        vide = nouvelle_esquisse()
+        vide["gamma"] = accu["gamma"]
+    else:
+        vide = nouvel_histogramme(accu["bords"], accu["droite"])
+    arguments = ((vide, bloc) for bloc in blocs)
+    methode = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    with multiprocessing.get_context(methode).Pool(workers) as pool:
+        # au plus 2 blocs par processus en mémoire à la fois
+        while True:
+            fenetre = list(itertools.islice(arguments, 2 * workers))
+            if not fenetre:
+                break
+            for partiel in pool.imap_unordered(accumuler_partiel, fenetre):
+                accu = fusionner(accu, partiel)
+    return accu
+
+# Fonction commune aux deux sources : lire_blocs() renvoie un nouvel itérateur de blocs à chaque appel
+def histogramme_blocs(lire_blocs, bords, nb_classes, droite, workers, precision):
+    if isinstance(bords, str):
+        esquisse = accumuler(nouvelle_esquisse(precision), lire_blocs(), workers)
+        bords = bords_adaptatifs(esquisse, bords, nb_classes)
+    return accumuler(nouvel_histogramme(bords, droite), lire_blocs(), workers)
+
+# bords : liste de bords fixes, ou "lineaires", "logarithmiques", "quantiles" (deux passages)
+def histogramme_tableau(valeurs, bords="lineaires", nb_classes=10, droite=False, taille_bloc=TAILLE_BLOC,
+                        workers=1, precision=PRECISION):
+    return histogramme_blocs(lambda: tranches(valeurs, taille_bloc), bords, nb_classes, droite, workers, precision)
+
+# chemins : un fichier ou une liste de fichiers (mêmes colonnes), lus par blocs de taille_bloc lignes
+def histogramme_csv(chemins, colonne, bords="lineaires", nb_classes=10, droite=False, taille_bloc=TAILLE_BLOC,
+                    workers=1, precision=PRECISION, **options_csv):
+    return histogramme_blocs(lambda: blocs_csv(chemins, colonne, taille_bloc, options_csv),
+                             bords, nb_classes, droite, workers, precision)
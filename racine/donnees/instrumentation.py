@@ -0,0 +1,221 @@
+#coding:utf8
+
+# Instrumentation des étapes des scripts (variable INSTRUMENTATION, désactivée par défaut)
+# - etape("Etape 5 - Paramètres") ouvre une étape et ferme la précédente ; la dernière étape est
+#   fermée à la fin du script
+# - compter(n) ajoute n lignes traitées à l'étape en cours
+# - mesurer(nom, numero, fonction) mesure l'appel fonction() comme une étape (étapes du pipeline,
+#   éventuellement dans un processus du pool, voir pipeline.py) et renvoie la trace, que le processus
+#   principal enregistre avec ajouter_trace(trace)
+# INSTRUMENTATION : options séparées par des virgules
+# - temps (ou 1) : durée réelle, temps CPU du processus et des processus fils terminés, mémoire
+#   résidente (RSS) en fin d'étape et pic du processus
+# - memoire : pic des allocations Python pendant l'étape (tracemalloc ; ralentit l'exécution)
+# - profil : profil de chaque étape (cProfile, ou pyinstrument si PROFILEUR=pyinstrument et installé)
+# Traces dans DOSSIER_TRACES (traces/ par défaut) :
+# - <script>-<horodatage>.jsonl : une ligne JSON par étape, écrite dès la fin de l'étape
+# - <script>-<horodatage>.csv : récapitulatif écrit à la fin du script
+# - <script>-<horodatage>-<n° d'étape>.prof (cProfile, lisible avec pstats) ou .html (pyinstrument)
+# Désactivée, etape() et compter() ne font rien.
+
+import os
+import re
+import sys
+import json
+import time
+import atexit
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+OPTIONS = {"temps", "memoire", "profil"}
+
+def lire_options():
+    valeur = os.environ.get("INSTRUMENTATION", "").strip().lower()
+    if valeur in ("", "0"):
+        return set()
+    options = {"temps" if o.strip() == "1" else o.strip() for o in valeur.split(",") if o.strip()}
+    inconnues = options - OPTIONS
+    if inconnues:
+        raise ValueError(f"Options d'instrumentation inconnues : {', '.join(sorted(inconnues))} "
+                         f"(disponibles : {', '.join(sorted(OPTIONS))})")
+    # les autres mesures sont toujours accompagnées des temps
+    return options | {"temps"}
+
+ACTIVE = lire_options()
+DOSSIER_TRACES = os.environ.get("DOSSIER_TRACES", "traces")
+PROFILEUR = os.environ.get("PROFILEUR", "cprofile")
+
+COLONNES = ["numero", "etape", "duree_s", "cpu_s", "cpu_enfants_s", "lignes", "lignes_par_s",
+            "rss_mo", "rss_pic_mo", "python_pic_mo"]
+
+_ETAT = {"courante": None, "traces": [], "base": None}
+
+# Mémoire résidente actuelle du processus (Mo), None si /proc n'est pas disponible
+def rss_actuelle():
+    try:
+        with open("/proc/self/statm", "r") as fichier:
+            return int(fichier.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+# Pic de mémoire résidente du processus depuis son lancement (Mo)
+def rss_pic():
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # octets sous macOS, kilo-octets sous Linux
+    return pic / 2 ** 20 if sys.platform == "darwin" else pic / 2 ** 10
+
+def cpu_enfants():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+# Fonction pour le préfixe des fichiers de trace : nom du script et horodatage
+def base_traces():
+    if _ETAT["base"] is None:
+        script = os.path.splitext(os.path.basename(sys.argv[0] or "script"))[0] or "script"
+        seance = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(sys.argv[0] or "."))))
+        nom = f"{seance}-{script}" if seance.startswith("seance") else script
+        os.makedirs(DOSSIER_TRACES, exist_ok=True)
+        _ETAT["base"] = os.path.join(DOSSIER_TRACES, f"{nom}-{time.strftime('%Y%m%d-%H%M%S')}")
+    return _ETAT["base"]
+
+class Etape:
+    def __init__(self, nom, numero):
+        self.nom = nom
+        self.numero = numero
+        self.lignes = 0
+        self.profileur = None
+        if "memoire" in ACTIVE:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if "profil" in ACTIVE:
+            self.profileur = demarrer_profil()
+        self.cpu_enfants = cpu_enfants()
+        self.cpu = time.process_time()
+        self.debut = time.perf_counter()
+
+    def fermer(self):
+        duree = time.perf_counter() - self.debut
+        trace = {
+            "numero": self.numero,
+            "etape": self.nom,
+            "duree_s": duree,
+            "cpu_s": time.process_time() - self.cpu,
+            "cpu_enfants_s": cpu_enfants() - self.cpu_enfants,
+            "lignes": self.lignes or None,
+            "lignes_par_s": self.lignes / duree if self.lignes and duree > 0 else None,
+            "rss_mo": rss_actuelle(),
+            "rss_pic_mo": rss_pic(),
+            "python_pic_mo": None,
+        }
+        if "memoire" in ACTIVE:
+            import tracemalloc
+            trace["python_pic_mo"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        if self.profileur is not None:
+            arreter_profil(self.profileur, f"{base_traces()}-{self.numero:02d}")
+        return trace
+
+# Profileur d'une étape : pyinstrument si demandé et installé, cProfile sinon
+def demarrer_profil():
+    if PROFILEUR == "pyinstrument":
+        try:
+            import pyinstrument
+        except ImportError:
+            pass
+        else:
+            profileur = pyinstrument.Profiler()
+            profileur.start()
+            return profileur
+    import cProfile
+    profileur = cProfile.Profile()
+    profileur.enable()
+    return profileur
+
+def arreter_profil(profileur, chemin):
+    if hasattr(profileur, "disable"):
+        profileur.disable()
+        profileur.dump_stats(chemin + ".prof")
+    else:
+        profileur.stop()
+        with open(chemin + ".html", "w", encoding="utf-8") as fichier:
+            fichier.write(profileur.output_html())
+
+def fermer_courante():
+    courante = _ETAT["courante"]
+    if courante is None:
+        return
+    _ETAT["courante"] = None
+    trace = courante.fermer()
+    _ETAT["traces"].append(trace)
+    with open(base_traces() + ".jsonl", "a", encoding="utf-8") as fichier:
+        fichier.write(json.dumps(trace, ensure_ascii=False) + "\n")
+
+# Fonction pour ouvrir une étape (la précédente est fermée)
+def etape(nom):
+    if not ACTIVE:
+        return
+    fermer_courante()
+    _ETAT["courante"] = Etape(nom, len(_ETAT["traces"]) + 1)
+
+# Fonction pour compter les lignes traitées par l'étape en cours
+def compter(n):
+    if ACTIVE and _ETAT["courante"] is not None:
+        _ETAT["courante"].lignes += int(n)
+
+# Fonction pour mesurer fonction() comme une étape : mêmes mesures que etape() (temps, mémoire,
+# profil) et compter() s'applique à cette étape pendant l'appel. Renvoie (résultat, trace) ; trace
+# vaut None si l'instrumentation est désactivée
+def mesurer(nom, numero, fonction, *args, **kwargs):
+    if not ACTIVE:
+        return fonction(*args, **kwargs), None
+    precedente = _ETAT["courante"]
+    _ETAT["courante"] = Etape(nom, numero)
+    try:
+        resultat = fonction(*args, **kwargs)
+    finally:
+        courante, _ETAT["courante"] = _ETAT["courante"], precedente
+        # profil arrêté même en cas d'erreur
+        trace = courante.fermer()
+    return resultat, trace
+
+# Fonction pour enregistrer la trace d'une étape mesurée par mesurer() (ex. dans un processus du pool)
+def ajouter_trace(trace):
+    if not ACTIVE or trace is None:
+        return
+    _ETAT["traces"].append(trace)
+    with open(base_traces() + ".jsonl", "a", encoding="utf-8") as fichier:
+        fichier.write(json.dumps(trace, ensure_ascii=False) + "\n")
+
+# Valeur d'une cellule du récapitulatif (séparateur ";" comme les exports CSV des séances)
+def cellule(valeur):
+    if valeur is None:
+        return ""
+    if isinstance(valeur, float):
+        return f"{valeur:.6g}"
+    return re.sub(r"[;\n]", " ", str(valeur))
+
+# Fonction de fin : dernière étape fermée, récapitulatif CSV et affichage
+def terminer():
+    fermer_courante()
+    if not _ETAT["traces"]:
+        return
+    with open(base_traces() + ".csv", "w", encoding="utf-8") as fichier:
+        fichier.write(";".join(COLONNES) + "\n")
+        for trace in _ETAT["traces"]:
+            fichier.write(";".join(cellule(trace[c]) for c in COLONNES) + "\n")
+    print(f"\nInstrumentation ({', '.join(sorted(ACTIVE))}) - traces dans {base_traces()}.jsonl / .csv")
+    for trace in _ETAT["traces"]:
+        pic = trace["rss_pic_mo"]
+        print(f"{trace['etape'][:50]:50} {trace['duree_s']:8.3f} s  CPU {trace['cpu_s']:8.3f} s"
+              + (f"  RSS pic {pic:8.1f} Mo" if pic is not None else ""))
+
+if ACTIVE:
+    atexit.register(terminer)
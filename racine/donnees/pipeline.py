@@ -0,0 +1,301 @@
+#coding:utf8
+
+# Exécution d'un script comme un graphe d'étapes (DAG) déclarées avec leurs entrées et leurs sorties
+# ETAPES = {
+#     "resultats": {"fonction": lire, "fichiers": ["data/resultats.csv"]},
+#     "parametres": {"fonction": parametres, "entrees": ["resultats"], "environnement": ["MODE_FLUX"]},
+#     "boxplots": {"fonction": boxplots, "entrees": ["resultats"], "sorties": ["img/boxplot_Inscrits.png"]},
+# }
+# executer(ETAPES, workers=4)
+# - fonction : fonction nommée (pas de lambda), appelée avec le résultat de chaque étape de "entrees"
+#   (argument du même nom) et les valeurs de "parametres"
+# - fichiers : fichiers lus par l'étape ; sorties : fichiers produits (étape relancée s'ils manquent)
+# - environnement : variables d'environnement dont dépend l'étape
+# - principal : True pour une étape qui lance elle-même ses processus (ex. ajustement des lois) ;
+#   exécutée dans le processus principal quand aucune étape ne tourne dans le pool, pour ne pas
+#   avoir plus de processus actifs que de cœurs
+# Les étapes dont les entrées sont prêtes sont lancées en parallèle dans un pool de processus (fork).
+# Le résultat de chaque étape et ce qu'elle affiche sont mis en cache (cache/etapes/), avec une clé
+# calculée à partir du code de la fonction (avec les fonctions du script qu'elle appelle et les
+# constantes qu'elle lit), des modules du projet (src/ et donnees/), des paramètres, des fichiers lus
+# (taille et date), des variables d'environnement et des clés des étapes amont : une étape n'est
+# recalculée que si l'un de ces éléments change. Une exécution interrompue reprend donc à partir des étapes non terminées.
+# PIPELINE_CACHE=0 désactive le cache ; FORCER="etape1,etape2" recalcule ces étapes et leurs descendantes.
+
+import io
+import os
+import sys
+import time
+import pickle
+import hashlib
+import inspect
+import traceback
+import contextlib
+import multiprocessing
+import concurrent.futures
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentation
+
+DOSSIER_CACHE = os.path.join("cache", "etapes")
+
+# Fonction pour vérifier le graphe et renvoyer les étapes dans un ordre compatible avec les dépendances
+# (ordre de déclaration conservé autant que possible)
+def ordre_topologique(etapes):
+    for nom, etape in etapes.items():
+        inconnues = [e for e in etape.get("entrees", []) if e not in etapes]
+        if inconnues:
+            raise ValueError(f"Étape {nom} : entrées inconnues {', '.join(inconnues)}")
+    ordre, places = [], set()
+    while len(ordre) < len(etapes):
+        prets = [n for n in etapes if n not in places and all(e in places for e in etapes[n].get("entrees", []))]
+        if not prets:
+            raise ValueError(f"Dépendances circulaires entre : {', '.join(n for n in etapes if n not in places)}")
+        ordre.extend(prets)
+        places.update(prets)
+    return ordre
+
+# Noms globaux lus par un code (fonctions imbriquées et compréhensions comprises)
+def noms_globaux(code):
+    noms = set(code.co_names)
+    for constante in code.co_consts:
+        if inspect.iscode(constante):
+            noms |= noms_globaux(constante)
+    return noms
+
+def source(objet):
+    try:
+        return inspect.getsource(objet)
+    except (OSError, TypeError):
+        code = getattr(objet, "__code__", None)
+        return repr(code.co_code) if code is not None else repr(objet)
+
+# Fonction pour l'empreinte du code d'une fonction : sa source, celle des fonctions et classes du
+# même script qu'elle utilise (récursivement) et la valeur des variables globales qu'elle lit
+# (constantes du script : listes de colonnes, dossiers...). Les modules importés sont couverts par
+# empreinte_modules
+def empreinte_code(fonction, vues=None):
+    vues = set() if vues is None else vues
+    vues.add(id(fonction))
+    parties = [source(fonction)]
+    code = getattr(fonction, "__code__", None)
+    globaux = getattr(fonction, "__globals__", {})
+    for nom in sorted(noms_globaux(code)) if code is not None else []:
+        if nom not in globaux or inspect.ismodule(globaux[nom]):
+            continue
+        valeur = globaux[nom]
+        if inspect.isfunction(valeur) or inspect.isclass(valeur):
+            if getattr(valeur, "__module__", None) == getattr(fonction, "__module__", None) and id(valeur) not in vues:
+                parties.append((nom, empreinte_code(valeur, vues)))
+            continue
+        parties.append((nom, empreinte_valeur(valeur)))
+    return parties
+
+# Fonction pour l'empreinte des modules du projet : contenu des fichiers .py du dossier du script
+# (modules de src/, hors script lui-même) et du paquet donnees. Modifier un module importé
+# invalide toutes les étapes du script
+def empreinte_modules(fonction):
+    try:
+        script = os.path.abspath(inspect.getsourcefile(fonction))
+    except TypeError:
+        return None
+    empreinte = hashlib.sha1()
+    for dossier in (os.path.dirname(script), os.path.dirname(os.path.abspath(__file__))):
+        for nom in sorted(os.listdir(dossier)):
+            chemin = os.path.join(dossier, nom)
+            if nom.endswith(".py") and chemin != script:
+                with open(chemin, "rb") as fichier:
+                    empreinte.update(chemin.encode() + b"\0" + fichier.read())
+    return empreinte.hexdigest()
+
+# Fonction pour l'empreinte d'un fichier lu : taille et date de modification (absent : None)
+def empreinte_fichier(chemin):
+    try:
+        stat = os.stat(chemin)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+# Fonction pour l'empreinte d'un paramètre : contenu des tableaux et des tables, nom et paramètres
+# des lois gelées de scipy.stats (leur générateur aléatoire n'entre pas dans la clé), repr sinon
+def empreinte_valeur(valeur):
+    if isinstance(valeur, np.ndarray):
+        return ("tableau", valeur.dtype.str, valeur.shape, hashlib.sha1(np.ascontiguousarray(valeur).tobytes()).hexdigest())
+    if isinstance(valeur, (pd.DataFrame, pd.Series)):
+        contenu = pd.util.hash_pandas_object(valeur, index=True).to_numpy()
+        colonnes = list(map(str, valeur.columns)) if isinstance(valeur, pd.DataFrame) else valeur.name
+        return ("table", colonnes, hashlib.sha1(contenu.tobytes()).hexdigest())
+    if isinstance(valeur, (list, tuple)):
+        return (type(valeur).__name__, [empreinte_valeur(v) for v in valeur])
+    if isinstance(valeur, dict):
+        return ("dict", sorted((repr(k), empreinte_valeur(v)) for k, v in valeur.items()))
+    if hasattr(valeur, "dist") and hasattr(valeur, "args") and hasattr(valeur, "kwds"):
+        return ("loi", valeur.dist.name, empreinte_valeur(valeur.args), empreinte_valeur(valeur.kwds))
+    # fonctions et classes : nom qualifié (le repr contient une adresse, différente à chaque exécution)
+    if inspect.isfunction(valeur) or inspect.isclass(valeur) or inspect.isbuiltin(valeur):
+        return ("fonction", getattr(valeur, "__module__", None), valeur.__qualname__)
+    return repr(valeur)
+
+# Fonction pour la clé de cache d'une étape
+def cle_etape(nom, etape, cles_amont):
+    description = [
+        nom,
+        empreinte_code(etape["fonction"]),
+        empreinte_modules(etape["fonction"]),
+        empreinte_valeur(etape.get("parametres", {})),
+        [(e, cles_amont[e]) for e in etape.get("entrees", [])],
+        [(f, empreinte_fichier(f)) for f in etape.get("fichiers", [])],
+        [(v, os.environ.get(v)) for v in etape.get("environnement", [])],
+    ]
+    return hashlib.sha1(repr(description).encode()).hexdigest()[:20]
+
+def chemin_cache(dossier, nom, cle):
+    return os.path.join(dossier, f"{nom}-{cle}.pkl")
+
+def lire_cache(dossier, nom, cle):
+    try:
+        with open(chemin_cache(dossier, nom, cle), "rb") as fichier:
+            return pickle.load(fichier)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+# Ecriture atomique du résultat et de l'affichage d'une étape ; anciennes entrées de l'étape supprimées
+def ecrire_cache(dossier, nom, cle, contenu):
+    os.makedirs(dossier, exist_ok=True)
+    chemin = chemin_cache(dossier, nom, cle)
+    with open(chemin + ".tmp", "wb") as fichier:
+        pickle.dump(contenu, fichier, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(chemin + ".tmp", chemin)
+    # anciennes entrées de cette étape seulement : "a-<clé>.pkl" mais pas "a-b-<clé>.pkl" (étape a-b)
+    for element in os.listdir(dossier):
+        if element.endswith(".pkl") and element.rsplit("-", 1)[0] == nom and element != os.path.basename(chemin):
+            os.remove(os.path.join(dossier, element))
+
+# Copie de l'affichage vers la sortie standard et un tampon (exécution dans le processus principal)
+class Double(io.StringIO):
+    def __init__(self, sortie):
+        super().__init__()
+        self.sortie = sortie
+
+    def write(self, texte):
+        self.sortie.write(texte)
+        return super().write(texte)
+
+# Fonction exécutée pour une étape (dans un processus du pool ou dans le processus principal)
+# L'étape est mesurée par instrumentation.mesurer (INSTRUMENTATION : temps, mémoire, profil, lignes
+# comptées par compter() dans la fonction de l'étape)
+# Renvoie (résultat, affichage, mesures, trace) ou lève l'exception de l'étape avec son affichage
+def executer_etape(nom, numero, fonction, arguments, en_direct=False):
+    tampon = Double(sys.stdout) if en_direct else io.StringIO()
+    debut = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(tampon):
+            resultat, trace = instrumentation.mesurer(nom, numero, fonction, **arguments)
+    except Exception as erreur:
+        raise RuntimeError(tampon.getvalue() + traceback.format_exc()) from erreur
+    return resultat, tampon.getvalue(), {"duree_s": time.perf_counter() - debut}, trace
+
+# Fonction principale : exécute les étapes et renvoie le résultat de chacune
+# (lu dans le cache pour les étapes non recalculées)
+# Une étape en échec n'arrête pas les étapes indépendantes ; ses descendantes sont annulées et une
+# RuntimeError est levée à la fin. Les étapes terminées restent en cache pour la reprise.
+def executer(etapes, workers=1, dossier_cache=DOSSIER_CACHE, utiliser_cache=None, forcer=None):
+    if utiliser_cache is None:
+        utiliser_cache = os.environ.get("PIPELINE_CACHE", "1") != "0"
+    if forcer is None:
+        forcer = [f.strip() for f in os.environ.get("FORCER", "").split(",") if f.strip()]
+    ordre = ordre_topologique(etapes)
+    cles, forcees = {}, set(forcer)
+    for nom in ordre:
+        cles[nom] = cle_etape(nom, etapes[nom], cles)
+        if any(e in forcees for e in etapes[nom].get("entrees", [])):
+            forcees.add(nom)
+
+    resultats, echecs, annulees = {}, {}, []
+    en_attente, en_cours = list(ordre), {}
+    debut = time.perf_counter()
+
+    def terminer(nom, resultat, affichage, mesures, trace, depuis_cache):
+        resultats[nom] = resultat
+        etat = "en cache" if depuis_cache else f"{mesures['duree_s']:.2f} s"
+        if depuis_cache or not en_direct:
+            print(f"\n=== {nom} ({etat}) ===")
+            print(affichage, end="")
+        else:
+            print(f"=== {nom} terminée ({etat}) ===")
+        if not depuis_cache:
+            instrumentation.ajouter_trace(trace)
+            if utiliser_cache:
+                ecrire_cache(dossier_cache, nom, cles[nom], (resultat, affichage))
+
+    def echouer(nom, erreur):
+        echecs[nom] = erreur
+        print(f"\n=== {nom} : ÉCHEC ===\n{erreur}", file=sys.stderr)
+
+    # numéro d'étape (fichiers de profil) et préfixe des traces fixé avant de créer les processus
+    numeros = {nom: i + 1 for i, nom in enumerate(ordre)}
+    if instrumentation.ACTIVE:
+        instrumentation.base_traces()
+
+    # fork : les fonctions du script principal sont disponibles dans les processus sans réimport
+    en_direct = workers <= 1 or "fork" not in multiprocessing.get_all_start_methods()
+    pool = None if en_direct else concurrent.futures.ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("fork"))
+    try:
+        while en_attente or en_cours:
+            for nom in list(en_attente):
+                entrees = etapes[nom].get("entrees", [])
+                if any(e in echecs or e in annulees for e in entrees):
+                    en_attente.remove(nom)
+                    annulees.append(nom)
+                    continue
+                if not all(e in resultats for e in entrees):
+                    continue
+                sorties_presentes = all(os.path.exists(s) for s in etapes[nom].get("sorties", []))
+                cache = lire_cache(dossier_cache, nom, cles[nom]) if utiliser_cache and nom not in forcees \
+                    and sorties_presentes else None
+                principal = not en_direct and etapes[nom].get("principal", False)
+                if cache is None and principal and en_cours:
+                    # étape qui lance ses propres processus : attendre que le pool soit libre
+                    continue
+                en_attente.remove(nom)
+                if cache is not None:
+                    terminer(nom, cache[0], cache[1], None, None, True)
+                    continue
+                arguments = dict(etapes[nom].get("parametres", {}))
+                arguments.update({e: resultats[e] for e in entrees})
+                if en_direct:
+                    print(f"\n=== {nom} ===")
+                    try:
+                        terminer(nom, *executer_etape(nom, numeros[nom], etapes[nom]["fonction"], arguments, True),
+                                 False)
+                    except RuntimeError as erreur:
+                        echouer(nom, str(erreur))
+                elif principal:
+                    try:
+                        terminer(nom, *executer_etape(nom, numeros[nom], etapes[nom]["fonction"], arguments), False)
+                    except RuntimeError as erreur:
+                        echouer(nom, str(erreur))
+                else:
+                    en_cours[pool.submit(executer_etape, nom, numeros[nom], etapes[nom]["fonction"], arguments)] = nom
+            if not en_cours:
+                continue
+            faits, _ = concurrent.futures.wait(en_cours, return_when=concurrent.futures.FIRST_COMPLETED)
+            for futur in faits:
+                nom = en_cours.pop(futur)
+                try:
+                    terminer(nom, *futur.result(), False)
+                except Exception as erreur:
+                    echouer(nom, str(erreur))
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    print(f"\n{len(resultats)} étape(s) terminée(s) en {time.perf_counter() - debut:.2f} s"
+          + (f", {len(echecs)} en échec, {len(annulees)} annulée(s)" if echecs or annulees else ""))
+    if echecs:
+        raise RuntimeError(f"Étapes en échec : {', '.join(echecs)}"
+                           + (f" (annulées : {', '.join(annulees)})" if annulees else ""))
+    return resultats
@@ -0,0 +1,366 @@
+#coding:utf8
+
+# Rééchantillonnage : intervalles de confiance par bootstrap (percentile, BCa) et p-valeurs par
+# permutations, pour les statistiques des séances (fréquences, moyenne, médiane, IQR, rho de
+# Spearman, tau-b de Kendall)
+# Un rééchantillon bootstrap est représenté par les effectifs de tirage de chaque valeur distincte
+# (tirage multinomial), et chaque statistique est évaluée sur un lot de rééchantillons d'un coup :
+# evaluer(contexte, poids) avec poids de forme (lot, valeurs distinctes). Les données sont résumées
+# une fois (valeurs distinctes et effectifs) : le coût dépend du nombre de valeurs distinctes, pas
+# du nombre de lignes (ex. 10^5 réponses Pour / Contre / Sans opinion = 3 valeurs).
+# Le jackknife du BCa (accélération) réutilise les mêmes fonctions avec les poids « effectifs moins
+# un ». Chaque lot a son propre flux aléatoire (SeedSequence.spawn) : le résultat ne dépend que de
+# la graine, pas du nombre de processus.
+
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+TAILLE_LOT = 4_000_000
+# Kendall : matrice des signes (valeurs distinctes x valeurs distinctes)
+LIMITE_KENDALL = 5000
+# Jackknife : au-delà, jackknife par NB_GROUPES_JACKKNIFE groupes de valeurs distinctes
+LIMITE_JACKKNIFE = 2000
+NB_GROUPES_JACKKNIFE = 200
+
+# Etape 1 - Statistiques pondérées, évaluées sur un lot de rééchantillons
+# contexte : préparé une fois à partir des valeurs distinctes ; poids : (lot, valeurs distinctes)
+
+def preparer_valeurs(valeurs):
+    return {"valeurs": np.asarray(valeurs, dtype=np.float64)}
+
+def moyenne(contexte, poids):
+    return poids @ contexte["valeurs"] / poids.sum(axis=1)
+
+# Fréquence de chaque valeur distincte (modalité, texte ou nombre) : résultat de forme (lot, modalités)
+def preparer_modalites(valeurs):
+    return {"valeurs": np.asarray(valeurs)}
+
+def frequences(contexte, poids):
+    return poids / poids.sum(axis=1, keepdims=True)
+
+# Valeurs distinctes déjà triées par resumer() : pas de réordonnancement des poids
+def preparer_tri(valeurs):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    if np.all(valeurs[1:] >= valeurs[:-1]):
+        return {"valeurs": valeurs, "ordre": None}
+    ordre = np.argsort(valeurs, kind="stable")
+    return {"valeurs": valeurs[ordre], "ordre": ordre}
+
+# Quantiles pondérés, interpolation linéaire comme np.quantile et pandas : la valeur de rang i
+# (0 <= i < effectif) est la première valeur triée dont l'effectif cumulé dépasse i. Les effectifs
+# cumulés de chaque ligne sont décalés pour former une seule suite croissante (une recherche
+# dichotomique pour tout le lot)
+def quantiles(contexte, poids, probabilites):
+    cumul = np.cumsum(poids if contexte["ordre"] is None else poids[:, contexte["ordre"]], axis=1)
+    total = cumul[:, -1]
+    lignes, m = cumul.shape
+    decalage = np.arange(lignes) * (total.max() + 1)
+    suite = (cumul + decalage[:, None]).ravel()
+    def valeur(rang):
+        return contexte["valeurs"][np.searchsorted(suite, rang + decalage, side="right") - np.arange(lignes) * m]
+    resultat = []
+    for q in probabilites:
+        rang = q * (total - 1)
+        bas = np.floor(rang)
+        v_bas, v_haut = valeur(bas), valeur(np.minimum(bas + 1, total - 1))
+        resultat.append(v_bas + (v_haut - v_bas) * (rang - bas))
+    return resultat
+
+def mediane(contexte, poids):
+    return quantiles(contexte, poids, [0.5])[0]
+
+def iqr(contexte, poids):
+    q1, q3 = quantiles(contexte, poids, [0.25, 0.75])
+    return q3 - q1
+
+# Couples (x, y) : groupes d'ex aequo de chaque variable
+def groupes_ex_aequo(valeurs):
+    ordre = np.argsort(valeurs, kind="stable")
+    tries = valeurs[ordre]
+    debuts = np.flatnonzero(np.concatenate([[True], tries[1:] != tries[:-1]]))
+    groupe = np.empty(len(valeurs), dtype=np.int64)
+    groupe[ordre] = np.cumsum(np.concatenate([[True], tries[1:] != tries[:-1]])) - 1
+    return {"ordre": ordre, "debuts": debuts, "groupe": groupe}
+
+def preparer_couples(valeurs):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    return {"x": groupes_ex_aequo(valeurs[:, 0]), "y": groupes_ex_aequo(valeurs[:, 1])}
+
+# Rangs moyens (ex aequo) de chaque valeur distincte dans chaque rééchantillon pondéré,
+# et effectifs des groupes d'ex aequo
+def rangs_ponderes(groupes, poids):
+    effectifs = np.add.reduceat(poids[:, groupes["ordre"]], groupes["debuts"], axis=1)
+    rangs_groupes = np.cumsum(effectifs, axis=1) - effectifs + (effectifs + 1) / 2
+    return rangs_groupes[:, groupes["groupe"]], effectifs
+
+# Spearman : corrélation de Pearson pondérée des rangs moyens (comme scipy.stats.spearmanr)
+def spearman(contexte, poids):
+    total = poids.sum(axis=1, keepdims=True)
+    rx, _ = rangs_ponderes(contexte["x"], poids)
+    ry, _ = rangs_ponderes(contexte["y"], poids)
+    # le rang moyen vaut toujours (n + 1) / 2
+    rx -= (total + 1) / 2
+    ry -= (total + 1) / 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (poids * rx * ry).sum(axis=1) / np.sqrt((poids * rx ** 2).sum(axis=1) * (poids * ry ** 2).sum(axis=1))
+
+def preparer_kendall(valeurs):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    if len(valeurs) > LIMITE_KENDALL:
+        raise ValueError(f"Kendall : plus de {LIMITE_KENDALL} couples distincts, utiliser Spearman")
+    contexte = preparer_couples(valeurs)
+    signes = [np.sign(v[:, None] - v[None, :]) for v in (valeurs[:, 0], valeurs[:, 1])]
+    contexte["signes"] = signes[0] * signes[1]
+    return contexte
+
+# Tau-b de Kendall (comme scipy.stats.kendalltau) : concordances moins discordances sur toutes les
+# paires d'individus, ex aequo comptés dans chaque groupe de valeurs égales (copies comprises)
+def kendall(contexte, poids):
+    total = poids.sum(axis=1)
+    difference = ((poids @ contexte["signes"]) * poids).sum(axis=1) / 2
+    paires = total * (total - 1) / 2
+    _, ex_x = rangs_ponderes(contexte["x"], poids)
+    _, ex_y = rangs_ponderes(contexte["y"], poids)
+    liees_x = (ex_x * (ex_x - 1) / 2).sum(axis=1)
+    liees_y = (ex_y * (ex_y - 1) / 2).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return difference / np.sqrt((paires - liees_x) * (paires - liees_y))
+
+# nom -> (préparation du contexte, évaluation)
+STATISTIQUES = {
+    "moyenne": (preparer_valeurs, moyenne),
+    "frequences": (preparer_modalites, frequences),
+    "mediane": (preparer_tri, mediane),
+    "iqr": (preparer_tri, iqr),
+    "spearman": (preparer_couples, spearman),
+    "kendall": (preparer_kendall, kendall),
+}
+
+# Etape 2 - Données résumées et lots de rééchantillons
+
+# Fonction pour résumer les données : valeurs distinctes (ou couples distincts) et effectifs
+# Les lignes incomplètes sont écartées. valeurs : modalités ou nombres ; couples : tableau (n, 2)
+def resumer(donnees, effectifs=None):
+    if effectifs is not None:
+        return np.asarray(donnees), np.asarray(effectifs, dtype=np.int64)
+    donnees = np.asarray(donnees)
+    if donnees.dtype.kind == "f":
+        complets = ~np.isnan(donnees).reshape(len(donnees), -1).any(axis=1)
+        donnees = donnees[complets]
+    if donnees.ndim == 1:
+        return np.unique(donnees, return_counts=True)
+    return np.unique(donnees, axis=0, return_counts=True)
+
+def verifier_statistique(statistique):
+    if statistique not in STATISTIQUES:
+        raise ValueError(f"Statistique inconnue : {statistique} (disponibles : {', '.join(STATISTIQUES)})")
+    return STATISTIQUES[statistique]
+
+# Contexte partagé avec les processus du pool (transmis une fois par processus)
+_CONTEXTE = {}
+
+def initialiser(statistique, valeurs, effectifs):
+    preparer, evaluer = STATISTIQUES[statistique]
+    _CONTEXTE.update(evaluer=evaluer, contexte=preparer(valeurs), effectifs=effectifs)
+
+# Fonction pour tirer un lot de rééchantillons : effectifs de tirage de chaque valeur distincte
+# (multinomial si peu de valeurs distinctes, indices tirés puis comptés sinon)
+def multinomial(effectifs):
+    return len(effectifs) * 8 <= effectifs.sum()
+
+def tirer_poids(generateur, effectifs, taille):
+    n = int(effectifs.sum())
+    m = len(effectifs)
+    if multinomial(effectifs):
+        return generateur.multinomial(n, effectifs / n, size=taille).astype(np.float64)
+    # individu tiré -> valeur distincte (table de n entiers, inutile si toutes les valeurs sont distinctes)
+    cellules = generateur.integers(0, n, size=(taille, n))
+    if m < n:
+        cellules = np.repeat(np.arange(m), effectifs)[cellules]
+    cellules += (np.arange(taille) * m)[:, None]
+    return np.bincount(cellules.ravel(), minlength=taille * m).reshape(taille, m).astype(np.float64)
+
+def evaluer_lot(arguments):
+    graine, taille = arguments
+    poids = tirer_poids(np.random.default_rng(graine), _CONTEXTE["effectifs"], taille)
+    return _CONTEXTE["evaluer"](_CONTEXTE["contexte"], poids)
+
+# Fonction pour découper un calcul en lots (graines indépendantes) et l'exécuter, éventuellement
+# réparti entre plusieurs processus ; les lots sont concaténés dans l'ordre
+def executer_lots(fonction, nb, taille_lot, graine, workers, initialisation):
+    tailles = [min(taille_lot, nb - debut) for debut in range(0, nb, taille_lot)]
+    taches = list(zip(np.random.SeedSequence(graine).spawn(len(tailles)), tailles))
+    if workers <= 1 or len(taches) == 1:
+        initialisation[0](*initialisation[1])
+        return np.concatenate(list(map(fonction, taches)))
+    methode = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    with multiprocessing.get_context(methode).Pool(min(workers, len(taches)), initializer=initialisation[0],
+                                                   initargs=initialisation[1]) as pool:
+        return np.concatenate(pool.map(fonction, taches))
+
+def taille_lot_par_defaut(colonnes):
+    return max(1, TAILLE_LOT // max(colonnes, 1))
+
+# Etape 3 - Bootstrap
+
+# Fonction pour les réplicats bootstrap : tableau (nb_reechantillons,) ou (nb_reechantillons, modalités)
+def replicats_bootstrap(valeurs, effectifs, statistique, nb_reechantillons=10_000, graine=0, workers=1,
+                        taille_lot=None):
+    verifier_statistique(statistique)
+    # lot en mémoire : poids (lot, valeurs distinctes), plus les indices tirés (lot, n) hors multinomial
+    taille_lot = taille_lot or taille_lot_par_defaut(len(effectifs) if multinomial(effectifs) else int(effectifs.sum()))
+    return executer_lots(evaluer_lot, nb_reechantillons, taille_lot, graine, workers,
+                         (initialiser, (statistique, valeurs, effectifs)))
+
+# Fonction pour l'accélération du BCa : jackknife (une valeur distincte retirée à la fois, ou un
+# groupe de valeurs distinctes au-delà de LIMITE_JACKKNIFE), pondéré par les effectifs retirés
+def acceleration(valeurs, effectifs, statistique, graine=0):
+    preparer, evaluer = STATISTIQUES[statistique]
+    contexte = preparer(valeurs)
+    m = len(effectifs)
+    if m <= LIMITE_JACKKNIFE:
+        # une copie de la valeur retirée ; réplicat compté autant de fois que la valeur est présente
+        groupes, retraits = np.arange(m), np.ones(m)
+        retires = effectifs.astype(np.float64)
+    else:
+        # groupes de valeurs distinctes (tous non vides) retirés entièrement
+        groupes = np.empty(m, dtype=np.int64)
+        groupes[np.random.default_rng(graine).permutation(m)] = np.arange(m) % NB_GROUPES_JACKKNIFE
+        retraits, retires = effectifs.astype(np.float64), np.ones(NB_GROUPES_JACKKNIFE)
+    taille = taille_lot_par_defaut(m)
+    jackknife = []
+    for debut in range(0, len(retires), taille):
+        fin = min(debut + taille, len(retires))
+        poids = np.tile(effectifs.astype(np.float64), (fin - debut, 1))
+        colonnes = np.flatnonzero((groupes >= debut) & (groupes < fin))
+        poids[groupes[colonnes] - debut, colonnes] -= retraits[colonnes]
+        jackknife.append(evaluer(contexte, poids))
+    jackknife = np.concatenate(jackknife)
+    retires = retires.reshape((-1,) + (1,) * (jackknife.ndim - 1))
+    ecarts = (retires * jackknife).sum(axis=0) / retires.sum(axis=0) - jackknife
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (retires * ecarts ** 3).sum(axis=0) / (6 * (retires * ecarts ** 2).sum(axis=0) ** 1.5)
+
+# Fonction principale : estimation, erreur type, biais et intervalle de confiance
+# donnees : valeurs (nombres ou modalités) ou couples (n, 2) ; effectifs : données déjà résumées
+# (ex. modalités et effectifs d'un échantillon) ; methode : "percentile" ou "bca"
+# Une ligne par statistique (par modalité pour "frequences")
+def intervalle_bootstrap(donnees, statistique="moyenne", effectifs=None, niveau=0.95, methode="bca",
+                         nb_reechantillons=10_000, graine=0, workers=1, taille_lot=None):
+    preparer, evaluer = verifier_statistique(statistique)
+    if methode not in ("percentile", "bca"):
+        raise ValueError(f"Méthode d'intervalle bootstrap inconnue : {methode} (disponibles : percentile, bca)")
+    valeurs, effectifs = resumer(donnees, effectifs)
+    estimation = evaluer(preparer(valeurs), effectifs[None, :].astype(np.float64))[0]
+    replicats = replicats_bootstrap(valeurs, effectifs, statistique, nb_reechantillons, graine, workers, taille_lot)
+    alpha = np.array([(1 - niveau) / 2, 1 - (1 - niveau) / 2])
+    if methode == "bca":
+        # correction de biais : part des réplicats inférieurs à l'estimation (ex aequo pour moitié)
+        z0 = ndtri((replicats < estimation).mean(axis=0) + (replicats == estimation).mean(axis=0) / 2)
+        a = acceleration(valeurs, effectifs, statistique, graine)
+        z = ndtri(alpha).reshape((2,) + (1,) * np.ndim(z0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corriges = ndtr(z0 + (z0 + z) / (1 - a * (z0 + z)))
+        # distribution bootstrap dégénérée (ex. médiane d'entiers, toujours égale) : percentile
+        alpha = np.where(np.isfinite(corriges), corriges, alpha.reshape(z.shape))
+    # une colonne par modalité pour "frequences", une seule sinon
+    colonnes = replicats.reshape(len(replicats), -1)
+    niveaux = np.broadcast_to(np.reshape(alpha, (2, -1)), (2, colonnes.shape[1]))
+    bornes = np.array([[np.nanquantile(colonnes[:, j], niveaux[i, j]) for j in range(colonnes.shape[1])]
+                       for i in range(2)])
+    index = [str(v) for v in valeurs] if np.ndim(estimation) else [statistique]
+    return pd.DataFrame({
+        "Estimation": np.atleast_1d(estimation),
+        "Erreur type": np.atleast_1d(np.nanstd(replicats, axis=0, ddof=1)),
+        "Biais": np.atleast_1d(np.nanmean(replicats, axis=0) - estimation),
+        "Borne inf": np.atleast_1d(bornes[0]),
+        "Borne sup": np.atleast_1d(bornes[1]),
+    }, index=pd.Index(index, name=f"{statistique} ({methode}, {niveau:.0%})"))
+
+# Etape 4 - Tests par permutations (p-valeurs bilatérales, (1 + dépassements) / (1 + permutations))
+
+# Corrélation de rangs : les rangs (ex aequo compris) ne changent pas quand on permute y
+def initialiser_correlation(methode, x, y):
+    _CONTEXTE.clear()
+    _CONTEXTE["methode"] = methode
+    if methode == "spearman":
+        import scipy.stats
+        rx, ry = (scipy.stats.rankdata(v) for v in (x, y))
+        rx, ry = rx - rx.mean(), ry - ry.mean()
+        _CONTEXTE.update(rx=rx / np.sqrt((rx ** 2).sum()), ry=ry / np.sqrt((ry ** 2).sum()))
+    else:
+        _CONTEXTE.update(sx=np.sign(x[:, None] - x[None, :]), sy=np.sign(y[:, None] - y[None, :]))
+
+def correlation_permutee(arguments):
+    graine, taille = arguments
+    generateur = np.random.default_rng(graine)
+    if _CONTEXTE["methode"] == "spearman":
+        n = len(_CONTEXTE["ry"])
+        permutations = generateur.permuted(np.tile(np.arange(n), (taille, 1)), axis=1)
+        return _CONTEXTE["ry"][permutations] @ _CONTEXTE["rx"]
+    # Kendall : seul le numérateur (concordances - discordances) change, par lots de permutations
+    sx, sy = _CONTEXTE["sx"], _CONTEXTE["sy"]
+    n = len(sx)
+    permutations = generateur.permuted(np.tile(np.arange(n), (taille, 1)), axis=1)
+    return np.einsum("ij,bij->b", sx, sy[permutations[:, :, None], permutations[:, None, :]]) / 2
+
+# Fonction pour la p-valeur par permutations d'une corrélation de rangs (spearman ou kendall)
+# Renvoie (statistique, p-valeur) ; les lignes incomplètes sont écartées
+def permutation_correlation(x, y, methode="spearman", nb_permutations=10_000, graine=0, workers=1,
+                            taille_lot=None):
+    if methode not in ("spearman", "kendall"):
+        raise ValueError(f"Corrélation inconnue : {methode} (disponibles : spearman, kendall)")
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    complets = ~np.isnan(x) & ~np.isnan(y)
+    x, y = x[complets], y[complets]
+    n = len(x)
+    if methode == "kendall" and n > LIMITE_KENDALL:
+        raise ValueError(f"Kendall : plus de {LIMITE_KENDALL} couples, utiliser Spearman")
+    valeurs, effectifs = resumer(np.column_stack([x, y]))
+    preparer, evaluer = STATISTIQUES[methode]
+    statistique = float(evaluer(preparer(valeurs), effectifs[None, :].astype(np.float64))[0])
+    initialiser_correlation(methode, x, y)
+    if methode == "spearman":
+        observee = float(_CONTEXTE["rx"] @ _CONTEXTE["ry"])
+    else:
+        observee = float((_CONTEXTE["sx"] * _CONTEXTE["sy"]).sum() / 2)
+    taille_lot = taille_lot or taille_lot_par_defaut(n if methode == "spearman" else n * n)
+    permutees = executer_lots(correlation_permutee, nb_permutations, taille_lot, graine, workers,
+                              (initialiser_correlation, (methode, x, y)))
+    depassements = np.count_nonzero(np.abs(permutees) >= abs(observee) - 1e-12)
+    return statistique, (1 + depassements) / (1 + nb_permutations)
+
+# Deux échantillons : différence d'une statistique (moyenne, médiane, iqr) entre a et b
+def initialiser_deux_echantillons(statistique, valeurs, taille_a):
+    preparer, evaluer = STATISTIQUES[statistique]
+    _CONTEXTE.clear()
+    _CONTEXTE.update(evaluer=evaluer, contexte=preparer(valeurs), taille_a=taille_a)
+
+def difference_permutee(arguments):
+    graine, taille = arguments
+    n = len(_CONTEXTE["contexte"]["valeurs"])
+    permutations = np.random.default_rng(graine).permuted(np.tile(np.arange(n), (taille, 1)), axis=1)
+    dans_a = (permutations < _CONTEXTE["taille_a"]).astype(np.float64)
+    evaluer, contexte = _CONTEXTE["evaluer"], _CONTEXTE["contexte"]
+    return evaluer(contexte, dans_a) - evaluer(contexte, 1 - dans_a)
+
+# Fonction pour la p-valeur par permutations de la différence stat(a) - stat(b)
+# Renvoie (différence observée, p-valeur)
+def permutation_deux_echantillons(a, b, statistique="moyenne", nb_permutations=10_000, graine=0, workers=1,
+                                  taille_lot=None):
+    if statistique not in ("moyenne", "mediane", "iqr"):
+        raise ValueError(f"Statistique non prise en charge : {statistique} (disponibles : moyenne, mediane, iqr)")
+    a, b = (np.asarray(v, dtype=np.float64) for v in (a, b))
+    a, b = a[~np.isnan(a)], b[~np.isnan(b)]
+    valeurs = np.concatenate([a, b])
+    initialiser_deux_echantillons(statistique, valeurs, len(a))
+    dans_a = (np.arange(len(valeurs)) < len(a)).astype(np.float64)[None, :]
+    evaluer, contexte = _CONTEXTE["evaluer"], _CONTEXTE["contexte"]
+    observee = float((evaluer(contexte, dans_a) - evaluer(contexte, 1 - dans_a))[0])
+    differences = executer_lots(difference_permutee, nb_permutations, taille_lot or taille_lot_par_defaut(len(valeurs)),
+                                graine, workers, (initialiser_deux_echantillons, (statistique, valeurs, len(a))))
+    depassements = np.count_nonzero(np.abs(differences) >= abs(observee) - 1e-12)
+    return observee, (1 + depassements) / (1 + nb_permutations)
@@ -0,0 +1,123 @@
+#coding:utf8
+
+# Registre des jeux de données des séances : fichier source, options de lecture et schéma déclaré
+# - obligatoires : colonnes qui doivent figurer dans le fichier (sinon ValueError)
+# - types : type de chaque colonne connue ; les colonnes numériques sont converties avec
+#   pd.to_numeric (valeurs non numériques -> NaN), les autres avec astype
+# - lecteur : fonction (chemin, jeu) -> {nom de table: DataFrame} ; par défaut un CSV, une table
+# Tout changement du schéma change l'empreinte du jeu, donc la clé de son cache.
+
+import os
+import json
+
+import pandas as pd
+
+from .resultats import lire_resultats
+
+TABLE = "table"
+
+ANNEES_MONDE = range(2007, 2026)
+
+JEUX = {
+    "resultats_2022": {
+        "fichier": "resultats-elections-presidentielles-2022-1er-tour.csv",
+        # deux tables : "departements" et "candidats"
+        "lecteur": lire_resultats,
+    },
+    "island_index": {
+        "fichier": "island-index.csv",
+        # séparateur détecté à la lecture (fichier exporté avec "," ou ";")
+        "options": {"sep": "auto"},
+        "types": {"Surface (km²)": "float64", "Surface (km2)": "float64"},
+    },
+    "etats_du_monde": {
+        "fichier": "Le-Monde-HS-Etats-du-monde-2007-2025.csv",
+        "obligatoires": ["Code ISO_3", "État"],
+        "types": {
+            "Code ISO_3": "str", "Numéro": "int64", "Continent rattaché": "category",
+            "State": "str", "État": "str", "Superficie 2007": "float64", "Superficie 2012": "float64",
+            **{f"Pop {a}": "float64" for a in ANNEES_MONDE},
+            **{f"Densité {a}": "float64" for a in ANNEES_MONDE},
+        },
+    },
+    "echantillons_100": {
+        "fichier": "Echantillonnage-100-Echantillons.csv",
+        "obligatoires": ["Pour", "Contre", "Sans opinion"],
+        "types": {"Pour": "int64", "Contre": "int64", "Sans opinion": "int64"},
+    },
+    "population_reelle": {
+        "fichier": "Echantillonnage-Population-reelle.csv",
+        "options": {"header": None},
+    },
+    "loi_normale_test_1": {
+        "fichier": "Loi-normale-Test-1.csv",
+        "obligatoires": ["Test"],
+        "types": {"Test": "float64"},
+    },
+    "loi_normale_test_2": {
+        "fichier": "Loi-normale-Test-2.csv",
+        "obligatoires": ["Test"],
+        "types": {"Test": "float64"},
+    },
+}
+
+# Fonction pour retrouver un jeu du registre à partir du nom de son fichier (None si inconnu)
+def jeu_du_fichier(chemin):
+    nom_fichier = os.path.basename(chemin)
+    for nom, jeu in JEUX.items():
+        if jeu["fichier"] == nom_fichier:
+            return nom, jeu
+    return None
+
+# Fonction pour un jeu non déclaré : CSV lu avec les options par défaut, sans schéma
+def jeu_generique(chemin):
+    nom = os.path.splitext(os.path.basename(chemin))[0]
+    return nom, {"fichier": os.path.basename(chemin)}
+
+# Empreinte du schéma : options, colonnes obligatoires, types et lecteur
+def empreinte_schema(jeu):
+    lecteur = jeu.get("lecteur", lire_csv)
+    description = {
+        "options": {k: repr(v) for k, v in jeu.get("options", {}).items()},
+        "obligatoires": jeu.get("obligatoires", []),
+        "types": jeu.get("types", {}),
+        "lecteur": f"{lecteur.__module__}.{lecteur.__name__}",
+    }
+    return json.dumps(description, sort_keys=True, ensure_ascii=False)
+
+# Fonction pour appliquer les types déclarés aux colonnes présentes
+def appliquer_types(table, types):
+    for colonne, type_colonne in types.items():
+        if colonne not in table:
+            continue
+        if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(type_colonne)) and type_colonne != "bool":
+            valeurs = pd.to_numeric(table[colonne], errors="coerce")
+            if valeurs.isna().any() and type_colonne.startswith("int"):
+                # entiers avec valeurs manquantes : type entier à valeurs manquantes de pandas
+                type_colonne = type_colonne.capitalize()
+            table[colonne] = valeurs.astype(type_colonne)
+        else:
+            table[colonne] = table[colonne].astype(type_colonne)
+    return table
+
+# Fonction pour détecter le séparateur d'après la ligne d'en-tête (le plus fréquent, "," par défaut)
+def detecter_separateur(chemin, encoding, candidats=(",", ";", "\t", "|")):
+    with open(chemin, "r", encoding=encoding) as fichier:
+        entete = fichier.readline()
+    comptes = {s: entete.count(s) for s in candidats}
+    meilleur = max(comptes, key=comptes.get)
+    return meilleur if comptes[meilleur] else ","
+
+# Lecteur par défaut : un CSV (UTF-8, séparateur "," ou "auto"), une table, moteur C de pandas
+def lire_csv(chemin, jeu):
+    options = {"sep": ",", "encoding": "utf-8"}
+    options.update(jeu.get("options", {}))
+    if options["sep"] == "auto":
+        options["sep"] = detecter_separateur(chemin, options["encoding"])
+    table = pd.read_csv(chemin, engine="c", **options)
+    manquantes = [c for c in jeu.get("obligatoires", []) if c not in table.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes dans {chemin} : {', '.join(manquantes)}")
+    # noms de colonnes en texte (fichiers sans en-tête : 0, 1, ... -> "0", "1", ...)
+    table.columns = [str(c) for c in table.columns]
+    return {TABLE: appliquer_types(table, jeu.get("types", {}))}
@@ -0,0 +1,90 @@
+#coding:utf8
+
+# Lecture typée des résultats de l'élection présidentielle 2022 (1er tour)
+# Lecture avec le moteur C de pandas et un schéma explicite ; le fichier large (un bloc de colonnes
+# par candidat) donne deux tables : départements et candidats (format long).
+# La mise en cache est assurée par le registre (jeu "resultats_2022").
+
+import csv
+
+import numpy as np
+import pandas as pd
+
+# Schéma du fichier : colonnes fixes puis un bloc de 4 colonnes par candidat
+COLONNES_DEPARTEMENT = ["Code du département", "Libellé du département"]
+COLONNES_COMPTES = ["Inscrits", "Abstentions", "Votants", "Blancs", "Nuls", "Exprimés"]
+COLONNES_CANDIDAT = ["Sexe", "Nom", "Prénom", "Voix"]
+
+# Fonction pour lire l'en-tête et en déduire le nombre de blocs candidats
+def lire_entete(chemin):
+    with open(chemin, "r", encoding="utf-8", newline="") as fichier:
+        entete = next(csv.reader(fichier))
+    fixes = COLONNES_DEPARTEMENT + COLONNES_COMPTES
+    if entete[:len(fixes)] != fixes:
+        raise ValueError(f"En-tête inattendu dans {chemin} : {entete[:len(fixes)]}")
+    reste = entete[len(fixes):]
+    nb_candidats = len(reste) // len(COLONNES_CANDIDAT)
+    if reste != COLONNES_CANDIDAT * nb_candidats:
+        raise ValueError(f"Blocs candidats inattendus dans {chemin}")
+    return nb_candidats
+
+# Fonction pour lire le CSV avec le moteur C et un schéma explicite
+# Renvoie les tables "departements" et "candidats"
+def lire_resultats(chemin, jeu=None):
+    nb_candidats = lire_entete(chemin)
+    # noms uniques pour les blocs répétés (Sexe_0, Nom_0, ..., Voix_11)
+    noms_candidats = [f"{c}_{i}" for i in range(nb_candidats) for c in COLONNES_CANDIDAT]
+    dtypes = {c: "category" for c in COLONNES_DEPARTEMENT}
+    dtypes.update({c: np.int32 for c in COLONNES_COMPTES})
+    for i in range(nb_candidats):
+        dtypes.update({f"Sexe_{i}": str, f"Nom_{i}": str, f"Prénom_{i}": str, f"Voix_{i}": np.int32})
+    brut = pd.read_csv(
+        chemin, sep=",", quotechar='"', header=None, skiprows=1,
+        names=COLONNES_DEPARTEMENT + COLONNES_COMPTES + noms_candidats,
+        dtype=dtypes, engine="c", encoding="utf-8",
+    )
+    departements = brut[COLONNES_DEPARTEMENT + COLONNES_COMPTES]
+    return {"departements": departements, "candidats": mettre_en_long(brut, nb_candidats)}
+
+# Fonction pour transformer les blocs candidats en table longue (département, candidat, voix)
+def mettre_en_long(brut, nb_candidats):
+    n = len(brut)
+    # lecture ligne par ligne : les candidats d'un département sont contigus
+    def bloc(champ):
+        return brut[[f"{champ}_{i}" for i in range(nb_candidats)]].to_numpy().ravel()
+    long = pd.DataFrame({
+        "Code du département": pd.Categorical.from_codes(
+            np.repeat(brut["Code du département"].cat.codes.to_numpy(), nb_candidats),
+            brut["Code du département"].cat.categories),
+        "Libellé du département": pd.Categorical.from_codes(
+            np.repeat(brut["Libellé du département"].cat.codes.to_numpy(), nb_candidats),
+            brut["Libellé du département"].cat.categories),
+        "Sexe": pd.Categorical(bloc("Sexe")),
+        "Nom": pd.Categorical(bloc("Nom")),
+        "Prénom": pd.Categorical(bloc("Prénom")),
+        "Voix": bloc("Voix").astype(np.int32),
+    })
+    long.index = pd.RangeIndex(n * nb_candidats)
+    return long
+
+# Fonction pour reconstruire la table large du fichier (une ligne par département, un bloc
+# Sexe/Nom/Prénom/Voix par candidat) à partir des tables départements et candidats ; les blocs
+# répétés sont nommés comme à la lecture par pandas (Sexe, Nom, Prénom, Voix, Sexe.1, ..., Voix.11)
+def remettre_en_large(departements, candidats):
+    codes = candidats[COLONNES_DEPARTEMENT[0]].astype(str).to_numpy()
+    # rang du candidat dans son département (ordre des blocs du fichier)
+    rangs = candidats.groupby(codes, sort=False).cumcount().to_numpy()
+    nb_candidats = int(rangs.max()) + 1 if len(rangs) else 0
+    cles = departements[COLONNES_DEPARTEMENT[0]].astype(str).to_numpy()
+    if len(np.unique(cles)) != len(cles):
+        raise ValueError("Codes de département en double : une ligne par département attendue")
+    morceaux = [departements.reset_index(drop=True)]
+    for i in range(nb_candidats):
+        bloc = candidats.loc[rangs == i, COLONNES_CANDIDAT]
+        positions = pd.Index(codes[rangs == i]).get_indexer(cles)
+        if (positions < 0).any():
+            raise ValueError(f"Bloc candidat {i} absent pour les départements {', '.join(cles[positions < 0][:10])}")
+        bloc = bloc.iloc[positions].reset_index(drop=True)
+        bloc.columns = [f"{c}.{i}" if i else c for c in COLONNES_CANDIDAT]
+        morceaux.append(bloc)
+    return pd.concat(morceaux, axis=1)
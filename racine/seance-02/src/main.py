@@ -1,19 +1,55 @@
 import os
+import sys
+# Paquet commun racine/donnees (monté dans /application/donnees par docker-compose)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+# Mode sans affichage (SANS_AFFICHAGE, moteur Agg) : à importer avant matplotlib
+from donnees.execution import fin_demarrage
+from donnees.instrumentation import etape, compter
 import pandas as pd
 import matplotlib.pyplot as plt
+from rendu_graphiques import rendre_diagrammes, afficher_debit
+from donnees import charger_resultats
+from donnees.blocs import agreger_resultats, histogramme_resultats
+from donnees.histogrammes import histogramme_tableau, tracer_histogramme
+from donnees.resultats import remettre_en_large
+
+fin_demarrage("seance-02")
 
 # 2. Définition des chemins
-data_path = os.path.join("data", "resultats-elections-presidentielles-2022-1er-tour.csv")
+data_path = os.environ.get("RESULTATS", os.path.join("data", "resultats-elections-presidentielles-2022-1er-tour.csv"))
 images_dir = os.path.join("images")
 
+# Nombre de processus pour le rendu des diagrammes et la lecture par partitions : 1 par défaut,
+# comme dans toutes les séances (exécution prévisible dans un conteneur partagé) ; 0 pour tous les cœurs
+NB_WORKERS = int(os.environ.get("NB_WORKERS", 1)) or os.cpu_count() or 1
+# Mode incrémental : ne redessiner que les départements modifiés (INCREMENTAL=0 pour tout redessiner)
+INCREMENTAL = os.environ.get("INCREMENTAL", "1") != "0"
+# Mode flux (MODE_FLUX=1) : fichier lu par partitions dans NB_WORKERS processus sans être chargé en
+# entier (ex. RESULTATS=fichier des bureaux de vote, voir donnees/blocs.py) ; les étapes suivantes
+# portent sur les comptes agrégés par département
+MODE_FLUX = os.environ.get("MODE_FLUX", "0") == "1"
+
 # Création du dossier images s’il n’existe pas déjà
 os.makedirs(images_dir, exist_ok=True)
 
-# 3. Lecture du fichier CSV
-with open(data_path, "r", encoding="utf-8") as fichier:
-        contenu = pd.read_csv(fichier, sep=",", quotechar='"')
+# 3. Lecture du fichier CSV (chargeur typé avec cache binaire)
+etape("3. Lecture du fichier CSV")
+# contenu : table large du fichier (une ligne par département, un bloc Sexe/Nom/Prénom/Voix par
+# candidat), reconstruite depuis le cache ; candidats : table longue (département, candidat, voix)
+if MODE_FLUX:
+    agregats = agreger_resultats(data_path, workers=NB_WORKERS)
+    nb_lignes_lues = int(agregats["departements"]["Lignes"].sum())
+    table_departements = agregats["departements"].drop(columns="Lignes")
+    candidats = agregats["voix_departements"]
+    compter(nb_lignes_lues)
+    print(f"\nMode flux : {nb_lignes_lues} lignes agrégées en {len(table_departements)} départements")
+else:
+    table_departements, candidats = charger_resultats(data_path)
+    compter(len(table_departements))
+contenu = remettre_en_large(table_departements, candidats)
 
 # 4. Affichage du DataFrame
+etape("4-9. Description des colonnes")
 print("\n Aperçu du contenu du CSV")
 print(contenu.head())
 
@@ -65,13 +101,23 @@ print("\n Somme des colonnes quantitatives")
 somme_colonnes = []
 for col in contenu.columns:
     if types_variables[col] in ["int", "float"]:
-        somme = contenu[col].sum()
+        # mode flux : sommes calculées sur toutes les lignes du fichier, partition par partition
+        somme = agregats["sommes"][col] if MODE_FLUX and col in agregats["sommes"] else contenu[col].sum()
         somme_colonnes.append((col, somme))
         print(f"{col} : {somme}")
     else:
         print(f"{col} : non numérique (ignoré)")
 
+# Voix par candidat (blocs Sexe/Nom/Prénom/Voix remis en table longue)
+if MODE_FLUX:
+    voix_candidats = agregats["voix"].groupby(level=["Nom", "Prénom"]).sum().sort_values(ascending=False)
+else:
+    voix_candidats = candidats.groupby(["Nom", "Prénom"], observed=True)["Voix"].sum().sort_values(ascending=False)
+print("\n Voix par candidat")
+print(voix_candidats)
+
 # 10. Diagrammes en barres : inscrits et votants par département
+etape("10. Diagrammes en barres")
 print("\n Création des diagrammes en barres")
 
 # On vérifie les noms de colonnes probables
@@ -79,48 +125,45 @@ cols_departement = [c for c in contenu.columns if "Département" in c or "Code"
 cols_inscrits = [c for c in contenu.columns if "Inscrit" in c][0]
 cols_votants = [c for c in contenu.columns if "Votant" in c][0]
 
-for _, row in contenu.iterrows():
-    dep = str(row[cols_departement])
-    inscrits = row[cols_inscrits]
-    votants = row[cols_votants]
-
-    plt.figure()
-    plt.bar(["Inscrits", "Votants"], [inscrits, votants])
-    plt.title(f"Inscrits et votants - {dep}")
-    plt.xlabel("Catégories")
-    plt.ylabel("Nombre de personnes")
-    plt.tight_layout()
-    plt.savefig(os.path.join(images_dir, f"bar_{dep}.png"))
-    plt.close()
+departements = contenu[cols_departement].astype(str).to_numpy()
+nb, duree = rendre_diagrammes(
+    "bar", departements,
+    [contenu[cols_inscrits].to_numpy(), contenu[cols_votants].to_numpy()],
+    images_dir, workers=NB_WORKERS, incremental=INCREMENTAL)
+compter(nb)
+afficher_debit(nb, duree)
 
 print("Diagrammes en barres enregistrés dans src/images/")
 
 # 11. Diagrammes circulaires (votes blancs, nuls, exprimés, abstention)
+etape("11. Diagrammes circulaires")
 print("\n Création des diagrammes circulaires")
 cols_blancs = [c for c in contenu.columns if "Blanc" in c][0]
 cols_nuls = [c for c in contenu.columns if "Nul" in c][0]
 cols_exprimes = [c for c in contenu.columns if "Exprim" in c][0]
 cols_abstention = [c for c in contenu.columns if "Abstention" in c][0]
 
-for _, row in contenu.iterrows():
-    dep = str(row[cols_departement])
-    valeurs = [row[cols_blancs], row[cols_nuls], row[cols_exprimes], row[cols_abstention]]
-    labels = ["Blancs", "Nuls", "Exprimés", "Abstention"]
-
-    plt.figure()
-    plt.pie(valeurs, labels=labels, autopct="%1.1f%%", startangle=90)
-    plt.title(f"Répartition des votes - {dep}")
-    plt.axis("equal")
-    plt.savefig(os.path.join(images_dir, f"pie_{dep}.png"))
-    plt.close()
+nb, duree = rendre_diagrammes(
+    "pie", departements,
+    [contenu[c].to_numpy() for c in [cols_blancs, cols_nuls, cols_exprimes, cols_abstention]],
+    images_dir, workers=NB_WORKERS, incremental=INCREMENTAL)
+compter(nb)
+afficher_debit(nb, duree)
 
 print("Diagrammes circulaires enregistrés dans src/images/")
 
 # 12. Histogramme de la distribution des inscrits
+etape("12. Histogramme des inscrits")
 print("\n Création de l'histogramme de la distribution des inscrits")
 
+# 10 classes de même largeur comptées par blocs, puis tracées à partir des comptes (mêmes barres que plt.hist)
+# mode flux : distribution sur toutes les lignes du fichier (bureaux de vote), partition par partition
+if MODE_FLUX:
+    histogramme = histogramme_resultats(data_path, cols_inscrits, "lineaires", nb_classes=10, workers=NB_WORKERS)
+else:
+    histogramme = histogramme_tableau(contenu[cols_inscrits].to_numpy(), "lineaires", nb_classes=10)
 plt.figure()
-plt.hist(contenu[cols_inscrits], bins=10, density=True, edgecolor='black')
+tracer_histogramme(plt, histogramme, densite=True, edgecolor='black')
 plt.title("Distribution statistique des inscrits (histogramme normalisé)")
 plt.xlabel("Nombre d'inscrits")
 plt.ylabel("Densité")
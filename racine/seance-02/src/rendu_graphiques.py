@@ -0,0 +1,180 @@
+#coding:utf8
+
+# Moteur de rendu par lots des diagrammes par département
+# Les colonnes utiles sont extraites une seule fois en tableaux NumPy, chaque processus
+# réutilise une seule figure Agg et les départements sont répartis entre plusieurs processus.
+
+import os
+import json
+import time
+import hashlib
+import multiprocessing
+
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Figure réutilisée par le processus courant (créée à la première utilisation)
+_FIGURE = None
+
+PARAMETRES_SUBPLOTS = ["left", "bottom", "right", "top", "wspace", "hspace"]
+
+# Fonction pour récupérer la figure du processus, remise à zéro entre deux diagrammes
+def figure_courante():
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = Figure()
+        FigureCanvasAgg(_FIGURE)
+    _FIGURE.clear()
+    # tight_layout modifie les marges de la figure : on repart des valeurs par défaut
+    _FIGURE.subplots_adjust(**{p: matplotlib.rcParams["figure.subplot." + p] for p in PARAMETRES_SUBPLOTS})
+    return _FIGURE
+
+# Paramètres de tracé de chaque type de diagramme (ils entrent aussi dans le manifeste)
+PARAMETRES = {
+    "bar": {
+        "labels": ["Inscrits", "Votants"],
+        "titre": "Inscrits et votants - {dep}",
+        "xlabel": "Catégories",
+        "ylabel": "Nombre de personnes",
+    },
+    "pie": {
+        "labels": ["Blancs", "Nuls", "Exprimés", "Abstention"],
+        "titre": "Répartition des votes - {dep}",
+        "autopct": "%1.1f%%",
+        "startangle": 90,
+    },
+}
+
+# Diagramme en barres : inscrits et votants
+def dessiner_barres(fig, dep, valeurs):
+    param = PARAMETRES["bar"]
+    ax = fig.add_subplot()
+    ax.bar(param["labels"], list(valeurs))
+    ax.set_title(param["titre"].format(dep=dep))
+    ax.set_xlabel(param["xlabel"])
+    ax.set_ylabel(param["ylabel"])
+    fig.tight_layout()
+
+# Diagramme circulaire : blancs, nuls, exprimés, abstention
+def dessiner_secteurs(fig, dep, valeurs):
+    param = PARAMETRES["pie"]
+    ax = fig.add_subplot()
+    ax.pie(list(valeurs), labels=param["labels"], autopct=param["autopct"], startangle=param["startangle"])
+    ax.set_title(param["titre"].format(dep=dep))
+    ax.axis("equal")
+
+# Types de diagrammes disponibles (préfixe du nom de fichier -> fonction de dessin)
+DIAGRAMMES = {
+    "bar": dessiner_barres,
+    "pie": dessiner_secteurs,
+}
+
+# Fonction exécutée par chaque processus sur un paquet de départements
+def rendre_paquet(paquet):
+    type_diagramme, images_dir, departements, colonnes = paquet
+    dessiner = DIAGRAMMES[type_diagramme]
+    for i, dep in enumerate(departements):
+        fig = figure_courante()
+        dessiner(fig, dep, [colonne[i] for colonne in colonnes])
+        fig.savefig(os.path.join(images_dir, f"{type_diagramme}_{dep}.png"))
+    return len(departements)
+
+# Fonction pour découper les départements en paquets (plusieurs paquets par processus pour équilibrer la charge)
+def decouper(type_diagramme, images_dir, departements, colonnes, nb_paquets):
+    paquets = []
+    for indices in np.array_split(np.arange(len(departements)), nb_paquets):
+        if len(indices) > 0:
+            paquets.append((type_diagramme, images_dir, departements[indices], [c[indices] for c in colonnes]))
+    return paquets
+
+# Mode incrémental : manifeste des empreintes, stocké à côté des images
+MANIFESTE = "manifeste.json"
+
+def lire_manifeste(images_dir):
+    chemin = os.path.join(images_dir, MANIFESTE)
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, "r", encoding="utf-8") as fichier:
+        return json.load(fichier)
+
+def ecrire_manifeste(images_dir, manifeste):
+    chemin = os.path.join(images_dir, MANIFESTE)
+    # écriture dans un fichier temporaire puis remplacement, pour ne jamais laisser un manifeste tronqué
+    with open(chemin + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(manifeste, fichier, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(chemin + ".tmp", chemin)
+
+# Empreinte des paramètres de tracé : toute modification force un rendu complet du type concerné
+def empreinte_parametres(type_diagramme):
+    contexte = {
+        "parametres": PARAMETRES[type_diagramme],
+        "matplotlib": matplotlib.__version__,
+        "figsize": list(matplotlib.rcParams["figure.figsize"]),
+        "dpi": matplotlib.rcParams["figure.dpi"],
+    }
+    return hashlib.sha1(json.dumps(contexte, sort_keys=True).encode("utf-8")).hexdigest()
+
+# Empreinte de chaque département : valeurs d'entrée + paramètres de tracé
+def empreintes(type_diagramme, departements, colonnes):
+    prefixe = empreinte_parametres(type_diagramme)
+    lignes = zip(*[c.tolist() for c in colonnes])
+    return [hashlib.sha1(f"{prefixe}|{valeurs!r}".encode("utf-8")).hexdigest() for valeurs in lignes]
+
+# Fonction pour sélectionner les départements à redessiner et supprimer les images obsolètes
+def preparer_incremental(type_diagramme, departements, colonnes, images_dir, manifeste):
+    anciennes = manifeste.get(type_diagramme, {})
+    hachages = empreintes(type_diagramme, departements, colonnes)
+    a_rendre = np.array([
+        anciennes.get(dep) != h or not os.path.exists(os.path.join(images_dir, f"{type_diagramme}_{dep}.png"))
+        for dep, h in zip(departements.tolist(), hachages)
+    ], dtype=bool)
+    nouvelles = dict(zip(departements.tolist(), hachages))
+    supprimes = 0
+    for dep in set(anciennes) - set(nouvelles):
+        chemin = os.path.join(images_dir, f"{type_diagramme}_{dep}.png")
+        if os.path.exists(chemin):
+            os.remove(chemin)
+        supprimes += 1
+    return a_rendre, nouvelles, supprimes
+
+# Fonction principale : rend un diagramme par département et renvoie (nombre de diagrammes, durée en s)
+# departements : tableau des codes, colonnes : liste de tableaux NumPy alignés sur departements
+# En mode incrémental, seuls les départements dont l'empreinte a changé sont redessinés.
+def rendre_diagrammes(type_diagramme, departements, colonnes, images_dir, workers=None, incremental=False):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    departements = np.asarray(departements)
+    colonnes = [np.asarray(c) for c in colonnes]
+    debut = time.perf_counter()
+    if incremental:
+        manifeste = lire_manifeste(images_dir)
+        a_rendre, nouvelles, supprimes = preparer_incremental(type_diagramme, departements, colonnes, images_dir, manifeste)
+        print(f"Mode incrémental : {int(a_rendre.sum())} à redessiner, "
+              f"{len(departements) - int(a_rendre.sum())} inchangés, {supprimes} supprimés")
+        departements = departements[a_rendre]
+        colonnes = [c[a_rendre] for c in colonnes]
+    # processus seulement avec fork : spawn réexécuterait le script principal (sans garde __main__)
+    # dans chaque processus ; rendu en série sinon (Windows, macOS)
+    if "fork" not in multiprocessing.get_all_start_methods():
+        workers = 1
+    if len(departements) == 0:
+        nb = 0
+    elif workers <= 1 or len(departements) <= 1:
+        nb = rendre_paquet((type_diagramme, images_dir, departements, colonnes))
+    else:
+        paquets = decouper(type_diagramme, images_dir, departements, colonnes, workers * 4)
+        with multiprocessing.get_context("fork").Pool(min(workers, len(paquets))) as pool:
+            nb = sum(pool.imap_unordered(rendre_paquet, paquets))
+    if incremental:
+        # manifeste mis à jour seulement après un rendu réussi
+        manifeste[type_diagramme] = nouvelles
+        ecrire_manifeste(images_dir, manifeste)
+    duree = time.perf_counter() - debut
+    return nb, duree
+
+# Fonction d'affichage du débit
+def afficher_debit(nb, duree):
+    debit = nb / duree if duree > 0 else float("inf")
+    print(f"{nb} diagrammes en {duree:.2f} s ({debit:.1f} diagrammes/s)")
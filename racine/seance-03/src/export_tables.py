@@ -0,0 +1,129 @@
+#coding:utf8
+
+# Export des tables de paramètres dans plusieurs formats en une seule passe
+# - csv : séparateur ";" et UTF-8, comme parametres_statistiques.csv
+# - xlsx : classeur openpyxl en mode écriture seule (les lignes partent sur disque au fil de l'eau)
+# - parquet / feather : formats colonnes pour les traitements automatiques (nécessitent pyarrow)
+# La table est découpée en blocs et chaque bloc est transmis à tous les formats demandés :
+# aucune copie complète de la table n'est construite, quel que soit le nombre de lignes.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+TAILLE_BLOC = 50_000
+
+# Fonction pour préparer un bloc pour les formats binaires (index converti en colonne)
+def bloc_avec_index(bloc, index):
+    if not index:
+        return bloc
+    return bloc.rename_axis(bloc.index.name or "index").reset_index()
+
+class EcrivainCSV:
+    def __init__(self, chemin, index):
+        self.fichier = open(chemin, "w", encoding="utf-8", newline="")
+        self.index = index
+        self.entete = True
+
+    def ecrire(self, bloc):
+        bloc.to_csv(self.fichier, sep=";", index=self.index, header=self.entete)
+        self.entete = False
+
+    def fermer(self):
+        self.fichier.close()
+
+class EcrivainXLSX:
+    def __init__(self, chemin, index, feuille="Sheet1"):
+        from openpyxl import Workbook
+        self.chemin = chemin
+        self.index = index
+        self.classeur = Workbook(write_only=True)
+        self.feuille = self.classeur.create_sheet(feuille)
+        self.entete = True
+
+    def ecrire(self, bloc):
+        if self.entete:
+            noms = [str(c) for c in bloc.columns]
+            self.feuille.append(([bloc.index.name or ""] if self.index else []) + noms)
+            self.entete = False
+        for ligne in bloc.itertuples(index=self.index, name=None):
+            # Excel ne connaît pas NaN : cellule vide ; types NumPy convertis en types Python
+            self.feuille.append([None if isinstance(v, float) and np.isnan(v) else
+                                 v.item() if isinstance(v, np.generic) else v for v in ligne])
+
+    def fermer(self):
+        self.classeur.save(self.chemin)
+
+class EcrivainParquet:
+    def __init__(self, chemin, index):
+        import pyarrow.parquet
+        self.module = pyarrow.parquet
+        self.chemin = chemin
+        self.index = index
+        self.ecrivain = None
+
+    def ecrire(self, bloc):
+        import pyarrow
+        lot = pyarrow.Table.from_pandas(bloc_avec_index(bloc, self.index), preserve_index=False)
+        if self.ecrivain is None:
+            self.ecrivain = self.module.ParquetWriter(self.chemin, lot.schema)
+        self.ecrivain.write_table(lot)
+
+    def fermer(self):
+        if self.ecrivain is not None:
+            self.ecrivain.close()
+
+class EcrivainFeather:
+    def __init__(self, chemin, index):
+        import pyarrow.ipc
+        self.module = pyarrow.ipc
+        self.chemin = chemin
+        self.index = index
+        self.ecrivain = None
+
+    def ecrire(self, bloc):
+        import pyarrow
+        lot = pyarrow.Table.from_pandas(bloc_avec_index(bloc, self.index), preserve_index=False)
+        if self.ecrivain is None:
+            # Feather version 2 = format de fichier Arrow IPC, écrit lot par lot
+            self.ecrivain = self.module.new_file(self.chemin, lot.schema)
+        self.ecrivain.write_table(lot)
+
+    def fermer(self):
+        if self.ecrivain is not None:
+            self.ecrivain.close()
+
+ECRIVAINS = {
+    "csv": EcrivainCSV,
+    "xlsx": EcrivainXLSX,
+    "parquet": EcrivainParquet,
+    "feather": EcrivainFeather,
+}
+
+# Fonction pour découper une table en blocs (une table déjà découpée est transmise telle quelle)
+def blocs_de(table, taille_bloc):
+    if isinstance(table, pd.DataFrame):
+        for debut in range(0, max(len(table), 1), taille_bloc):
+            yield table.iloc[debut:debut + taille_bloc]
+    else:
+        yield from table
+
+# Fonction principale : écrit la table dans chaque format demandé et renvoie les chemins produits
+# chemin_base sans extension, ex. "exports/parametres_statistiques"
+# table : DataFrame, ou itérable de DataFrame (blocs) pour les tables produites au fil de l'eau
+def exporter(table, chemin_base, formats=("csv", "xlsx"), index=True, taille_bloc=TAILLE_BLOC):
+    inconnus = [f for f in formats if f not in ECRIVAINS]
+    if inconnus:
+        raise ValueError(f"Format d'export non pris en charge : {', '.join(inconnus)}")
+    os.makedirs(os.path.dirname(chemin_base) or ".", exist_ok=True)
+    chemins = [f"{chemin_base}.{f}" for f in formats]
+    ecrivains = [ECRIVAINS[f](chemin, index) for f, chemin in zip(formats, chemins)]
+    try:
+        for bloc in blocs_de(table, taille_bloc):
+            for ecrivain in ecrivains:
+                ecrivain.ecrire(bloc)
+    finally:
+        for ecrivain in ecrivains:
+            ecrivain.fermer()
+    return chemins
@@ -1,9 +1,22 @@
 #coding:utf8
 
-import os 
+import os
+import sys
+# Paquet commun racine/donnees (monté dans /application/donnees par docker-compose)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+# Mode sans affichage (SANS_AFFICHAGE, moteur Agg) : à importer avant matplotlib
+from donnees.execution import fin_demarrage
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from statistiques_flux import accumuler_resultats, parametres_statistiques, parametres_groupes
+from statistiques_groupes import parametres_par_groupe
+from export_tables import exporter
+from donnees import charger_resultats, ouvrir
+from donnees.histogrammes import histogramme_tableau
+from donnees.pipeline import executer
+from donnees.instrumentation import compter
+
+fin_demarrage("seance-03")
 
 # Source des données : https://www.data.gouv.fr/datasets/election-presidentielle-des-10-et-24-avril-2022-resultats-definitifs-du-1er-tour/
 
@@ -13,100 +26,182 @@ DATA_DIR = "data"
 IMG_DIR = "img"
 os.makedirs(IMG_DIR, exist_ok=True)
 
-# Etape 4 - Lire le CSV des résultats
-with open(os.path.join(DATA_DIR, "resultats-elections-presidentielles-2022-1er-tour.csv"), "r", encoding="utf-8") as f:
-    contenu = pd.read_csv(f, sep=None, engine="python")
+# Mode flux (MODE_FLUX=1) : paramètres calculés en un passage, partition par partition dans NB_WORKERS
+# processus, sans charger tout le fichier (quantiles, mode et écart absolu moyen approchés, voir
+# statistiques_flux.py et donnees/blocs.py) ; RESULTATS : autre fichier, ex. résultats par bureau de vote
+MODE_FLUX = os.environ.get("MODE_FLUX", "0") == "1"
+# NB_WORKERS : 1 processus par défaut, même défaut dans toutes les séances ; 0 pour tous les cœurs
+NB_WORKERS = int(os.environ.get("NB_WORKERS", 1)) or os.cpu_count() or 1
+# Formats d'export des tables de paramètres (csv, xlsx, parquet, feather)
+FORMATS_EXPORT = [f.strip() for f in os.environ.get("FORMATS_EXPORT", "csv,xlsx").split(",") if f.strip()]
+chemin_resultats = os.environ.get("RESULTATS", os.path.join(DATA_DIR, "resultats-elections-presidentielles-2022-1er-tour.csv"))
 
 colonnes_quanti = ["Inscrits", "Votants", "Blancs", "Nuls", "Exprimés", "Abstentions"]
-num = contenu[colonnes_quanti].copy()
 
 # Définir cols pour les boucles suivantes
-cols = num.columns
-
-# Etape 5 - Calculer moyennes, médianes, modes, écart-type, écart absolu à la moyenne, étendue
-moyennes = num.mean().round(2)
-medianes = num.median().round(2)
-modes = num.mode().iloc[0].round(2)                            
-ecarts_type = num.std(ddof=0).round(2)                        
-ecarts_abs_moy = num.apply(lambda s: np.abs(s - s.mean()).mean()).round(2)  
-etendues = (num.max() - num.min()).round(2)                    
-
-# (affichage facultatif pour contrôle)
-print("\nMoyennes :\n", moyennes)
-print("\nMédianes :\n", medianes)
-print("\nModes :\n", modes)
-print("\nÉcarts type :\n", ecarts_type)
-print("\nÉcarts absolus moyens :\n", ecarts_abs_moy)
-print("\nÉtendues :\n", etendues)
-
-# Etape 6 - Afficher la liste des paramètres
-print("\n Paramètres (par colonne quantitative) \n")
-for c in cols:
-    print(f"{c} : Moyenne={moyennes[c]}, Médiane={medianes[c]}, Mode={modes[c]}, "
-          f"Écart-type={ecarts_type[c]}, Écart abs. moy.={ecarts_abs_moy[c]}, Étendue={etendues[c]}")
-
-# Etape 7 - Calculer IQR et interdécile (avec quantile)
-q1 = num.quantile(0.25)
-q3 = num.quantile(0.75)
-d1 = num.quantile(0.10)
-d9 = num.quantile(0.90)
-
-iqr = (q3 - q1).round(2)
-idr = (d9 - d1).round(2)
-
-print("\n IQR et Interdécile (par colonne) \n")
-for c in cols:
-    print(f"{c} : IQR={iqr[c]}, Interdécile={idr[c]}")
-
-# Etape 8 - Boîte à moustache par colonne quantitative
-for col in cols:
-    plt.figure()
-    plt.title(f"Boxplot : {col}")
-    plt.boxplot(num[col].dropna(), labels=[col])
-    plt.tight_layout()
+cols = colonnes_quanti
+
+# Les étapes sont des fonctions déclarées dans ETAPES avec leurs entrées (donnees/pipeline.py) :
+# paramètres électoraux et classes de surfaces des îles sont indépendants et calculés en parallèle
+# (NB_WORKERS processus) ; chaque résultat est mis en cache et seules les étapes modifiées sont recalculées
+# Avec INSTRUMENTATION, chaque étape est mesurée (compter() : lignes traitées par l'étape)
+
+# Etape 4 - Lire le CSV des résultats (chargeur typé avec cache binaire)
+def lire_resultats(chemin, mode_flux):
+    if mode_flux:
+        accu, accus_candidats = accumuler_resultats(chemin, colonnes_quanti, workers=NB_WORKERS)
+        return {"flux": parametres_statistiques(accu),
+                "flux_candidats": parametres_groupes(accus_candidats, ["Nom", "Prénom"])}
+    contenu, candidats = charger_resultats(chemin)
+    compter(len(contenu))
+    # conversion en float pour garder le format des paramètres exportés
+    return {"num": contenu[colonnes_quanti].astype("float64"), "candidats": candidats}
+
+# Etapes 5 à 7 - Paramètres de position et de dispersion, IQR et interdécile
+def calculer_parametres(lecture):
+    # Etape 5 - Calculer moyennes, médianes, modes, écart-type, écart absolu à la moyenne, étendue
+    if "flux" in lecture:
+        parametres_flux = lecture["flux"]
+        moyennes = parametres_flux["Moyenne"]
+        medianes = parametres_flux["Médiane"]
+        modes = parametres_flux["Mode"]
+        ecarts_type = parametres_flux["Écart type"]
+        ecarts_abs_moy = parametres_flux["Écart absolu moyen"]
+        etendues = parametres_flux["Étendue"]
+    else:
+        num = lecture["num"]
+        moyennes = num.mean().round(2)
+        medianes = num.median().round(2)
+        modes = num.mode().iloc[0].round(2)
+        ecarts_type = num.std(ddof=0).round(2)
+        ecarts_abs_moy = num.apply(lambda s: np.abs(s - s.mean()).mean()).round(2)
+        etendues = (num.max() - num.min()).round(2)
+
+    # (affichage facultatif pour contrôle)
+    print("\nMoyennes :\n", moyennes)
+    print("\nMédianes :\n", medianes)
+    print("\nModes :\n", modes)
+    print("\nÉcarts type :\n", ecarts_type)
+    print("\nÉcarts absolus moyens :\n", ecarts_abs_moy)
+    print("\nÉtendues :\n", etendues)
+
+    # Etape 6 - Afficher la liste des paramètres
+    print("\n Paramètres (par colonne quantitative) \n")
+    for c in cols:
+        print(f"{c} : Moyenne={moyennes[c]}, Médiane={medianes[c]}, Mode={modes[c]}, "
+              f"Écart-type={ecarts_type[c]}, Écart abs. moy.={ecarts_abs_moy[c]}, Étendue={etendues[c]}")
+
+    # Etape 7 - Calculer IQR et interdécile (avec quantile)
+    if "flux" in lecture:
+        iqr = parametres_flux["IQR"]
+        idr = parametres_flux["IDR"]
+    else:
+        q1 = num.quantile(0.25)
+        q3 = num.quantile(0.75)
+        d1 = num.quantile(0.10)
+        d9 = num.quantile(0.90)
+
+        iqr = (q3 - q1).round(2)
+        idr = (d9 - d1).round(2)
+
+    print("\n IQR et Interdécile (par colonne) \n")
+    for c in cols:
+        print(f"{c} : IQR={iqr[c]}, Interdécile={idr[c]}")
+
+    return pd.DataFrame({
+        "Moyenne": moyennes,
+        "Médiane": medianes,
+        "Mode": modes,
+        "Écart type": ecarts_type,
+        "Écart absolu moyen": ecarts_abs_moy,
+        "Étendue": etendues,
+        "IQR": iqr,
+        "IDR": idr
+    }, index=colonnes_quanti)
+
+# Etape 8 - Boîte à moustache par colonne quantitative (données en mémoire uniquement)
+def nom_boxplot(col):
     safe_name = col.replace(" ", "_").replace("/", "_")
-    plt.savefig(os.path.join(IMG_DIR, f"boxplot_{safe_name}.png"))
-    plt.close()
-print(f"\nBoxplots sauvegardés dans '{IMG_DIR}/'")
-
-# Etape 9 - Lire island-index.csv
-island_path = os.path.join(DATA_DIR, "island-index.csv")
-with open(island_path, "r", encoding="utf-8") as f:
-    islands = pd.read_csv(f, sep=None, engine="python")
-
-# Etape 10 - Sélectionner la colonne 'Surface (km2)' et catégoriser selon les intervalles demandés
-col_name = next((c for c in islands.columns if "Surface" in c and "km" in c), None)
-if col_name is None:
-    raise ValueError("Colonne 'Surface (km2)' introuvable dans island-index.csv")
-
-surface = pd.to_numeric(islands[col_name], errors="coerce")
-
-bins = [0, 10, 25, 50, 100, 2500, 5000, 10000, np.inf]
-labels = [
-    "0-10", "10-25", "25-50", "50-100",
-    "100-2500", "2500-5000", "5000-10000", ">=10000"
-]
-cats = pd.cut(surface, bins=bins, labels=labels, right=True, include_lowest=True)
-counts = cats.value_counts().reindex(labels).fillna(0).astype(int)
-
-print("\n Décompte des îles par intervalle de surface (km²) \n")
-print(counts)
+    return os.path.join(IMG_DIR, f"boxplot_{safe_name}.png")
+
+def tracer_boxplots(lecture):
+    if "flux" in lecture:
+        print("\nMode flux : boxplots non générés (ils nécessitent toutes les valeurs)")
+        return
+    # import différé : matplotlib n'est pas chargé en mode flux
+    import matplotlib.pyplot as plt
+    num = lecture["num"]
+    for col in cols:
+        plt.figure()
+        plt.title(f"Boxplot : {col}")
+        plt.boxplot(num[col].dropna(), tick_labels=[col])
+        plt.tight_layout()
+        plt.savefig(nom_boxplot(col))
+        plt.close()
+    print(f"\nBoxplots sauvegardés dans '{IMG_DIR}/'")
+
+# Etapes 9 et 10 - Classes de surfaces des îles
+def classes_surfaces(dossier):
+    # Etape 9 - Ouvrir island-index.csv (jeu du registre commun, lu une fois puis mis en cache)
+    islands = ouvrir("island_index", dossier)
+
+    # Etape 10 - Sélectionner la colonne 'Surface (km2)' et catégoriser selon les intervalles demandés
+    # seule cette colonne est chargée
+    col_name = next((c for c in islands.colonnes() if "Surface" in c and "km" in c), None)
+    if col_name is None:
+        raise ValueError("Colonne 'Surface (km2)' introuvable dans island-index.csv")
+
+    # colonne projetée en mémoire, comptée par blocs (classes (a, b] comme pd.cut, include_lowest)
+    surface = islands.memmap(col_name)
+    compter(len(surface))
+
+    bins = [0, 10, 25, 50, 100, 2500, 5000, 10000, np.inf]
+    labels = [
+        "0-10", "10-25", "25-50", "50-100",
+        "100-2500", "2500-5000", "5000-10000", ">=10000"
+    ]
+    histogramme = histogramme_tableau(surface, bins, droite=True)
+    counts = pd.Series(histogramme["comptes"], index=pd.Index(labels, name=col_name), name="count")
+
+    print("\n Décompte des îles par intervalle de surface (km²) \n")
+    print(counts)
+    return counts
 
 # Etape 11 Bonus - Sortie des paramètres statistiques au format CSV et Excel
-parametres = pd.DataFrame({
-    "Moyenne": moyennes,
-    "Médiane": medianes,
-    "Mode": modes,
-    "Écart type": ecarts_type,
-    "Écart absolu moyen": ecarts_abs_moy,
-    "Étendue": etendues,
-    "IQR": iqr,
-    "IDR": idr
-}, index=num.columns)
-
-os.makedirs("exports", exist_ok=True)
-
-parametres.to_csv("exports/parametres_statistiques.csv", sep=";", encoding="utf-8")
-parametres.to_excel("exports/parametres_statistiques.xlsx")
-
-print("→ Exports réalisés dans le dossier /exports")
+def exporter_parametres(parametres, formats):
+    exporter(parametres, os.path.join("exports", "parametres_statistiques"), formats)
+
+    print("→ Exports réalisés dans le dossier /exports")
+
+# Etape 12 Bonus - Paramètres des voix par candidat (sur l'ensemble des départements)
+def exporter_parametres_candidats(lecture, formats):
+    if "flux" in lecture:
+        # paramètres approchés (esquisses fusionnées partition par partition)
+        parametres_candidats = lecture["flux_candidats"]
+    else:
+        parametres_candidats = parametres_par_groupe(lecture["candidats"], ["Nom", "Prénom"], ["Voix"])
+    print("\n Paramètres des voix par candidat \n")
+    print(parametres_candidats)
+    exporter(parametres_candidats, os.path.join("exports", "parametres_par_candidat"), formats, index=False)
+    print("→ Paramètres par candidat exportés dans le dossier /exports")
+    return parametres_candidats
+
+def fichiers_exportes(nom):
+    return [os.path.join("exports", f"{nom}.{f}") for f in FORMATS_EXPORT]
+
+ETAPES = {
+    "lecture": {"fonction": lire_resultats, "parametres": {"chemin": chemin_resultats, "mode_flux": MODE_FLUX},
+                "fichiers": [chemin_resultats]},
+    "parametres": {"fonction": calculer_parametres, "entrees": ["lecture"]},
+    "boxplots": {"fonction": tracer_boxplots, "entrees": ["lecture"],
+                 "sorties": [] if MODE_FLUX else [nom_boxplot(c) for c in cols]},
+    "surfaces": {"fonction": classes_surfaces, "parametres": {"dossier": DATA_DIR},
+                 "fichiers": [os.path.join(DATA_DIR, "island-index.csv")]},
+    "exports": {"fonction": exporter_parametres, "entrees": ["parametres"],
+                "parametres": {"formats": FORMATS_EXPORT}, "sorties": fichiers_exportes("parametres_statistiques")},
+    "candidats": {"fonction": exporter_parametres_candidats, "entrees": ["lecture"],
+                  "parametres": {"formats": FORMATS_EXPORT},
+                  "sorties": fichiers_exportes("parametres_par_candidat")},
+}
+
+executer(ETAPES, workers=NB_WORKERS)
@@ -0,0 +1,209 @@
+#coding:utf8
+
+# Calcul des paramètres statistiques en un seul passage, bloc par bloc
+# - exacts : effectif, moyenne et variance (Welford, fusion de Chan), minimum, maximum, étendue
+# - approchés : quantiles (esquisse logarithmique à précision relative bornée, type DDSketch,
+#   commune avec les histogrammes : donnees/esquisses.py), écart absolu moyen (calculé sur
+#   l'esquisse) et mode (compteurs de Misra-Gries)
+# Chaque accumulateur est un simple dictionnaire : il se transmet entre processus et deux
+# résultats partiels se fusionnent avec fusionner().
+# Le fichier des résultats (par département ou par bureau de vote) est lu par partitions avec
+# donnees/blocs.py : accumuler_resultats() donne aussi les accumulateurs par candidat.
+
+import functools
+import itertools
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from donnees.esquisses import ajouter_esquisse, fusionner_esquisses, nouvelle_esquisse, quantiles_esquisse, seaux_tries
+
+# Précision relative des quantiles (1 % par défaut) et nombre de compteurs pour le mode
+PRECISION = 0.01
+NB_COMPTEURS = 1000
+
+# Etape 1 - Mode approché (Misra-Gries fusionnable)
+# Au plus k compteurs ; l'erreur sur chaque fréquence est inférieure à n / (k + 1).
+# Compteurs : valeurs triées et comptes dans deux tableaux NumPy, fusionnés sans boucle Python.
+
+def nouveaux_compteurs():
+    return {"valeurs": np.zeros(0, dtype=np.float64), "comptes": np.zeros(0, dtype=np.int64)}
+
+# Fonction pour ne garder que les compteurs au-dessus du (k + 1)-ième plus grand, diminués de celui-ci
+def reduire_compteurs(valeurs, comptes, k):
+    if len(comptes) > k:
+        seuil = comptes[np.argpartition(comptes, -(k + 1))[-(k + 1)]]
+        garde = comptes > seuil
+        valeurs, comptes = valeurs[garde], comptes[garde] - seuil
+    return {"valeurs": valeurs, "comptes": comptes}
+
+def fusionner_compteurs(a, b, k):
+    valeurs, inverse = np.unique(np.concatenate([a["valeurs"], b["valeurs"]]), return_inverse=True)
+    comptes = np.bincount(inverse, weights=np.concatenate([a["comptes"], b["comptes"]]), minlength=len(valeurs))
+    return reduire_compteurs(valeurs, comptes.astype(np.int64), k)
+
+def ajouter_compteurs(compteurs, valeurs, k):
+    uniques, comptes = np.unique(valeurs, return_counts=True)
+    return fusionner_compteurs(compteurs, {"valeurs": uniques, "comptes": comptes}, k)
+
+# Mode : valeur la plus fréquente, la plus petite en cas d'égalité (comme pandas mode().iloc[0])
+# Sans valeur fréquente (compteurs vides), toutes les valeurs sont à égalité à l'erreur près : minimum.
+def mode_compteurs(compteurs, minimum=np.nan):
+    if len(compteurs["comptes"]) == 0:
+        return minimum
+    # valeurs triées : argmax renvoie la plus petite des valeurs les plus fréquentes
+    return float(compteurs["valeurs"][np.argmax(compteurs["comptes"])])
+
+# Etape 2 - Accumulateur par colonne
+
+def nouvelle_colonne(precision=PRECISION):
+    return {
+        "n": 0,
+        "moyenne": 0.0,
+        "m2": 0.0,
+        "min": np.inf,
+        "max": -np.inf,
+        "esquisse": nouvelle_esquisse(precision),
+        "compteurs": nouveaux_compteurs(),
+    }
+
+def ajouter_valeurs(stat, valeurs, nb_compteurs=NB_COMPTEURS):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    valeurs = valeurs[~np.isnan(valeurs)]
+    if len(valeurs) == 0:
+        return
+    partiel = {
+        "n": len(valeurs),
+        "moyenne": float(valeurs.mean()),
+        "m2": float(((valeurs - valeurs.mean()) ** 2).sum()),
+        "min": float(valeurs.min()),
+        "max": float(valeurs.max()),
+    }
+    combiner_moments(stat, partiel)
+    ajouter_esquisse(stat["esquisse"], valeurs)
+    stat["compteurs"] = ajouter_compteurs(stat["compteurs"], valeurs, nb_compteurs)
+
+# Fusion de Chan des effectifs, moyennes et sommes des carrés des écarts
+def combiner_moments(stat, autre):
+    n = stat["n"] + autre["n"]
+    if n == 0:
+        return
+    delta = autre["moyenne"] - stat["moyenne"]
+    stat["moyenne"] += delta * autre["n"] / n
+    stat["m2"] += autre["m2"] + delta ** 2 * stat["n"] * autre["n"] / n
+    stat["n"] = n
+    stat["min"] = min(stat["min"], autre["min"])
+    stat["max"] = max(stat["max"], autre["max"])
+
+# Etape 3 - Accumulateur multi-colonnes, fusion et table des paramètres
+
+def nouvel_accumulateur(colonnes, precision=PRECISION, nb_compteurs=NB_COMPTEURS):
+    return {
+        "precision": precision,
+        "nb_compteurs": nb_compteurs,
+        "colonnes": {c: nouvelle_colonne(precision) for c in colonnes},
+    }
+
+def ajouter_bloc(accu, bloc):
+    for c, stat in accu["colonnes"].items():
+        ajouter_valeurs(stat, bloc[c].to_numpy(), accu["nb_compteurs"])
+    return accu
+
+def fusionner(a, b):
+    if a["colonnes"].keys() != b["colonnes"].keys():
+        raise ValueError("Accumulateurs sur des colonnes différentes : fusion impossible")
+    accu = nouvel_accumulateur(list(a["colonnes"]), a["precision"], a["nb_compteurs"])
+    for c, stat in accu["colonnes"].items():
+        sa, sb = a["colonnes"][c], b["colonnes"][c]
+        combiner_moments(stat, sa)
+        combiner_moments(stat, sb)
+        stat["esquisse"] = fusionner_esquisses(sa["esquisse"], sb["esquisse"])
+        stat["compteurs"] = fusionner_compteurs(sa["compteurs"], sb["compteurs"], accu["nb_compteurs"])
+    return accu
+
+# Table des paramètres, mêmes colonnes que parametres_statistiques.csv
+def parametres_statistiques(accu):
+    lignes = {}
+    for c, stat in accu["colonnes"].items():
+        q = quantiles_esquisse(stat["esquisse"], [0.10, 0.25, 0.50, 0.75, 0.90])
+        representants, comptes = seaux_tries(stat["esquisse"])
+        n = stat["n"]
+        lignes[c] = {
+            "Moyenne": stat["moyenne"] if n else np.nan,
+            "Médiane": q[2],
+            "Mode": mode_compteurs(stat["compteurs"], stat["min"] if n else np.nan),
+            # écart type de population (ddof=0), comme dans main.py
+            "Écart type": np.sqrt(stat["m2"] / n) if n else np.nan,
+            "Écart absolu moyen": (comptes * np.abs(representants - stat["moyenne"])).sum() / n if n else np.nan,
+            "Étendue": stat["max"] - stat["min"] if n else np.nan,
+            "IQR": q[3] - q[1],
+            "IDR": q[4] - q[0],
+        }
+    return pd.DataFrame.from_dict(lignes, orient="index").round(2)
+
+# Table des paramètres par groupe, mêmes colonnes que parametres_par_groupe (statistiques_groupes.py)
+def parametres_groupes(groupes, cles):
+    morceaux = []
+    for cle in sorted(groupes):
+        accu = groupes[cle]
+        table = parametres_statistiques(accu)
+        table.insert(0, "Effectif", [accu["colonnes"][c]["n"] for c in table.index])
+        table.insert(0, "Variable", table.index)
+        for i, nom in enumerate(cles):
+            table.insert(i, nom, cle[i])
+        morceaux.append(table.reset_index(drop=True))
+    return pd.concat(morceaux, ignore_index=True)
+
+# Etape 4 - Lecture d'un CSV par blocs, blocs répartis entre plusieurs processus
+
+def accumuler_partiel(argument):
+    colonnes, precision, nb_compteurs, bloc = argument
+    return ajouter_bloc(nouvel_accumulateur(colonnes, precision, nb_compteurs), bloc)
+
+def accumuler_csv(chemin, colonnes, taille_bloc=500_000, workers=1,
+                  precision=PRECISION, nb_compteurs=NB_COMPTEURS, **options_csv):
+    blocs = pd.read_csv(chemin, usecols=colonnes, chunksize=taille_bloc, engine="c", **options_csv)
+    accu = nouvel_accumulateur(colonnes, precision, nb_compteurs)
+    if workers <= 1:
+        for bloc in blocs:
+            ajouter_bloc(accu, bloc)
+        return accu
+    arguments = ((colonnes, precision, nb_compteurs, bloc) for bloc in blocs)
+    methode = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    with multiprocessing.get_context(methode).Pool(workers) as pool:
+        # au plus 2 blocs par processus en mémoire à la fois
+        while True:
+            fenetre = list(itertools.islice(arguments, 2 * workers))
+            if not fenetre:
+                break
+            for partiel in pool.imap_unordered(accumuler_partiel, fenetre):
+                accu = fusionner(accu, partiel)
+    return accu
+
+# Etape 6 - Fichier des résultats lu par partitions dans un pool de processus (donnees/blocs.py)
+
+def accumuler_lignes(colonnes, precision, nb_compteurs, lignes):
+    return ajouter_bloc(nouvel_accumulateur(colonnes, precision, nb_compteurs), lignes)
+
+def accumuler_groupes(cles, colonnes, precision, nb_compteurs, table):
+    return {cle: ajouter_bloc(nouvel_accumulateur(colonnes, precision, nb_compteurs), groupe)
+            for cle, groupe in table.groupby(cles, sort=False)}
+
+def fusionner_groupes(a, b):
+    groupes = dict(a)
+    for cle, accu in b.items():
+        groupes[cle] = fusionner(groupes[cle], accu) if cle in groupes else accu
+    return groupes
+
+# Renvoie (accumulateur des colonnes, {(Nom, Prénom): accumulateur des voix})
+def accumuler_resultats(chemin, colonnes, workers=1, precision=PRECISION, nb_compteurs=NB_COMPTEURS):
+    from donnees.blocs import analyser
+    calculs = {
+        "colonnes": {"calculer": functools.partial(accumuler_lignes, colonnes, precision, nb_compteurs),
+                     "fusionner": fusionner},
+        "candidats": {"calculer": functools.partial(accumuler_groupes, ["Nom", "Prénom"], ["Voix"], precision, nb_compteurs),
+                      "fusionner": fusionner_groupes, "table": "candidats"},
+    }
+    resultats = analyser(chemin, calculs, workers)
+    return resultats["colonnes"], resultats["candidats"]
@@ -0,0 +1,98 @@
+#coding:utf8
+
+# Paramètres statistiques par groupe (région, département, candidat...) en un seul appel
+# Les valeurs sont triées une fois par (groupe, valeur) : chaque groupe devient une tranche
+# contiguë du tableau trié, et tous les paramètres se calculent sur ces tranches avec NumPy,
+# sans boucle Python sur les groupes.
+
+import numpy as np
+import pandas as pd
+
+PARAMETRES = ["Effectif", "Moyenne", "Médiane", "Mode", "Écart type", "Écart absolu moyen", "Étendue", "IQR", "IDR"]
+
+# Fonction pour lire des quantiles (interpolation linéaire, comme pandas) dans des tranches triées
+def quantiles_tranches(tries, debuts, effectifs, q):
+    rang = q * (effectifs - 1)
+    bas = np.floor(rang).astype(np.int64)
+    haut = np.minimum(bas + 1, effectifs - 1)
+    fraction = rang - bas
+    v_bas = tries[debuts + bas]
+    v_haut = tries[debuts + haut]
+    return v_bas + (v_haut - v_bas) * fraction
+
+# Fonction pour le mode de chaque tranche : valeur la plus répétée, la plus petite en cas d'égalité
+def modes_tranches(tries, groupes, nb_groupes):
+    nouvelle_serie = np.ones(len(tries), dtype=bool)
+    nouvelle_serie[1:] = (tries[1:] != tries[:-1]) | (groupes[1:] != groupes[:-1])
+    debuts_series = np.flatnonzero(nouvelle_serie)
+    longueurs = np.diff(np.append(debuts_series, len(tries)))
+    groupes_series = groupes[debuts_series]
+    # tri des séries par groupe, longueur décroissante ; à longueur égale les séries restent
+    # dans l'ordre des valeurs croissantes (tri stable)
+    ordre = np.lexsort((-longueurs, groupes_series))
+    premiers = np.ones(len(ordre), dtype=bool)
+    premiers[1:] = groupes_series[ordre][1:] != groupes_series[ordre][:-1]
+    modes = np.full(nb_groupes, np.nan)
+    modes[groupes_series[ordre][premiers]] = tries[debuts_series[ordre][premiers]]
+    return modes
+
+# Fonction pour calculer tous les paramètres d'une variable pour chaque groupe
+def parametres_variable(valeurs, groupes, nb_groupes):
+    # valeurs manquantes et lignes sans groupe (clé manquante) écartées
+    garde = ~np.isnan(valeurs) & (groupes >= 0)
+    valeurs = valeurs[garde]
+    groupes = groupes[garde]
+    # tri unique par (groupe, valeur)
+    ordre = np.lexsort((valeurs, groupes))
+    tries = valeurs[ordre]
+    groupes_tries = groupes[ordre]
+
+    effectifs = np.bincount(groupes_tries, minlength=nb_groupes)
+    debuts = np.concatenate([[0], np.cumsum(effectifs)[:-1]])
+    resultat = {p: np.full(nb_groupes, np.nan) for p in PARAMETRES}
+    resultat["Effectif"] = effectifs.astype(np.float64)
+    presents = effectifs > 0
+    if not presents.any():
+        return resultat
+    d, n = debuts[presents], effectifs[presents]
+
+    sommes = np.bincount(groupes_tries, weights=tries, minlength=nb_groupes)
+    moyennes = np.divide(sommes, effectifs, out=np.full(nb_groupes, np.nan), where=presents)
+    ecarts = tries - moyennes[groupes_tries]
+    resultat["Moyenne"] = moyennes
+    resultat["Écart type"][presents] = np.sqrt(np.bincount(groupes_tries, weights=ecarts ** 2, minlength=nb_groupes)[presents] / n)
+    resultat["Écart absolu moyen"][presents] = np.bincount(groupes_tries, weights=np.abs(ecarts), minlength=nb_groupes)[presents] / n
+    resultat["Étendue"][presents] = tries[d + n - 1] - tries[d]
+    q = {p: quantiles_tranches(tries, d, n, p) for p in (0.10, 0.25, 0.50, 0.75, 0.90)}
+    resultat["Médiane"][presents] = q[0.50]
+    resultat["IQR"][presents] = q[0.75] - q[0.25]
+    resultat["IDR"][presents] = q[0.90] - q[0.10]
+    resultat["Mode"] = modes_tranches(tries, groupes_tries, nb_groupes)
+    return resultat
+
+# Fonction principale : table longue (clés..., Variable, Effectif, Moyenne, ..., IDR)
+# une ligne par groupe et par variable
+def parametres_par_groupe(donnees, cles, variables, arrondi=2):
+    if isinstance(cles, str):
+        cles = [cles]
+    regroupement = donnees.groupby(cles, observed=True, sort=True)
+    groupes = regroupement.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    table_cles = regroupement.size().index.to_frame(index=False)
+    nb_groupes = len(table_cles)
+    morceaux = []
+    for variable in variables:
+        valeurs = donnees[variable].to_numpy(dtype=np.float64)
+        resultat = parametres_variable(valeurs, groupes, nb_groupes)
+        morceau = table_cles.copy()
+        morceau["Variable"] = variable
+        for p in PARAMETRES:
+            morceau[p] = resultat[p]
+        morceaux.append(morceau)
+    table = pd.concat(morceaux, ignore_index=True)
+    table["Effectif"] = table["Effectif"].astype(np.int64)
+    # ordre : groupe par groupe, puis variables dans l'ordre demandé
+    ordre = np.argsort(np.tile(np.arange(nb_groupes), len(variables)), kind="stable")
+    table = table.iloc[ordre].reset_index(drop=True)
+    if arrondi is not None:
+        table[PARAMETRES[1:]] = table[PARAMETRES[1:]].round(arrondi)
+    return table
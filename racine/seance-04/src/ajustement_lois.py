@@ -0,0 +1,208 @@
+#coding:utf8
+
+# Ajustement en lot des lois de scipy.stats à un échantillon et classement par AIC / BIC / KS
+# Chaque ajustement tourne dans son propre processus (au plus `workers` à la fois) avec un délai
+# maximal : un ajustement trop long (gausshyper, burr, exponweib...) est interrompu sans bloquer
+# les autres. Sur un grand échantillon, un pré-tri sur un sous-échantillon écarte d'abord les lois
+# sans espoir, puis seules les lois retenues sont ajustées sur l'échantillon complet.
+
+import os
+import time
+import warnings
+import multiprocessing
+import multiprocessing.connection
+
+import numpy as np
+import pandas as pd
+import scipy.stats
+import scipy.optimize
+
+# Taille du sous-échantillon de pré-tri et écart de KS toléré par rapport à la meilleure loi
+TAILLE_PRETRI = 2000
+TOLERANCE_KS = 0.1
+DELAI = 60
+
+COLONNES = ["Loi", "Type", "Paramètres", "Log-vraisemblance", "AIC", "BIC", "KS", "Durée (s)", "Statut"]
+
+# Bornes de recherche des paramètres des lois discrètes (évolution différentielle bornée),
+# calculées à partir du minimum et du maximum de l'échantillon
+def bornes_discretes(nom, mini, maxi):
+    grand = 2 * maxi + 10
+    bornes = {
+        "bernoulli": {"p": (0, 1)},
+        "betabinom": {"n": (maxi, grand), "a": (1e-3, 1e3), "b": (1e-3, 1e3)},
+        "betanbinom": {"n": (1, grand), "a": (1e-3, 1e3), "b": (1e-3, 1e3)},
+        "binom": {"n": (maxi, grand), "p": (0, 1)},
+        "geom": {"p": (0, 1)},
+        "hypergeom": {"M": (maxi, 5 * grand), "n": (0, 5 * grand), "N": (0, 5 * grand)},
+        "logser": {"p": (0, 1)},
+        "nbinom": {"n": (1, grand), "p": (0, 1)},
+        "poisson": {"mu": (0, maxi + 1)},
+        "randint": {"low": (mini - 10, mini), "high": (maxi + 1, maxi + 11)},
+        "zipf": {"a": (1, 10)},
+        "zipfian": {"a": (0, 10), "n": (maxi, grand)},
+    }
+    return bornes.get(nom)
+
+# Paramètres entiers des lois discrètes (nombre d'essais, tailles de population, bornes)
+PARAMETRES_ENTIERS = {"n", "M", "N", "low", "high"}
+
+def type_de_loi(nom):
+    return "continue" if isinstance(getattr(scipy.stats, nom, None), scipy.stats.rv_continuous) else "discrète"
+
+# Fonction pour ajuster une loi discrète par maximum de vraisemblance (évolution différentielle)
+# La vraisemblance est calculée sur les valeurs distinctes pondérées par leurs effectifs :
+# le coût ne dépend plus de la taille de l'échantillon mais du nombre de valeurs distinctes.
+def ajuster_discrete(loi, uniques, comptes, bornes, depart=None):
+    noms = list(bornes)
+    def oppose_log_vraisemblance(theta):
+        valeur = -np.sum(comptes * loi.logpmf(uniques, *theta))
+        return valeur if np.isfinite(valeur) else 1e300
+    resultat = scipy.optimize.differential_evolution(
+        oppose_log_vraisemblance, [bornes[p] for p in noms],
+        integrality=[p in PARAMETRES_ENTIERS for p in noms],
+        x0=None if depart is None else np.clip(depart[:len(noms)], *np.array([bornes[p] for p in noms]).T),
+        seed=0,
+    )
+    return tuple(resultat.x)
+
+# Fonction pour la distance de Kolmogorov-Smirnov d'une loi discrète (fonction de répartition en escalier)
+def ks_discret(loi, parametres, uniques, comptes):
+    f_emp = np.cumsum(comptes) / comptes.sum()
+    f_emp_avant = np.concatenate([[0.0], f_emp[:-1]])
+    f_loi = loi.cdf(uniques, *parametres)
+    f_loi_avant = loi.cdf(uniques - 1, *parametres)
+    return float(max(np.max(np.abs(f_emp - f_loi)), np.max(np.abs(f_emp_avant - f_loi_avant))))
+
+# Fonction pour ajuster une loi et calculer ses critères (exécutée dans un processus fils)
+def ajuster_une_loi(nom, x, depart=None):
+    loi = getattr(scipy.stats, nom)
+    debut = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if isinstance(loi, scipy.stats.rv_continuous):
+            type_loi = "continue"
+            if depart is None:
+                parametres = loi.fit(x)
+            else:
+                *formes, loc, scale = depart
+                parametres = loi.fit(x, *formes, loc=loc, scale=scale)
+            log_v = float(np.sum(loi.logpdf(x, *parametres)))
+            ks = float(scipy.stats.kstest(x, loi.cdf, args=parametres).statistic)
+        else:
+            type_loi = "discrète"
+            bornes = bornes_discretes(nom, float(x.min()), float(x.max()))
+            if bornes is None:
+                raise ValueError("loi discrète sans bornes de paramètres connues (non ajustable)")
+            uniques, comptes = np.unique(x, return_counts=True)
+            parametres = ajuster_discrete(loi, uniques, comptes, bornes, depart)
+            log_v = float(np.sum(comptes * loi.logpmf(uniques, *parametres)))
+            ks = ks_discret(loi, parametres, uniques, comptes)
+    k = len(parametres)
+    n = len(x)
+    return {
+        "Loi": nom,
+        "Type": type_loi,
+        "Paramètres": tuple(float(p) for p in parametres),
+        "Log-vraisemblance": log_v,
+        "AIC": 2 * k - 2 * log_v,
+        "BIC": k * np.log(n) - 2 * log_v,
+        "KS": ks,
+        "Durée (s)": time.perf_counter() - debut,
+        "Statut": "ok",
+    }
+
+def executer_dans_fils(nom, x, depart, connexion):
+    try:
+        resultat = ajuster_une_loi(nom, x, depart)
+    except Exception as erreur:
+        resultat = {"Loi": nom, "Type": type_de_loi(nom), "Statut": f"erreur : {erreur}"}
+    connexion.send(resultat)
+    connexion.close()
+
+# Fonction pour exécuter les ajustements en parallèle, chacun limité à `delai` secondes
+def executer_avec_delai(taches, x, workers, delai):
+    methode = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    contexte = multiprocessing.get_context(methode)
+    en_attente = list(taches)
+    actifs = {}
+    resultats = []
+    while en_attente or actifs:
+        while en_attente and len(actifs) < workers:
+            nom, depart = en_attente.pop(0)
+            lecture, ecriture = contexte.Pipe(duplex=False)
+            processus = contexte.Process(target=executer_dans_fils, args=(nom, x, depart, ecriture), daemon=True)
+            processus.start()
+            ecriture.close()
+            actifs[lecture] = (nom, processus, time.monotonic())
+        prets = multiprocessing.connection.wait(list(actifs), timeout=0.1)
+        for lecture in list(actifs):
+            nom, processus, debut = actifs[lecture]
+            if lecture in prets:
+                try:
+                    resultats.append(lecture.recv())
+                except EOFError:
+                    resultats.append({"Loi": nom, "Type": type_de_loi(nom), "Statut": "erreur : processus interrompu"})
+            elif time.monotonic() - debut > delai:
+                processus.kill()
+                resultats.append({"Loi": nom, "Type": type_de_loi(nom), "Statut": f"délai dépassé ({delai} s)",
+                                  "Durée (s)": delai})
+            else:
+                continue
+            processus.join()
+            lecture.close()
+            del actifs[lecture]
+    return resultats
+
+# Fonction pour écarter les lois inutilisables avant tout calcul
+def lois_candidates(noms, x):
+    entiers = np.all(np.mod(x, 1) == 0)
+    candidates = []
+    ecartees = []
+    for nom in dict.fromkeys(noms):
+        loi = getattr(scipy.stats, nom, None)
+        if loi is None:
+            ecartees.append({"Loi": nom, "Statut": "absente de cette version de scipy"})
+        elif isinstance(loi, scipy.stats.rv_discrete) and not entiers:
+            ecartees.append({"Loi": nom, "Type": "discrète", "Statut": "données non entières"})
+        elif isinstance(loi, scipy.stats.rv_discrete) and bornes_discretes(nom, 0, 0) is None:
+            ecartees.append({"Loi": nom, "Type": "discrète", "Statut": "non ajustable (paramètre vectoriel)"})
+        elif isinstance(loi, scipy.stats.rv_discrete) and "low" not in bornes_discretes(nom, 0, 0) \
+                and (x.min() < loi.a or x.max() > loi.b):
+            # loc fixé à 0 : aucune valeur des paramètres ne couvre l'échantillon
+            ecartees.append({"Loi": nom, "Type": "discrète", "Statut": "valeurs hors du support"})
+        else:
+            candidates.append(nom)
+    return candidates, ecartees
+
+# Fonction principale : ajuste chaque loi de `noms` à l'échantillon et renvoie le classement
+def ajuster_lois(echantillon, noms, workers=None, delai=DELAI, taille_pretri=TAILLE_PRETRI,
+                 tolerance_ks=TOLERANCE_KS, graine=0):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    x = np.asarray(echantillon, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    candidates, ecartees = lois_candidates(noms, x)
+    departs = {}
+    if len(x) > taille_pretri:
+        # pré-tri : ajustement rapide sur un sous-échantillon, puis seules les lois proches
+        # de la meilleure (en KS) sont ajustées sur tout l'échantillon
+        sous = np.random.default_rng(graine).choice(x, taille_pretri, replace=False)
+        pretri = executer_avec_delai([(nom, None) for nom in candidates], sous, workers, delai)
+        reussis = [r for r in pretri if r["Statut"] == "ok"]
+        meilleur_ks = min((r["KS"] for r in reussis), default=np.inf)
+        candidates = []
+        for r in pretri:
+            if r["Statut"] == "ok" and r["KS"] <= meilleur_ks + tolerance_ks:
+                candidates.append(r["Loi"])
+                departs[r["Loi"]] = r["Paramètres"]
+            elif r["Statut"] == "ok":
+                ecartees.append({"Loi": r["Loi"], "Type": r["Type"], "KS": r["KS"],
+                                 "Statut": "écartée au pré-tri"})
+            else:
+                ecartees.append(r)
+    resultats = executer_avec_delai([(nom, departs.get(nom)) for nom in candidates], x, workers, delai)
+    classement = pd.DataFrame(resultats + ecartees, columns=COLONNES)
+    classement = classement.sort_values(["AIC", "KS"], na_position="last", kind="stable", ignore_index=True)
+    classement.index = classement.index + 1
+    return classement
@@ -0,0 +1,219 @@
+#coding:utf8
+
+# Evaluation vectorisée et mise en cache des densités (PDF) et fonctions de masse (PMF)
+# - un cache LRU évite de recalculer une courbe déjà évaluée (même loi, mêmes paramètres, même grille) ;
+#   il est borné en octets (TAILLE_CACHE), pas en nombre de courbes
+# - un balayage de paramètres (ex. Poisson lambda = 0.5 ... 50) est évalué en un seul tableau
+#   (nb_parametres x nb_points) par diffusion NumPy, moyennes et écarts-types compris
+# - les lois courantes sont calculées directement avec NumPy / scipy.special, sans passer par
+#   les vérifications de scipy.stats à chaque appel ; les autres lois passent par scipy.stats,
+#   en un seul appel vectorisé.
+
+import os
+import hashlib
+import collections
+
+import numpy as np
+import scipy.stats
+from scipy.special import gammaln, xlogy, xlog1py
+
+import zipf_mandelbrot as zm
+
+# Taille maximale du cache en octets (tableaux des résultats), 256 Mo par défaut
+TAILLE_CACHE = int(os.environ.get("TAILLE_CACHE_LOIS", 256 * 2 ** 20))
+
+# Etape 1 - Formules directes : densité et (moyenne, variance) à partir des paramètres diffusés
+
+def normale(x, loc, scale):
+    z = (x - loc) / scale
+    return np.exp(-0.5 * z ** 2) / (np.sqrt(2 * np.pi) * scale)
+
+def normale_mv(loc, scale):
+    return loc, scale ** 2
+
+def lognormale(x, s, loc, scale):
+    y = (x - loc) / scale
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = np.exp(-np.log(y) ** 2 / (2 * s ** 2)) / (s * y * np.sqrt(2 * np.pi) * scale)
+    return np.where(y > 0, f, 0.0)
+
+def lognormale_mv(s, loc, scale):
+    return loc + scale * np.exp(s ** 2 / 2), scale ** 2 * np.expm1(s ** 2) * np.exp(s ** 2)
+
+def uniforme(x, loc, scale):
+    return np.where((x >= loc) & (x <= loc + scale), 1.0 / scale, 0.0)
+
+def uniforme_mv(loc, scale):
+    return loc + scale / 2, scale ** 2 / 12
+
+def chi2(x, df, loc, scale):
+    y = (x - loc) / scale
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = np.exp(xlogy(df / 2 - 1, y) - y / 2 - df / 2 * np.log(2) - gammaln(df / 2)) / scale
+    return np.where(y > 0, f, 0.0)
+
+def chi2_mv(df, loc, scale):
+    return loc + df * scale, 2 * df * scale ** 2
+
+def exponentielle(x, loc, scale):
+    y = (x - loc) / scale
+    return np.where(y >= 0, np.exp(-np.maximum(y, 0)) / scale, 0.0)
+
+def exponentielle_mv(loc, scale):
+    return loc + scale, scale ** 2
+
+def pareto(x, b, loc, scale):
+    y = (x - loc) / scale
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = b / y ** (b + 1) / scale
+    return np.where(y >= 1, f, 0.0)
+
+def pareto_mv(b, loc, scale):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moyenne = np.where(b > 1, loc + scale * b / (b - 1), np.inf)
+        variance = np.where(b > 2, scale ** 2 * b / ((b - 1) ** 2 * (b - 2)), np.inf)
+    return moyenne, variance
+
+def poisson(k, mu, loc):
+    j = k - loc
+    f = np.exp(xlogy(j, mu) - mu - gammaln(np.maximum(j, 0) + 1))
+    return np.where((j >= 0) & (j == np.floor(j)), f, 0.0)
+
+def poisson_mv(mu, loc):
+    return mu + loc, mu
+
+def binomiale(k, n, p, loc):
+    j = k - loc
+    jj = np.clip(j, 0, n)
+    f = np.exp(gammaln(n + 1) - gammaln(jj + 1) - gammaln(n - jj + 1) + xlogy(jj, p) + xlog1py(n - jj, -p))
+    return np.where((j >= 0) & (j <= n) & (j == np.floor(j)), f, 0.0)
+
+def binomiale_mv(n, p, loc):
+    return n * p + loc, n * p * (1 - p)
+
+# Zipf-Mandelbrot (tronquée à kmax, ou infinie) : normalisation et moments par la fonction zêta
+# de Hurwitz (module zipf_mandelbrot), sans construire le support 1..kmax
+def zipf_mandelbrot(k, s, q, kmax):
+    return zm.pmf(k, s, q, kmax)
+
+def zipf_mandelbrot_mv(s, q, kmax):
+    moyenne, ecart_type = zm.moyenne_ecart_type(s, q, kmax)
+    return moyenne, ecart_type ** 2
+
+# nom -> (densité, moments, paramètres dans l'ordre de scipy.stats, valeurs par défaut)
+LOIS_NATIVES = {
+    "norm": (normale, normale_mv, ["loc", "scale"], {"loc": 0.0, "scale": 1.0}),
+    "lognorm": (lognormale, lognormale_mv, ["s", "loc", "scale"], {"loc": 0.0, "scale": 1.0}),
+    "uniform": (uniforme, uniforme_mv, ["loc", "scale"], {"loc": 0.0, "scale": 1.0}),
+    "chi2": (chi2, chi2_mv, ["df", "loc", "scale"], {"loc": 0.0, "scale": 1.0}),
+    "expon": (exponentielle, exponentielle_mv, ["loc", "scale"], {"loc": 0.0, "scale": 1.0}),
+    "pareto": (pareto, pareto_mv, ["b", "loc", "scale"], {"loc": 0.0, "scale": 1.0}),
+    "poisson": (poisson, poisson_mv, ["mu", "loc"], {"loc": 0.0}),
+    "binom": (binomiale, binomiale_mv, ["n", "p", "loc"], {"loc": 0.0}),
+    "zipf_mandelbrot": (zipf_mandelbrot, zipf_mandelbrot_mv, ["s", "q", "kmax"], {}),
+}
+
+# Etape 2 - Normalisation des paramètres (positionnels ou nommés) vers un dictionnaire complet
+
+def noms_parametres(nom):
+    if nom in LOIS_NATIVES:
+        return LOIS_NATIVES[nom][2], LOIS_NATIVES[nom][3]
+    loi = getattr(scipy.stats, nom)
+    formes = [f.strip() for f in loi.shapes.split(",")] if loi.shapes else []
+    if isinstance(loi, scipy.stats.rv_discrete):
+        return formes + ["loc"], {"loc": 0.0}
+    return formes + ["loc", "scale"], {"loc": 0.0, "scale": 1.0}
+
+def completer_parametres(nom, args, kwds):
+    noms, defauts = noms_parametres(nom)
+    parametres = dict(defauts)
+    parametres.update(zip(noms, args))
+    parametres.update(kwds)
+    manquants = [p for p in noms if p not in parametres]
+    if manquants:
+        raise ValueError(f"Paramètres manquants pour {nom} : {', '.join(manquants)}")
+    return noms, parametres
+
+# Etape 3 - Evaluation mise en cache
+# Les tableaux ne sont pas hachables : la clé du cache contient leur forme, leur dtype et l'empreinte
+# SHA-1 de leurs octets (quelques dizaines d'octets par tableau, quelle que soit sa taille).
+# Cache LRU : dictionnaire ordonné, entrée la plus ancienne retirée tant que le total dépasse TAILLE_CACHE.
+
+_CACHE = collections.OrderedDict()
+_ETAT = {"octets": 0}
+
+def cle_tableau(tableau):
+    return tableau.shape, tableau.dtype.str, hashlib.sha1(tableau).hexdigest()
+
+def calculer(nom, noms, parametres, grille):
+    forme = np.broadcast_shapes(*[p.shape for p in parametres])
+    # paramètres en colonnes (nb_jeux, 1), grille en ligne (1, nb_points)
+    colonnes = [np.broadcast_to(p, forme)[..., None] for p in parametres]
+    if nom in LOIS_NATIVES:
+        densite, moments, _, _ = LOIS_NATIVES[nom]
+        valeurs = densite(grille, *colonnes)
+        moyennes, variances = moments(*[c[..., 0] for c in colonnes])
+    else:
+        loi = getattr(scipy.stats, nom)
+        fonction = loi.pmf if isinstance(loi, scipy.stats.rv_discrete) else loi.pdf
+        arguments = dict(zip(noms, colonnes))
+        valeurs = fonction(grille, **arguments)
+        moyennes, variances = loi.stats(**{n: c[..., 0] for n, c in arguments.items()}, moments="mv")
+    resultat = {
+        "grille": grille,
+        "valeurs": np.asarray(valeurs, dtype=np.float64),
+        "moyennes": np.array(np.broadcast_to(np.asarray(moyennes, dtype=np.float64), forme)),
+        "ecarts_types": np.array(np.sqrt(np.broadcast_to(np.asarray(variances, dtype=np.float64), forme))),
+    }
+    # les résultats du cache sont partagés entre appels : lecture seule
+    for tableau in resultat.values():
+        tableau.flags.writeable = False
+    return resultat
+
+def evaluer_cache(nom, noms, parametres, grille):
+    cle = (nom, tuple(zip(noms, map(cle_tableau, parametres))), cle_tableau(grille))
+    if cle in _CACHE:
+        _CACHE.move_to_end(cle)
+        return _CACHE[cle]
+    resultat = calculer(nom, noms, parametres, grille)
+    octets = sum(tableau.nbytes for tableau in resultat.values())
+    if octets <= TAILLE_CACHE:
+        _CACHE[cle] = resultat
+        _ETAT["octets"] += octets
+        while _ETAT["octets"] > TAILLE_CACHE:
+            _, ancien = _CACHE.popitem(last=False)
+            _ETAT["octets"] -= sum(tableau.nbytes for tableau in ancien.values())
+    return resultat
+
+# Fonction principale : évalue la loi `nom` sur la grille ; chaque paramètre peut être un scalaire
+# ou un tableau 1-D (balayage). Renvoie un dictionnaire :
+#   grille (nb_points,), valeurs (nb_jeux, nb_points) ou (nb_points,), moyennes, ecarts_types
+def evaluer(nom, grille, *args, **kwds):
+    noms, parametres = completer_parametres(nom, args, kwds)
+    # copies contiguës en float64 : les tableaux gardés en cache ne suivent pas ceux de l'appelant
+    parametres = [np.array(parametres[n], dtype=np.float64) for n in noms]
+    return evaluer_cache(nom, noms, parametres, np.array(grille, dtype=np.float64))
+
+# Fonction pour évaluer une loi gelée de scipy.stats (ex. scipy.stats.norm(0, 1)) sur une grille
+def evaluer_gelee(gelee, grille):
+    return evaluer(gelee.dist.name, grille, *gelee.args, **gelee.kwds)
+
+# Fonction pour la moyenne et l'écart-type d'une loi gelée (sans évaluer de courbe)
+def moments_gelee(gelee):
+    resultat = evaluer_gelee(gelee, np.empty(0))
+    return float(resultat["moyennes"]), float(resultat["ecarts_types"])
+
+# Fonction pour un balayage : un paramètre varie, les autres sont fixés
+# ex. balayage("poisson", np.arange(0, 80), "mu", np.linspace(0.5, 50, 100))
+def balayage(nom, grille, parametre, valeurs, *args, **kwds):
+    kwds = dict(kwds)
+    kwds[parametre] = np.asarray(valeurs, dtype=np.float64)
+    return evaluer(nom, grille, *args, **kwds)
+
+def vider_cache():
+    _CACHE.clear()
+    _ETAT["octets"] = 0
+
+# Fonction pour l'état du cache : nombre de courbes et octets occupés
+def infos_cache():
+    return {"entrees": len(_CACHE), "octets": _ETAT["octets"]}
@@ -1,16 +1,27 @@
 #coding:utf8
 
 import os
+import sys
+# Paquet commun racine/donnees (monté dans /application/donnees par docker-compose)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+# Mode sans affichage (SANS_AFFICHAGE, moteur Agg) : à importer avant matplotlib
+from donnees.execution import fin_demarrage
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import scipy
 import scipy.stats
+from ajustement_lois import ajuster_lois
+from evaluation_lois import evaluer, evaluer_gelee, moments_gelee, balayage
+import zipf_mandelbrot as zm
+from donnees import charger_fichier
+from donnees.pipeline import executer
+from donnees.instrumentation import compter
 
 #https://docs.scipy.org/doc/scipy/reference/stats.html
 
 
-dist_names = ['norm', 'beta', 'gamma', 'pareto', 't', 'lognorm', 'invgamma', 'invgauss',  'loggamma', 'alpha', 'chi', 'chi2', 'bradford', 'burr', 'burr12', 'cauchy', 'dweibull', 'erlang', 'expon', 'exponnorm', 'exponweib', 'exponpow', 'f', 'genpareto', 'gausshyper', 'gibrat', 'gompertz', 'gumbel_r', 'pareto', 'pearson3', 'powerlaw', 'triang', 'weibull_min', 'weibull_max', 'bernoulli', 'betabinom', 'betanbinom', 'binom', 'geom', 'hypergeom', 'logser', 'nbinom', 'poisson', 'poisson_binom', 'randint', 'zipf', 'zipfian']
+dist_names = ['norm', 'beta', 'gamma', 'pareto', 't', 'lognorm', 'invgamma', 'invgauss',  'loggamma', 'alpha', 'chi', 'chi2', 'bradford', 'burr', 'burr12', 'cauchy', 'dweibull', 'erlang', 'expon', 'exponnorm', 'exponweib', 'exponpow', 'f', 'genpareto', 'gausshyper', 'gibrat', 'gompertz', 'gumbel_r', 'pearson3', 'powerlaw', 'triang', 'weibull_min', 'weibull_max', 'bernoulli', 'betabinom', 'betanbinom', 'binom', 'geom', 'hypergeom', 'logser', 'nbinom', 'poisson', 'poisson_binom', 'randint', 'zipf', 'zipfian']
 
 print(dist_names)
 
@@ -35,7 +46,7 @@ def plot_dirac(k0=0, kmin=None, kmax=None, save="dirac.png"):
     k = np.arange(kmin, kmax + 1)
     pmf = (k == k0).astype(int)
     fig = plt.figure()
-    plt.stem(k, pmf, use_line_collection=True)
+    plt.stem(k, pmf)
     plt.title(f"Loi de Dirac (k0={k0})")
     plt.xlabel("k")
     plt.ylabel("p(k)")
@@ -55,9 +66,8 @@ def plot_uniform_discrete(a=0, b=10, save="uniform_discrete.png"):
 # Loi binomiale
 def plot_binomiale(n=20, p=0.3, save="binomiale.png"):
     k = np.arange(0, n + 1)
-    dist = scipy.stats.binom(n, p)
     fig = plt.figure()
-    plt.bar(k, dist.pmf(k))
+    plt.bar(k, evaluer("binom", k, n, p)["valeurs"])
     plt.title(f"Binomiale (n={n}, p={p})")
     plt.xlabel("k")
     plt.ylabel("p(k)")
@@ -66,20 +76,30 @@ def plot_binomiale(n=20, p=0.3, save="binomiale.png"):
 # Loi de Poisson
 def plot_poisson(mu=3, save="poisson.png"):
     k = np.arange(0, 20)
-    dist = scipy.stats.poisson(mu)
     fig = plt.figure()
-    plt.bar(k, dist.pmf(k))
+    plt.bar(k, evaluer("poisson", k, mu)["valeurs"])
     plt.title(f"Poisson (λ={mu})")
     plt.xlabel("k")
     plt.ylabel("p(k)")
     save_fig(fig, save)
 
+# Famille de lois de Poisson (balayage de lambda évalué en un seul tableau)
+def plot_poisson_balayage(mus=(0.5, 1, 2, 5, 10, 20), kmax=40, save="poisson_balayage.png"):
+    k = np.arange(0, kmax + 1)
+    resultat = balayage("poisson", k, "mu", mus)
+    fig = plt.figure()
+    for mu, pmf in zip(mus, resultat["valeurs"]):
+        plt.plot(k, pmf, marker="o", markersize=3, label=f"λ={mu}")
+    plt.title("Poisson : balayage de λ")
+    plt.xlabel("k")
+    plt.ylabel("p(k)")
+    plt.legend()
+    save_fig(fig, save)
+
 # Loi de Zipf-Mandelbrot
 def zipf_mandelbrot_pmf(s=1.5, q=1.0, kmax=100):
     k = np.arange(1, kmax + 1)
-    probs = (k + q) ** (-s)
-    probs /= probs.sum()
-    return k, probs
+    return k, evaluer("zipf_mandelbrot", k, s, q, kmax)["valeurs"]
 
 def plot_zipf_mandelbrot(s=1.5, q=1.0, kmax=100, save="zipf_mandelbrot.png"):
     k, pmf = zipf_mandelbrot_pmf(s, q, kmax)
@@ -94,71 +114,133 @@ def plot_zipf_mandelbrot(s=1.5, q=1.0, kmax=100, save="zipf_mandelbrot.png"):
 
 def plot_pdf(frozen, x, title, save):
     fig = plt.figure()
-    plt.plot(x, frozen.pdf(x))
+    plt.plot(x, evaluer_gelee(frozen, x)["valeurs"])
     plt.title(title)
     plt.xlabel("x")
     plt.ylabel("f(x)")
     save_fig(fig, save)
 
-# Lois continues principales
-def plot_continues():
-    # Poisson (en PMF, même si discrète)
-    plot_poisson(3, save="poisson_continu.png")
-
+# Lois continues principales : (loi gelée, grille, titre, fichier)
+LOIS_CONTINUES = [
     # Loi normale
-    x = np.linspace(-5, 5, 400)
-    plot_pdf(scipy.stats.norm(0, 1), x, "Normale N(0,1)", "normale.png")
-
+    (scipy.stats.norm(0, 1), np.linspace(-5, 5, 400), "Normale N(0,1)", "normale.png"),
     # Loi log-normale
-    x = np.linspace(0.01, 10, 400)
-    plot_pdf(scipy.stats.lognorm(s=0.6), x, "Log-normale", "lognormale.png")
-
+    (scipy.stats.lognorm(s=0.6), np.linspace(0.01, 10, 400), "Log-normale", "lognormale.png"),
     # Loi uniforme continue
-    x = np.linspace(0, 1, 200)
-    plot_pdf(scipy.stats.uniform(0, 1), x, "Uniforme continue [0,1]", "uniforme_continue.png")
-
+    (scipy.stats.uniform(0, 1), np.linspace(0, 1, 200), "Uniforme continue [0,1]", "uniforme_continue.png"),
     # Loi du chi²
-    x = np.linspace(0, 20, 400)
-    plot_pdf(scipy.stats.chi2(4), x, "Chi² (df=4)", "chi2.png")
-
+    (scipy.stats.chi2(4), np.linspace(0, 20, 400), "Chi² (df=4)", "chi2.png"),
     # Loi de Pareto
-    x = np.linspace(1, 10, 400)
-    plot_pdf(scipy.stats.pareto(2.5), x, "Pareto (b=2.5)", "pareto.png")
+    (scipy.stats.pareto(2.5), np.linspace(1, 10, 400), "Pareto (b=2.5)", "pareto.png"),
+]
+
+def plot_continues():
+    # Poisson (en PMF, même si discrète)
+    plot_poisson(3, save="poisson_continu.png")
+    for frozen, x, title, save in LOIS_CONTINUES:
+        plot_pdf(frozen, x, title, save)
 
 # Etape 4 - Fonctions moyenne et écart-type
 
 def mean_std_from_frozen(dist):
-    return float(dist.mean()), float(dist.std())
+    return moments_gelee(dist)
 
 def mean_std_from_pmf(k, pmf):
     m = (k * pmf).sum()
     v = ((k - m) ** 2 * pmf).sum()
     return float(m), float(np.sqrt(v))
 
-# Etape 5 - Exécution principale
-if __name__ == '__main__':
+# Zipf-Mandelbrot : moyenne et écart-type exacts sans construire le support (kmax peut valoir des millions)
+def mean_std_zipf_mandelbrot(s=1.5, q=1.0, kmax=100):
+    m, e = zm.moyenne_ecart_type(s, q, kmax)
+    return float(m), float(e)
+
+# Calculs de moyenne / écart-type exemples
+# Lois gelées (scipy.stats) ou paramètres (s, q, kmax) de Zipf-Mandelbrot : paramètres de l'étape
+# "moments", recalculée quand ils changent
+LOIS_MOMENTS = {
+    "Binomiale(20,0.3)": scipy.stats.binom(20, 0.3),
+    "Poisson(3)": scipy.stats.poisson(3),
+    "Zipf-Mandelbrot": (1.5, 1.0, 100),
+    "Zipf-Mandelbrot (kmax=10^7)": (1.5, 1.0, 10**7),
+    "Normale(0,1)": scipy.stats.norm(0, 1),
+    "Log-normale": scipy.stats.lognorm(0.6),
+    "Pareto(2.5)": scipy.stats.pareto(2.5),
+}
+
+def moyennes_ecarts_types(lois):
+    print("\n--- Moyennes et écarts-types ---\n")
+    moments = {
+        "Dirac(0)": mean_std_from_pmf(np.array([0]), np.array([1])),
+        "Uniforme discrète 0..10": mean_std_from_pmf(np.arange(0,11), np.ones(11)/11),
+    }
+    for nom, loi in lois.items():
+        moments[nom] = mean_std_zipf_mandelbrot(*loi) if isinstance(loi, tuple) else mean_std_from_frozen(loi)
+    for nom, valeurs in moments.items():
+        print(f"{nom} :", valeurs)
+    return moments
+
+# Etape 6 - Ajustement de toutes les lois de dist_names à un échantillon
+# ECHANTILLON="chemin.csv:colonne" pour un fichier (ex. surfaces des îles, inscrits par département),
+# sinon échantillon log-normal simulé
+SOURCE_ECHANTILLON = os.environ.get("ECHANTILLON")
+# Processus pour l'ajustement et les étapes : 1 par défaut, comme dans les autres séances ; 0 pour tous les cœurs
+NB_WORKERS = int(os.environ.get("NB_WORKERS", 1)) or os.cpu_count() or 1
+
+def lire_echantillon(source):
+    if source:
+        chemin, colonne = source.rsplit(":", 1)
+        return pd.to_numeric(charger_fichier(chemin, [colonne])[colonne], errors="coerce").dropna().to_numpy()
+    return scipy.stats.lognorm(s=0.6).rvs(size=1000, random_state=0)
+
+def ajuster_echantillon(echantillon, delai):
+    compter(len(echantillon))
+    classement = ajuster_lois(echantillon, dist_names, workers=NB_WORKERS, delai=delai)
+    print("\n--- Classement des lois ajustées (AIC) ---\n")
+    print(classement[["Loi", "Type", "AIC", "BIC", "KS", "Durée (s)", "Statut"]].head(15))
+    classement.to_csv("classement_lois.csv", sep=";", encoding="utf-8")
+    print("Classement complet enregistré dans classement_lois.csv")
+    return classement
 
+# Etape 5 - Exécution principale
+# Chaque graphique, les moments et l'ajustement sont des étapes indépendantes (donnees/pipeline.py) :
+# exécutées en parallèle par NB_WORKERS processus et mises en cache ; une exécution interrompue
+# reprend là où elle s'est arrêtée et seules les étapes modifiées sont recalculées. L'ajustement
+# répartit lui-même les lois entre NB_WORKERS processus : il est exécuté dans le processus principal,
+# une fois les autres étapes du pool terminées
+def image(nom):
+    return os.path.join(IMG_DIR, nom)
+
+ETAPES = {
     # Lois discrètes
-    plot_dirac()
-    plot_uniform_discrete()
-    plot_binomiale()
-    plot_poisson()
-    plot_zipf_mandelbrot()
-
+    "dirac": {"fonction": plot_dirac, "sorties": [image("dirac.png")]},
+    "uniforme_discrete": {"fonction": plot_uniform_discrete, "sorties": [image("uniform_discrete.png")]},
+    "binomiale": {"fonction": plot_binomiale, "sorties": [image("binomiale.png")]},
+    "poisson": {"fonction": plot_poisson, "sorties": [image("poisson.png")]},
+    "zipf_mandelbrot": {"fonction": plot_zipf_mandelbrot, "sorties": [image("zipf_mandelbrot.png")]},
+    "poisson_balayage": {"fonction": plot_poisson_balayage, "sorties": [image("poisson_balayage.png")]},
     # Lois continues
-    plot_continues()
+    "poisson_continu": {"fonction": plot_poisson, "parametres": {"mu": 3, "save": "poisson_continu.png"},
+                        "sorties": [image("poisson_continu.png")]},
+    **{os.path.splitext(save)[0]: {"fonction": plot_pdf,
+                                   "parametres": {"frozen": frozen, "x": x, "title": title, "save": save},
+                                   "sorties": [image(save)]}
+       for frozen, x, title, save in LOIS_CONTINUES},
+    # Moyennes et écarts-types
+    "moments": {"fonction": moyennes_ecarts_types,
+                "parametres": {"lois": LOIS_MOMENTS}},
+    # Ajustement
+    "echantillon": {"fonction": lire_echantillon, "parametres": {"source": SOURCE_ECHANTILLON},
+                    "fichiers": [SOURCE_ECHANTILLON.rsplit(":", 1)[0]] if SOURCE_ECHANTILLON else []},
+    "ajustement": {"fonction": ajuster_echantillon, "entrees": ["echantillon"],
+                   "parametres": {"delai": float(os.environ.get("DELAI_AJUSTEMENT", 60))},
+                   "sorties": ["classement_lois.csv"], "principal": True},
+}
 
-    # Calculs de moyenne / écart-type exemples
-    print("\n--- Moyennes et écarts-types ---\n")
-    print("Dirac(0) :", mean_std_from_pmf(np.array([0]), np.array([1])))
-    print("Uniforme discrète 0..10 :", mean_std_from_pmf(np.arange(0,11), np.ones(11)/11))
-    print("Binomiale(20,0.3) :", mean_std_from_frozen(scipy.stats.binom(20,0.3)))
-    print("Poisson(3) :", mean_std_from_frozen(scipy.stats.poisson(3)))
-    k, pmf = zipf_mandelbrot_pmf()
-    print("Zipf-Mandelbrot :", mean_std_from_pmf(k, pmf))
-    print("Normale(0,1) :", mean_std_from_frozen(scipy.stats.norm(0,1)))
-    print("Log-normale :", mean_std_from_frozen(scipy.stats.lognorm(0.6)))
-    print("Pareto(2.5) :", mean_std_from_frozen(scipy.stats.pareto(2.5)))
+if __name__ == '__main__':
 
-    print(f"\nImages sauvegardées dans '{IMG_DIR}'")
+    fin_demarrage("seance-04", budget=3.0)
+
+    executer(ETAPES, workers=NB_WORKERS)
 
+    print(f"\nImages sauvegardées dans '{IMG_DIR}'")
@@ -0,0 +1,148 @@
+#coding:utf8
+
+# Loi de Zipf-Mandelbrot p(k) = (k + q)^(-s) / H(s, q, kmax), k = 1 ... kmax (kmax peut être infini)
+# La constante H est obtenue sans parcourir le support :
+# - s > 1 : fonction zêta de Hurwitz, H = zeta(s, 1 + q) - zeta(s, kmax + 1 + q)
+# - s <= 1 (kmax fini obligatoire) : somme directe des premiers termes + formule d'Euler-Maclaurin
+# Les calculs sont faits en logarithmes et toutes les fonctions acceptent des tableaux (diffusion
+# NumPy) : pmf, cdf, moyenne, écart-type en mémoire O(1) par valeur, quel que soit kmax.
+
+import numpy as np
+import scipy.optimize
+from scipy.special import zeta
+
+# Nombre de termes sommés directement avant la formule d'Euler-Maclaurin
+NB_TERMES_DIRECTS = 64
+
+# Fonction pour la somme S(t, q, n) = somme des (k + q)^(-t) pour k = 1 ... n
+def somme_puissances(t, q, n):
+    t, q, n = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (t, q, n)])
+    resultat = np.full(t.shape, np.inf)
+    n_fini = np.isfinite(n)
+    # s > 1 : zêta de Hurwitz
+    converge = t > 1
+    with np.errstate(all="ignore"):
+        queue = np.where(n_fini, zeta(t, np.where(n_fini, n, 0) + 1 + q), 0.0)
+        resultat = np.where(converge, zeta(t, 1 + q) - queue, resultat)
+    # s <= 1 et n fini : Euler-Maclaurin
+    autres = ~converge & n_fini
+    if np.any(autres):
+        resultat = np.where(autres, somme_euler_maclaurin(t, q, np.where(n_fini, n, 1)), resultat)
+    return resultat
+
+def somme_euler_maclaurin(t, q, n):
+    m = np.minimum(n, NB_TERMES_DIRECTS)
+    directe = np.zeros(t.shape)
+    for k in range(1, NB_TERMES_DIRECTS + 1):
+        directe += np.where(k <= m, (k + q) ** (-t), 0.0)
+    a = m + 1 + q
+    b = n + q
+    reste = n > m
+    with np.errstate(all="ignore"):
+        # intégrale de x^(-t) entre a et b
+        integrale = np.where(np.abs(t - 1) < 1e-12, np.log(b / a), (b ** (1 - t) - a ** (1 - t)) / (1 - t))
+        f = lambda x: x ** (-t)
+        # dérivées impaires de x^(-t) : f' = -t x^(-t-1), f''' = -t(t+1)(t+2) x^(-t-3), ...
+        d1 = lambda x: -t * x ** (-t - 1)
+        d3 = lambda x: -t * (t + 1) * (t + 2) * x ** (-t - 3)
+        d5 = lambda x: -t * (t + 1) * (t + 2) * (t + 3) * (t + 4) * x ** (-t - 5)
+        correction = ((f(a) + f(b)) / 2
+                      + (d1(b) - d1(a)) / 12
+                      - (d3(b) - d3(a)) / 720
+                      + (d5(b) - d5(a)) / 30240)
+    return directe + np.where(reste, integrale + correction, 0.0)
+
+# Logarithme de la constante de normalisation
+def log_normalisation(s, q, kmax=np.inf):
+    return np.log(somme_puissances(s, q, kmax))
+
+def log_pmf(k, s, q, kmax=np.inf):
+    k = np.asarray(k, dtype=np.float64)
+    valeur = -np.asarray(s) * np.log(np.maximum(k + q, 1e-300)) - log_normalisation(s, q, kmax)
+    dans_support = (k >= 1) & (k <= kmax) & (k == np.floor(k))
+    return np.where(dans_support, valeur, -np.inf)
+
+def pmf(k, s, q, kmax=np.inf):
+    return np.exp(log_pmf(k, s, q, kmax))
+
+# Fonction de répartition P(K <= k) et fonction de survie P(K > k), sans sommer le support
+def cdf(k, s, q, kmax=np.inf):
+    k = np.clip(np.floor(np.asarray(k, dtype=np.float64)), 0, kmax)
+    return np.where(k >= 1, np.exp(np.log(somme_puissances(s, q, np.maximum(k, 1))) - log_normalisation(s, q, kmax)), 0.0)
+
+def sf(k, s, q, kmax=np.inf):
+    k = np.clip(np.floor(np.asarray(k, dtype=np.float64)), 0, kmax)
+    # somme de k+1 à kmax, calculée directement (précise dans la queue de la loi)
+    with np.errstate(all="ignore"):
+        queue = somme_puissances(s, q + k, np.asarray(kmax, dtype=np.float64) - k)
+    return np.where(k >= kmax, 0.0, queue / somme_puissances(s, q, kmax))
+
+# Moyenne et écart-type : E[K] = (S(s-1) - q S(s)) / S(s), E[K^2] = (S(s-2) - 2q S(s-1) + q^2 S(s)) / S(s)
+def moyenne_ecart_type(s, q, kmax=np.inf):
+    s = np.asarray(s, dtype=np.float64)
+    q = np.asarray(q, dtype=np.float64)
+    s0 = somme_puissances(s, q, kmax)
+    s1 = somme_puissances(s - 1, q, kmax)
+    s2 = somme_puissances(s - 2, q, kmax)
+    with np.errstate(all="ignore"):
+        moyenne = (s1 - q * s0) / s0
+        moment2 = (s2 - 2 * q * s1 + q ** 2 * s0) / s0
+        variance = np.maximum(moment2 - moyenne ** 2, 0.0)
+    return moyenne, np.sqrt(variance)
+
+# Tirage par inversion de la fonction de répartition : recherche dichotomique vectorisée sur k,
+# en O(n log kmax) opérations et O(n) mémoire
+def echantillon(n, s, q, kmax=np.inf, graine=None):
+    u = np.random.default_rng(graine).random(n)
+    bas = np.zeros(n)
+    haut = np.ones(n)
+    if np.isfinite(kmax):
+        haut[:] = kmax
+    else:
+        # borne supérieure trouvée par doublement
+        while True:
+            trop_petit = cdf(haut, s, q, kmax) < u
+            if not trop_petit.any():
+                break
+            haut[trop_petit] *= 2
+    # invariant : cdf(bas) < u <= cdf(haut)
+    while True:
+        actifs = haut - bas > 1
+        if not actifs.any():
+            break
+        milieu = np.floor((bas + haut) / 2)
+        au_dessus = cdf(milieu, s, q, kmax) >= u
+        haut = np.where(actifs & au_dessus, milieu, haut)
+        bas = np.where(actifs & ~au_dessus, milieu, bas)
+    return haut.astype(np.int64)
+
+# Ajustement de (s, q) par maximum de vraisemblance
+# k : rangs observés (entiers >= 1) ; kmax : taille du support (par défaut le plus grand rang observé)
+# q est optimisé sur l'échelle log(1 + q) ; plusieurs points de départ évitent les plateaux de la
+# vraisemblance (s et q sont fortement corrélés).
+def ajuster(k, kmax=None, departs=((0.8, 0.0), (1.5, 0.0), (1.5, 5.0), (3.0, 1.0))):
+    k = np.asarray(k, dtype=np.float64)
+    if kmax is None:
+        kmax = float(k.max())
+    uniques, comptes = np.unique(k, return_counts=True)
+    n = comptes.sum()
+
+    def oppose_log_vraisemblance(theta):
+        s, q = theta[0], np.expm1(theta[1])
+        valeur = s * np.sum(comptes * np.log(uniques + q)) + n * log_normalisation(s, q, kmax)
+        return valeur if np.isfinite(valeur) else 1e300
+
+    # s > 1 nécessaire quand le support est infini
+    borne_s = 1 + 1e-6 if not np.isfinite(kmax) else 1e-6
+    bornes = [(borne_s, 50.0), (np.log(1e-9), np.log1p(1e6))]
+    meilleur = None
+    for s0, q0 in departs:
+        resultat = scipy.optimize.minimize(
+            oppose_log_vraisemblance, x0=[max(s0, borne_s + 0.1), np.log1p(q0)],
+            method="L-BFGS-B", bounds=bornes,
+        )
+        if meilleur is None or resultat.fun < meilleur.fun:
+            meilleur = resultat
+    s, q = meilleur.x[0], np.expm1(meilleur.x[1])
+    return {"s": float(s), "q": float(q), "kmax": kmax, "log_vraisemblance": float(-meilleur.fun),
+            "converge": bool(meilleur.success)}
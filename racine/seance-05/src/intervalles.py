@@ -0,0 +1,85 @@
+#coding:utf8
+
+# Intervalles de fluctuation et de confiance d'une proportion, calculés en bloc
+# comptes : tableau d'effectifs (échantillons x modalités), totaux : taille de chaque échantillon
+# (par défaut la somme de chaque ligne). Toutes les lignes et toutes les modalités sont traitées
+# en une seule opération NumPy, sans boucle Python : 100 échantillons ou un million, même appel.
+# Les fréquences ne sont pas arrondies avant le calcul de l'erreur type.
+
+import numpy as np
+import pandas as pd
+from scipy.special import betaincinv, ndtri
+
+# Fonction pour le quantile de la loi normale associé à un niveau de confiance (0.95 -> 1.96)
+def quantile_normal(niveau):
+    return float(ndtri(1 - (1 - niveau) / 2))
+
+# Wald : f +/- z * sqrt(f (1 - f) / n) (formule du cours)
+def wald(x, n, niveau):
+    z = quantile_normal(niveau)
+    f = x / n
+    marge = z * np.sqrt(f * (1 - f) / n)
+    return f - marge, f + marge
+
+# Wilson : inversion du test du score, reste dans [0, 1] et se comporte bien près de 0 et 1
+def wilson(x, n, niveau):
+    z = quantile_normal(niveau)
+    f = x / n
+    denominateur = 1 + z ** 2 / n
+    centre = (f + z ** 2 / (2 * n)) / denominateur
+    marge = z / denominateur * np.sqrt(f * (1 - f) / n + z ** 2 / (4 * n ** 2))
+    return np.clip(centre - marge, 0, 1), np.clip(centre + marge, 0, 1)
+
+# Agresti-Coull : Wald appliqué à x + z²/2 succès sur n + z² essais, borné à [0, 1]
+def agresti_coull(x, n, niveau):
+    z = quantile_normal(niveau)
+    n_tilde = n + z ** 2
+    p_tilde = (x + z ** 2 / 2) / n_tilde
+    marge = z * np.sqrt(p_tilde * (1 - p_tilde) / n_tilde)
+    return np.clip(p_tilde - marge, 0, 1), np.clip(p_tilde + marge, 0, 1)
+
+# Clopper-Pearson (exact) : quantiles de lois bêta, calculés sur tout le tableau d'un coup
+def clopper_pearson(x, n, niveau):
+    alpha = 1 - niveau
+    with np.errstate(invalid="ignore"):
+        inf = np.where(x > 0, betaincinv(x, n - x + 1, alpha / 2), 0.0)
+        sup = np.where(x < n, betaincinv(x + 1, n - x, 1 - alpha / 2), 1.0)
+    return inf, sup
+
+METHODES = {
+    "wald": wald,
+    "wilson": wilson,
+    "agresti_coull": agresti_coull,
+    "clopper_pearson": clopper_pearson,
+}
+
+# Fonction principale : bornes inférieures et supérieures de l'intervalle de confiance de chaque
+# case du tableau d'effectifs, de même forme que `comptes`
+def intervalles_confiance(comptes, totaux=None, niveau=0.95, methode="wald"):
+    if methode not in METHODES:
+        raise ValueError(f"Méthode d'intervalle inconnue : {methode} (disponibles : {', '.join(METHODES)})")
+    x = np.asarray(comptes, dtype=np.float64)
+    if totaux is None:
+        totaux = x.sum(axis=-1, keepdims=True)
+    n = np.asarray(totaux, dtype=np.float64)
+    if n.ndim == 1 and x.ndim == 2 and len(n) == len(x):
+        # une taille par échantillon (ligne)
+        n = n[:, None]
+    inf, sup = METHODES[methode](x, n, niveau)
+    return np.broadcast_to(inf, x.shape), np.broadcast_to(sup, x.shape)
+
+# Intervalle de fluctuation : centré sur la fréquence p de la population, pour des échantillons de
+# taille n (p et n peuvent être des tableaux)
+def intervalles_fluctuation(p, n, niveau=0.95):
+    z = quantile_normal(niveau)
+    p = np.asarray(p, dtype=np.float64)
+    marge = z * np.sqrt(p * (1 - p) / n)
+    return p - marge, p + marge
+
+# Fonction pour présenter les intervalles d'un DataFrame d'effectifs (une ligne par échantillon)
+# colonnes : (modalité, "inf" / "sup")
+def table_intervalles(comptes, niveau=0.95, methode="wald"):
+    inf, sup = intervalles_confiance(comptes.to_numpy(), niveau=niveau, methode=methode)
+    colonnes = pd.MultiIndex.from_product([comptes.columns, ["inf", "sup"]])
+    return pd.DataFrame(np.stack([inf, sup], axis=-1).reshape(len(comptes), -1),
+                        index=comptes.index, columns=colonnes)
@@ -1,17 +1,37 @@
+import os
+import sys
+# Paquet commun racine/donnees (monté dans /application/donnees par docker-compose)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from donnees.execution import fin_demarrage
+from donnees.instrumentation import etape, compter
 import pandas as pd
 import numpy as np
-from scipy.stats import shapiro
-import math
+from intervalles import intervalles_fluctuation, table_intervalles
+from simulation_echantillonnage import simuler_couvertures
+from tests_normalite import batterie_normalite
+from donnees import charger_fichier
+from donnees.reechantillonnage import intervalle_bootstrap
+
+fin_demarrage("seance-05")
+
+# Paramètres d'exécution : simulation de Monte Carlo (section 4), rééchantillons bootstrap (section 2),
+# processus (sections 2, 3 et 4 ; 1 par défaut comme dans toutes les séances, 0 pour tous les cœurs)
+NB_SIMULATIONS = int(os.environ.get("NB_SIMULATIONS", 1_000_000))
+NB_REECHANTILLONS = int(os.environ.get("NB_REECHANTILLONS", 100_000))
+NB_WORKERS = int(os.environ.get("NB_WORKERS", 1)) or os.cpu_count() or 1
+GRAINE = int(os.environ.get("GRAINE", 2025))
 
 # 1. Théorie de l’échantillonnage
+etape("1. Théorie de l'échantillonnage")
 
-# Fonction pour ouvrir un fichier CSV local
+# Fonction pour ouvrir un fichier CSV local (schéma du registre commun, cache Parquet)
 def ouvrirUnFichier(chemin_fichier):
-    return pd.read_csv(chemin_fichier)
+    return charger_fichier(chemin_fichier)
 
 # Charger le fichier des 100 échantillons
 fichier_echantillons = "./data/Echantillonnage-100-Echantillons.csv"
 df_echantillons = ouvrirUnFichier(fichier_echantillons)
+compter(len(df_echantillons))
 
 # Calcul des moyennes par colonne et arrondi
 moyennes = df_echantillons.mean().round(0)
@@ -30,40 +50,53 @@ freq_population = (population_mere / population_mere.sum()).round(2)
 print("\nFréquences de la population mère :")
 print(freq_population)
 
-# Intervalle de fluctuation à 95 % (z = 1.96)
-z = 1.96
+# Intervalle de fluctuation à 95 %
 n_total = somme_moyennes
-intervalle_fluctuation = {}
-for opinion, f in freq_population.items():
-    ecart_type = math.sqrt(f * (1 - f) / n_total)
-    borne_inf = round(f - z * ecart_type, 2)
-    borne_sup = round(f + z * ecart_type, 2)
-    intervalle_fluctuation[opinion] = (borne_inf, borne_sup)
+borne_inf, borne_sup = intervalles_fluctuation(freq_population.to_numpy(), n_total, niveau=0.95)
+intervalle_fluctuation = {opinion: (round(float(i), 2), round(float(s), 2))
+                          for opinion, i, s in zip(freq_population.index, borne_inf, borne_sup)}
 print("\nIntervalle de fluctuation à 95 % :")
 print(intervalle_fluctuation)
 
 # 2. Théorie de l’estimation
+etape("2. Théorie de l'estimation")
 
-# Prendre le premier échantillon
-premier_echantillon = list(df_echantillons.iloc[0])
-total_premier = sum(premier_echantillon)
+# Fréquences de tous les échantillons (sans arrondi avant le calcul de l'erreur type)
+freq_echantillons_tous = df_echantillons.div(df_echantillons.sum(axis=1), axis=0)
 
-# Calcul des fréquences
-freq_premier = [round(x / total_premier, 2) for x in premier_echantillon]
+# Prendre le premier échantillon
+freq_premier = freq_echantillons_tous.iloc[0].round(2).tolist()
 print("\nFréquences du premier échantillon :")
 print(freq_premier)
 
-# Intervalle de confiance pour le premier échantillon
-intervalle_confiance = []
-for f in freq_premier:
-    ecart_type = math.sqrt(f * (1 - f) / total_premier)
-    borne_inf = round(f - z * ecart_type, 2)
-    borne_sup = round(f + z * ecart_type, 2)
-    intervalle_confiance.append((borne_inf, borne_sup))
+# Intervalles de confiance à 95 % des 100 échantillons, en un seul appel
+METHODE_INTERVALLE = os.environ.get("METHODE_INTERVALLE", "wald")
+intervalles_echantillons = table_intervalles(df_echantillons, niveau=0.95, methode=METHODE_INTERVALLE)
+intervalle_confiance = [(round(float(intervalles_echantillons.iloc[0][(o, "inf")]), 2),
+                         round(float(intervalles_echantillons.iloc[0][(o, "sup")]), 2)) for o in df_echantillons.columns]
 print("\nIntervalle de confiance du premier échantillon à 95 % :")
 print(intervalle_confiance)
 
+# Intervalles bootstrap du premier échantillon (percentile et BCa) : réponses individuelles
+# rééchantillonnées avec remise, sans hypothèse de normalité
+premier = df_echantillons.iloc[0]
+for methode in ("percentile", "bca"):
+    bootstrap_premier = intervalle_bootstrap(premier.index.to_numpy(), "frequences", effectifs=premier.to_numpy(),
+                                             niveau=0.95, methode=methode, nb_reechantillons=NB_REECHANTILLONS,
+                                             graine=GRAINE, workers=NB_WORKERS)
+    print(f"\nIntervalle de confiance bootstrap ({methode}, {NB_REECHANTILLONS} rééchantillons) du premier échantillon :")
+    print(bootstrap_premier.round(4))
+compter(NB_REECHANTILLONS)
+
+# Part des 100 intervalles de confiance qui contiennent la fréquence de la population mère
+p_population = population_mere / population_mere.sum()
+contient = (intervalles_echantillons.xs("inf", axis=1, level=1) <= p_population) & \
+           (intervalles_echantillons.xs("sup", axis=1, level=1) >= p_population)
+print(f"\nPart des intervalles de confiance ({METHODE_INTERVALLE}) contenant la fréquence de la population :")
+print(contient.mean())
+
 # 3. Théorie de la décision
+etape("3. Théorie de la décision")
 
 # Tester la normalité de deux fichiers
 fichier_test1 = "./data/Loi-normale-Test-1.csv"
@@ -72,11 +105,26 @@ fichier_test2 = "./data/Loi-normale-Test-2.csv"
 df_test1 = ouvrirUnFichier(fichier_test1)
 df_test2 = ouvrirUnFichier(fichier_test2)
 
-# Shapiro-Wilk test
-stat1, p1 = shapiro(df_test1.iloc[:,0])
-stat2, p2 = shapiro(df_test2.iloc[:,0])
+# Batterie de tests de normalité (Shapiro-Wilk, D'Agostino, Anderson-Darling, Jarque-Bera, Lilliefors)
+tests = pd.concat({"Fichier Test 1": df_test1.iloc[:, 0], "Fichier Test 2": df_test2.iloc[:, 0]}, axis=1)
+normalite = batterie_normalite(tests, workers=NB_WORKERS)
+compter(tests.count().sum())
 
 print("\nTest de normalité Shapiro-Wilk :")
-print(f"Fichier Test 1 -> Stat={stat1:.3f}, p={p1:.3f} -> {'Normale' if p1 > 0.05 else 'Non normale'}")
-print(f"Fichier Test 2 -> Stat={stat2:.3f}, p={p2:.3f} -> {'Normale' if p2 > 0.05 else 'Non normale'}")
-
+for nom, ligne in normalite.iterrows():
+    stat, p = ligne["Shapiro-Wilk stat"], ligne["Shapiro-Wilk p"]
+    print(f"{nom} -> Stat={stat:.3f}, p={p:.3f} -> {'Normale' if p > 0.05 else 'Non normale'}")
+
+print("\nBatterie de tests de normalité :")
+print(normalite.T.round(4))
+
+# 4. Simulation de Monte Carlo
+etape("4. Simulation de Monte Carlo")
+
+# NB_SIMULATIONS échantillons de taille 1000 tirés dans la population mère : part des échantillons
+# dans l'intervalle de fluctuation et part des intervalles de confiance contenant la vraie fréquence
+couvertures = simuler_couvertures(NB_SIMULATIONS, int(n_total), population_mere, niveau=0.95,
+                                  graine=GRAINE, workers=NB_WORKERS, methode=METHODE_INTERVALLE)
+compter(NB_SIMULATIONS)
+print(f"\nCouverture empirique des intervalles à 95 % ({NB_SIMULATIONS} échantillons simulés) :")
+print(couvertures.T.round(4))
@@ -0,0 +1,106 @@
+#coding:utf8
+
+# Simulation de Monte Carlo de la distribution d'échantillonnage
+# N échantillons de taille n sont tirés dans la population mère par un seul tirage multinomial
+# NumPy par bloc (ou hypergéométrique multivarié pour un tirage sans remise). Pour chaque bloc,
+# on compte, pour toutes les modalités à la fois :
+# - les échantillons dont la fréquence tombe dans l'intervalle de fluctuation de la population
+# - les échantillons dont l'intervalle de confiance contient la fréquence de la population
+#   (Wald par défaut, ou toute méthode du module intervalles)
+# Seuls ces compteurs sont conservés : la mémoire dépend de la taille des blocs, pas de N.
+# Chaque bloc a son propre flux aléatoire (SeedSequence.spawn) : les blocs sont indépendants et
+# le résultat ne dépend que de la graine, pas du nombre de processus.
+
+import itertools
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from intervalles import intervalles_confiance, intervalles_fluctuation
+
+POPULATION_MERE = pd.Series({"Pour": 852, "Contre": 911, "Sans opinion": 422})
+TAILLE_BLOC = 100_000
+
+# Fonction pour tirer un bloc d'échantillons : tableau (taille, nb_modalites) d'effectifs
+def tirer_bloc(generateur, effectifs, n, taille, sans_remise=False):
+    if sans_remise:
+        return generateur.multivariate_hypergeometric(effectifs, n, size=taille)
+    return generateur.multinomial(n, effectifs / effectifs.sum(), size=taille)
+
+# Fonction pour résumer un bloc : compteurs de couverture et sommes des fréquences
+def resumer_bloc(comptes, p, n, niveau, methode):
+    f = comptes / n
+    # intervalle de fluctuation : fixe, centré sur la fréquence de la population
+    inf, sup = intervalles_fluctuation(p, n, niveau)
+    dans_fluctuation = (f >= inf) & (f <= sup)
+    # intervalle de confiance : calculé pour chaque échantillon
+    inf, sup = intervalles_confiance(comptes, n, niveau, methode)
+    contient_p = (inf <= p) & (p <= sup)
+    return {
+        "nb": len(comptes),
+        "fluctuation": dans_fluctuation.sum(axis=0),
+        "confiance": contient_p.sum(axis=0),
+        "somme_f": f.sum(axis=0),
+        "somme_f2": (f ** 2).sum(axis=0),
+    }
+
+def simuler_bloc(arguments):
+    graine, taille, effectifs, n, niveau, methode, sans_remise, garder_comptes = arguments
+    comptes = tirer_bloc(np.random.default_rng(graine), effectifs, n, taille, sans_remise)
+    resume = resumer_bloc(comptes, effectifs / effectifs.sum(), n, niveau, methode)
+    if garder_comptes:
+        resume["comptes"] = comptes
+    return resume
+
+# Fonction pour découper N échantillons en blocs, chacun avec sa graine indépendante
+def taches(nb_echantillons, taille_bloc, graine, *arguments):
+    tailles = [min(taille_bloc, nb_echantillons - debut) for debut in range(0, nb_echantillons, taille_bloc)]
+    graines = np.random.SeedSequence(graine).spawn(len(tailles))
+    for g, taille in zip(graines, tailles):
+        yield (g, taille) + arguments
+
+# Fonction génératrice : résumés des blocs, dans l'ordre, au fil du calcul
+# garder_comptes=True joint à chaque résumé la matrice d'effectifs du bloc (pour l'écrire sur disque
+# ou la passer à un autre calcul), sans jamais conserver plus de 2 blocs par processus en mémoire.
+def blocs_simulation(nb_echantillons, n, population=POPULATION_MERE, niveau=0.95, graine=None,
+                     workers=1, taille_bloc=TAILLE_BLOC, sans_remise=False, garder_comptes=False,
+                     methode="wald"):
+    effectifs = np.asarray(population, dtype=np.int64)
+    arguments = taches(nb_echantillons, taille_bloc, graine, effectifs, n, niveau, methode,
+                       sans_remise, garder_comptes)
+    if workers <= 1:
+        yield from map(simuler_bloc, arguments)
+        return
+    demarrage = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    with multiprocessing.get_context(demarrage).Pool(workers) as pool:
+        while True:
+            fenetre = list(itertools.islice(arguments, 2 * workers))
+            if not fenetre:
+                break
+            yield from pool.imap(simuler_bloc, fenetre)
+
+# Fonction principale : couverture empirique des deux intervalles pour chaque modalité
+# methode : méthode de l'intervalle de confiance (wald, wilson, agresti_coull, clopper_pearson)
+def simuler_couvertures(nb_echantillons, n, population=POPULATION_MERE, niveau=0.95, graine=None,
+                        workers=1, taille_bloc=TAILLE_BLOC, sans_remise=False, methode="wald"):
+    population = pd.Series(population)
+    p = population.to_numpy(dtype=np.float64) / population.sum()
+    total = {"nb": 0}
+    for resume in blocs_simulation(nb_echantillons, n, population, niveau, graine, workers,
+                                   taille_bloc, sans_remise, methode=methode):
+        for cle, valeur in resume.items():
+            total[cle] = total.get(cle, 0) + valeur
+    nb = total["nb"]
+    moyenne = total["somme_f"] / nb
+    fluctuation_inf, fluctuation_sup = intervalles_fluctuation(p, n, niveau)
+    return pd.DataFrame({
+        "Fréquence population": p,
+        "Fluctuation inf": fluctuation_inf,
+        "Fluctuation sup": fluctuation_sup,
+        "Couverture fluctuation": total["fluctuation"] / nb,
+        "Couverture confiance": total["confiance"] / nb,
+        "Fréquence moyenne": moyenne,
+        "Écart type des fréquences": np.sqrt(np.maximum(total["somme_f2"] / nb - moyenne ** 2, 0)),
+        "Écart type théorique": np.sqrt(p * (1 - p) / n),
+    }, index=population.index)
@@ -0,0 +1,140 @@
+#coding:utf8
+
+# Batterie de tests de normalité sur toutes les colonnes numériques d'un DataFrame
+# - Shapiro-Wilk (sur un sous-échantillon aléatoire au-delà de 5000 valeurs, limite de ses p-valeurs)
+# - D'Agostino K², Jarque-Bera (scipy.stats)
+# - Anderson-Darling et Lilliefors, calculés sur le même tri des données, p-valeurs par les
+#   approximations de D'Agostino et Stephens (1986) et de Dallal et Wilkinson (1986)
+# Les colonnes sont copiées une seule fois dans un bloc de mémoire partagée (une colonne contiguë
+# par variable) : les processus lisent leur colonne directement, sans la recevoir par pickle.
+
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy.special import log_ndtr, ndtr
+
+LIMITE_SHAPIRO = 5000
+SEUIL = 0.05
+TESTS = ["Shapiro-Wilk", "D'Agostino K²", "Anderson-Darling", "Jarque-Bera", "Lilliefors"]
+
+# Anderson-Darling (paramètres estimés) : statistique A² et p-valeur de D'Agostino et Stephens
+def anderson_darling(z_tries):
+    n = len(z_tries)
+    i = np.arange(1, n + 1)
+    a2 = -n - np.sum((2 * i - 1) * (log_ndtr(z_tries) + log_ndtr(-z_tries[::-1]))) / n
+    a = a2 * (1 + 0.75 / n + 2.25 / n ** 2)
+    if a >= 153:
+        # au-delà, l'approximation (quadratique en a) remonterait : p-valeur nulle
+        p = 0.0
+    elif a >= 0.6:
+        p = np.exp(1.2937 - 5.709 * a + 0.0186 * a ** 2)
+    elif a >= 0.34:
+        p = np.exp(0.9177 - 4.279 * a - 1.38 * a ** 2)
+    elif a >= 0.2:
+        p = 1 - np.exp(-8.318 + 42.796 * a - 59.938 * a ** 2)
+    else:
+        p = 1 - np.exp(-13.436 + 101.14 * a - 223.73 * a ** 2)
+    return float(a2), float(np.clip(p, 0, 1))
+
+# Lilliefors (Kolmogorov-Smirnov, paramètres estimés) : p-valeur de Dallal et Wilkinson,
+# complétée au-delà de 0.1 par l'approximation utilisée par nortest::lillie.test
+def lilliefors(z_tries):
+    n = len(z_tries)
+    cdf = ndtr(z_tries)
+    d = max(np.max(np.arange(1, n + 1) / n - cdf), np.max(cdf - np.arange(n) / n))
+    kd, nd = (d, n) if n <= 100 else (d * (n / 100) ** 0.49, 100)
+    p = np.exp(-7.01256 * kd ** 2 * (nd + 2.78019) + 2.99587 * kd * np.sqrt(nd + 2.78019)
+               - 0.122119 + 0.974598 / np.sqrt(nd) + 1.67997 / nd)
+    if p > 0.1:
+        kk = (np.sqrt(n) - 0.01 + 0.85 / np.sqrt(n)) * d
+        if kk <= 0.302:
+            p = 1.0
+        elif kk <= 0.5:
+            p = 2.76773 - 19.828315 * kk + 80.709644 * kk ** 2 - 138.55152 * kk ** 3 + 81.218052 * kk ** 4
+        elif kk <= 0.9:
+            p = -4.901232 + 40.662806 * kk - 97.490286 * kk ** 2 + 94.029866 * kk ** 3 - 32.355711 * kk ** 4
+        elif kk <= 1.31:
+            p = 6.198765 - 19.558097 * kk + 23.186922 * kk ** 2 - 12.234627 * kk ** 3 + 2.423045 * kk ** 4
+        else:
+            p = 0.0
+    return float(d), float(np.clip(p, 0, 1))
+
+# Fonction pour exécuter tous les tests sur une colonne (valeurs manquantes écartées)
+def tester_colonne(valeurs, graine=0, limite_shapiro=LIMITE_SHAPIRO):
+    debut = time.perf_counter()
+    x = valeurs[~np.isnan(valeurs)]
+    n = len(x)
+    resultat = {"Effectif": n}
+    if n < 8 or np.ptp(x) == 0:
+        # trop peu de valeurs (D'Agostino demande n >= 8) ou colonne constante
+        resultat["Durée (s)"] = time.perf_counter() - debut
+        return resultat
+    # Shapiro-Wilk : sous-échantillon reproductible au-delà de la limite
+    if n > limite_shapiro:
+        sous = np.random.default_rng(graine).choice(x, limite_shapiro, replace=False)
+    else:
+        sous = x
+    resultat["Shapiro-Wilk n"] = len(sous)
+    # scipy.stats (plus d'une seconde d'import) n'est chargé que si un test est effectivement calculé
+    import scipy.stats
+    resultat["Shapiro-Wilk stat"], resultat["Shapiro-Wilk p"] = scipy.stats.shapiro(sous)
+    resultat["D'Agostino K² stat"], resultat["D'Agostino K² p"] = scipy.stats.normaltest(x)
+    resultat["Jarque-Bera stat"], resultat["Jarque-Bera p"] = scipy.stats.jarque_bera(x)
+    z = np.sort(x)
+    z -= x.mean()
+    z /= x.std(ddof=1)
+    resultat["Anderson-Darling stat"], resultat["Anderson-Darling p"] = anderson_darling(z)
+    resultat["Lilliefors stat"], resultat["Lilliefors p"] = lilliefors(z)
+    resultat["Durée (s)"] = time.perf_counter() - debut
+    return resultat
+
+# Mémoire partagée ouverte une fois par processus
+_MEMOIRE = None
+_COLONNES = None
+
+def ouvrir_memoire(nom, forme):
+    global _MEMOIRE, _COLONNES
+    _MEMOIRE = shared_memory.SharedMemory(name=nom)
+    _COLONNES = np.ndarray(forme, dtype=np.float64, buffer=_MEMOIRE.buf)
+
+def tester_colonne_partagee(arguments):
+    j, graine, limite_shapiro = arguments
+    return j, tester_colonne(_COLONNES[j], graine + j, limite_shapiro)
+
+# Fonction principale : une ligne par colonne numérique, statistiques, p-valeurs, nombre de tests
+# rejetant la normalité au seuil `seuil`, durée
+def batterie_normalite(donnees, workers=1, graine=0, seuil=SEUIL, limite_shapiro=LIMITE_SHAPIRO):
+    if isinstance(donnees, pd.Series):
+        donnees = donnees.to_frame()
+    colonnes = list(donnees.select_dtypes("number").columns)
+    forme = (len(colonnes), len(donnees))
+    resultats = {}
+    if workers <= 1 or len(colonnes) <= 1:
+        for j, c in enumerate(colonnes):
+            resultats[j] = tester_colonne(donnees[c].to_numpy(dtype=np.float64), graine + j, limite_shapiro)
+    else:
+        memoire = shared_memory.SharedMemory(create=True, size=max(8 * forme[0] * forme[1], 1))
+        try:
+            tampon = np.ndarray(forme, dtype=np.float64, buffer=memoire.buf)
+            for j, c in enumerate(colonnes):
+                tampon[j] = donnees[c].to_numpy(dtype=np.float64)
+            methode = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            with multiprocessing.get_context(methode).Pool(workers, initializer=ouvrir_memoire,
+                                                           initargs=(memoire.name, forme)) as pool:
+                taches = [(j, graine, limite_shapiro) for j in range(len(colonnes))]
+                for j, resultat in pool.imap_unordered(tester_colonne_partagee, taches):
+                    resultats[j] = resultat
+            del tampon
+        finally:
+            memoire.close()
+            memoire.unlink()
+    table = pd.DataFrame([resultats[j] for j in range(len(colonnes))], index=pd.Index(colonnes, name="Variable"))
+    ordre = ["Effectif", "Shapiro-Wilk n"] + [f"{t} {s}" for t in TESTS for s in ("stat", "p")]
+    for colonne in ordre + ["Durée (s)"]:
+        if colonne not in table:
+            table[colonne] = np.nan
+    table[f"Rejets ({seuil:g})"] = (table[[f"{t} p" for t in TESTS]] < seuil).sum(axis=1)
+    return table[ordre + [f"Rejets ({seuil:g})", "Durée (s)"]]
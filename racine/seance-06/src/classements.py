@@ -0,0 +1,142 @@
+#coding:utf8
+
+# Classements sur tableaux NumPy et jointure de classements par clé (code ISO, nom d'État, code commune...)
+# Classer : ordre décroissant (tri NumPy des seules valeurs présentes), k premiers par argpartition
+# (O(n), sans trier toute la liste), rangs ordinaux, denses, minimum, maximum ou moyens en un appel,
+# table des rangs en tableau structuré (rang, nom) plutôt qu'en liste de listes.
+# Joindre : les classements sont appariés par un index de hachage (dictionnaire Python ou index
+# pandas) : O(n + m) au lieu de comparer chaque nom de la première liste à chaque nom de la seconde.
+# Les entités présentes dans un classement mais absentes d'un autre sont signalées, pas ignorées.
+
+import numpy as np
+import pandas as pd
+
+METHODES_RANGS = ("ordinal", "dense", "min", "max", "moyen")
+
+# Codes entiers des clés, dans l'ordre croissant des clés (départage des égalités)
+def codes_cles(cles):
+    return pd.factorize(np.asarray(cles, dtype=object), sort=True)[0]
+
+# Fonction pour l'ordre décroissant : indices des valeurs présentes (NaN écartés), de la plus grande
+# à la plus petite ; égalités départagées par clé décroissante (comme le tri des listes [valeur, nom]
+# de ordrePopulation), ou par position si pas de clé
+def ordre_decroissant(valeurs, cles=None):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    presents = np.flatnonzero(~np.isnan(valeurs))
+    if cles is None:
+        ordre = np.argsort(-valeurs[presents], kind="stable")
+    else:
+        ordre = np.lexsort((codes_cles(cles)[presents], valeurs[presents]))[::-1]
+    return presents[ordre]
+
+# Fonction pour les k plus grandes valeurs : indices dans l'ordre décroissant (mêmes égalités que
+# ordre_decroissant). argpartition isole les candidats en O(n), seuls ceux-ci sont triés ; les
+# valeurs égales à la k-ième sont toutes gardées comme candidates pour départager exactement
+def top_k(valeurs, k, cles=None):
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    presents = np.flatnonzero(~np.isnan(valeurs))
+    if k >= len(presents):
+        return ordre_decroissant(valeurs, cles)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    seuil = valeurs[presents[np.argpartition(-valeurs[presents], k - 1)[k - 1]]]
+    candidats = presents[valeurs[presents] >= seuil]
+    ordre = ordre_decroissant(valeurs[candidats], None if cles is None else np.asarray(cles, dtype=object)[candidats])
+    return candidats[ordre[:k]]
+
+# Fonction pour les rangs de toutes les valeurs en un appel (comme scipy.stats.rankdata) :
+# rang 1 = plus grande valeur (plus petite si decroissant=False), NaN pour les valeurs manquantes
+# methode : ordinal (égalités par position), dense (1, 2, 2, 3), min (1, 2, 2, 4), max (1, 3, 3, 4),
+# moyen (1, 2.5, 2.5, 4)
+def rangs(valeurs, methode="moyen", decroissant=True):
+    if methode not in METHODES_RANGS:
+        raise ValueError(f"Méthode de rang inconnue : {methode} (disponibles : {', '.join(METHODES_RANGS)})")
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    presents = np.flatnonzero(~np.isnan(valeurs))
+    x = -valeurs[presents] if decroissant else valeurs[presents]
+    ordre = np.argsort(x, kind="stable")
+    tries = x[ordre]
+    n = len(tries)
+    resultat = np.full(len(valeurs), np.nan)
+    if methode == "ordinal":
+        resultat[presents[ordre]] = np.arange(1, n + 1)
+        return resultat
+    # groupes d'égalités : début de chaque groupe dans l'ordre trié
+    nouveau = np.concatenate([[True], tries[1:] != tries[:-1]]) if n else np.empty(0, dtype=bool)
+    groupe = np.cumsum(nouveau) - 1
+    debuts = np.flatnonzero(nouveau)
+    fins = np.append(debuts[1:], n)
+    par_groupe = {
+        "dense": np.arange(1, len(debuts) + 1),
+        "min": debuts + 1,
+        "max": fins,
+        "moyen": (debuts + 1 + fins) / 2,
+    }[methode]
+    resultat[presents[ordre]] = par_groupe[groupe]
+    return resultat
+
+# Fonction pour la table des rangs par ordre décroissant : tableau structuré (rang, nom), une ligne
+# par valeur présente, rangs ordinaux 1 ... n (égalités départagées par nom décroissant)
+def table_rangs(valeurs, noms):
+    noms = np.asarray(noms)
+    ordre = ordre_decroissant(valeurs, noms)
+    table = np.empty(len(ordre), dtype=[("rang", np.int64), ("nom", noms.dtype)])
+    table["rang"] = np.arange(1, len(ordre) + 1)
+    table["nom"] = noms[ordre]
+    return table
+
+# Fonction pour vérifier qu'un index de noms ne contient pas de doublons (ValueError sinon)
+def verifier_cles_uniques(index):
+    doublons = index[index.duplicated()].unique()
+    if len(doublons):
+        raise ValueError(f"Clés en double dans le classement : {', '.join(map(str, doublons[:10]))}")
+    return index
+
+# Fonction pour classer des valeurs par ordre décroissant (rang 1 = plus grande valeur)
+# Valeurs manquantes écartées ; égalités départagées par clé décroissante, comme le tri des listes
+# [valeur, nom] de ordrePopulation
+def rangs_decroissants(valeurs, cles):
+    cles = np.asarray(list(cles), dtype=object)
+    index = verifier_cles_uniques(pd.Index(cles[ordre_decroissant(valeurs, cles)], name="Clé"))
+    return pd.Series(np.arange(1, len(index) + 1), index=index, name="Rang")
+
+# Fonction pour apparier deux classements (rang, nom) : tables de table_rangs (format de ordrePopulation)
+# ou listes [rang, nom]
+# Renvoie les triplets [rang1, rang2, nom] des entités communes (dans l'ordre du premier classement),
+# puis les noms absents du second classement et les noms absents du premier
+def joindre_listes(ordre1, ordre2):
+    if isinstance(ordre1, np.ndarray) and isinstance(ordre2, np.ndarray):
+        # index pandas des noms : appariement vectorisé, listes Python seulement pour le résultat
+        verifier_cles_uniques(pd.Index(ordre1["nom"]))
+        positions = verifier_cles_uniques(pd.Index(ordre2["nom"])).get_indexer(ordre1["nom"])
+        communs = positions >= 0
+        absents2 = np.ones(len(ordre2), dtype=bool)
+        absents2[positions[communs]] = False
+        triplets = zip(ordre1["rang"][communs].tolist(), ordre2["rang"][positions[communs]].tolist(),
+                       ordre1["nom"][communs].tolist())
+        return [list(t) for t in triplets], ordre1["nom"][~communs].tolist(), ordre2["nom"][absents2].tolist()
+    index1 = {nom: rang for rang, nom in ordre1}
+    index2 = {nom: rang for rang, nom in ordre2}
+    communs = [[rang, index2[nom], nom] for rang, nom in ordre1 if nom in index2]
+    seuls1 = [nom for _, nom in ordre1 if nom not in index2]
+    seuls2 = [nom for _, nom in ordre2 if nom not in index1]
+    return communs, seuls1, seuls2
+
+# Fonction pour joindre K classements (dictionnaire nom -> série de rangs indexée par la clé)
+# Renvoie :
+# - la table des entités présentes dans tous les classements (une colonne de rangs par classement)
+# - pour chaque classement, les clés qu'il contient mais qui manquent dans au moins un autre
+def joindre_classements(classements):
+    # alignement des index par hachage : union des clés en une passe
+    table = pd.concat(classements, axis=1, join="outer", sort=False)
+    complets = table.notna().all(axis=1)
+    non_apparies = {nom: table.index[table[nom].notna() & ~complets].tolist() for nom in table.columns}
+    jointe = table[complets].astype(np.int64)
+    jointe = jointe.sort_values(list(jointe.columns[:1]), kind="stable")
+    return jointe, non_apparies
+
+# Fonction principale : classe chaque colonne de `colonnes` (ex. toutes les "Pop 2007" ... "Pop 2025")
+# et joint les classements sur la colonne `cle` (ex. "Code ISO_3" ou "État") en un seul appel
+def comparer_classements(donnees, cle, colonnes):
+    classements = {c: rangs_decroissants(donnees[c], donnees[cle]) for c in colonnes}
+    return joindre_classements(classements)
@@ -0,0 +1,129 @@
+#coding:utf8
+
+# Matrices de corrélation de rangs (Spearman et tau-b de Kendall) entre toutes les colonnes d'un panel
+# (ex. Pop 2007 ... 2025 et Densité 2007 ... 2025 : matrices 38 x 38) en un seul appel.
+# Valeurs manquantes : chaque paire de colonnes utilise les lignes renseignées dans les deux
+# colonnes. Les colonnes sont regroupées par motif de valeurs manquantes : pour chaque couple de
+# motifs, les rangs sont calculés une fois sur les lignes communes et toutes les corrélations de
+# Spearman du bloc sortent d'un seul produit matriciel.
+# Kendall : scipy.stats.kendalltau (algorithme de Knight en O(n log n), tau-b avec ex aequo),
+# paire par paire, éventuellement réparti entre plusieurs processus.
+# p-valeurs : approximation de Student (Spearman) / normale (Kendall), ou par permutations.
+
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+from scipy.special import stdtr
+
+# Fonction pour les rangs centrés et normés de chaque colonne (la corrélation devient un produit scalaire)
+def rangs_normes(bloc):
+    # import différé : scipy.stats n'est chargé qu'au premier calcul de rangs
+    import scipy.stats
+    r = scipy.stats.rankdata(bloc, axis=0)
+    r -= r.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return r / np.sqrt((r ** 2).sum(axis=0))
+
+# Fonction pour les groupes de colonnes de même motif de valeurs manquantes
+def motifs_manquants(presents):
+    motifs, groupes = np.unique(presents.T, axis=0, return_inverse=True)
+    return motifs, [np.flatnonzero(groupes.ravel() == g) for g in range(len(motifs))]
+
+def spearman_matrice(x, nb_permutations=0, graine=0):
+    k = x.shape[1]
+    presents = ~np.isnan(x)
+    motifs, groupes = motifs_manquants(presents)
+    rho = np.full((k, k), np.nan)
+    effectifs = np.zeros((k, k), dtype=np.int64)
+    depassements = np.zeros((k, k))
+    generateur = np.random.default_rng(graine)
+    for g1 in range(len(motifs)):
+        for g2 in range(g1, len(motifs)):
+            communs = motifs[g1] & motifs[g2]
+            c1, c2 = groupes[g1], groupes[g2]
+            a = rangs_normes(x[np.ix_(communs, c1)])
+            b = rangs_normes(x[np.ix_(communs, c2)])
+            bloc = a.T @ b
+            rho[np.ix_(c1, c2)] = bloc
+            rho[np.ix_(c2, c1)] = bloc.T
+            effectifs[np.ix_(c1, c2)] = effectifs[np.ix_(c2, c1)] = communs.sum()
+            for _ in range(nb_permutations):
+                # même permutation des lignes pour tout le bloc : un produit matriciel par permutation
+                permute = a.T @ b[generateur.permutation(len(b))]
+                extreme = np.abs(permute) >= np.abs(bloc) - 1e-12
+                depassements[np.ix_(c1, c2)] += extreme
+                if g1 != g2:
+                    depassements[np.ix_(c2, c1)] += extreme.T
+    if nb_permutations:
+        p = (1 + depassements) / (1 + nb_permutations)
+    else:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = rho * np.sqrt((effectifs - 2) / np.maximum(1 - rho ** 2, 1e-300))
+        p = 2 * stdtr(np.maximum(effectifs - 2, 1), -np.abs(t))
+    np.fill_diagonal(p, 0.0)
+    return rho, p, effectifs
+
+# Colonnes du panel, partagées avec les processus (fork) ou transmises une fois par processus
+_PANEL = None
+
+def initialiser_panel(x):
+    global _PANEL
+    _PANEL = x
+
+def kendall_paire(arguments):
+    i, j, nb_permutations, graine = arguments
+    import scipy.stats
+    communs = ~np.isnan(_PANEL[:, i]) & ~np.isnan(_PANEL[:, j])
+    xi, xj = _PANEL[communs, i], _PANEL[communs, j]
+    resultat = scipy.stats.kendalltau(xi, xj)
+    tau, p = resultat.statistic, resultat.pvalue
+    if nb_permutations and np.isfinite(tau):
+        generateur = np.random.default_rng([graine, i, j])
+        extremes = sum(abs(scipy.stats.kendalltau(xi, generateur.permutation(xj)).statistic) >= abs(tau) - 1e-12
+                       for _ in range(nb_permutations))
+        p = (1 + extremes) / (1 + nb_permutations)
+    return i, j, tau, p
+
+def kendall_matrice(x, nb_permutations=0, graine=0, workers=1):
+    k = x.shape[1]
+    tau = np.eye(k)
+    p = np.zeros((k, k))
+    taches = [(i, j, nb_permutations, graine) for i in range(k) for j in range(i + 1, k)]
+    if workers <= 1:
+        initialiser_panel(x)
+        resultats = map(kendall_paire, taches)
+        pool = None
+    else:
+        methode = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        pool = multiprocessing.get_context(methode).Pool(workers, initializer=initialiser_panel, initargs=(x,))
+        resultats = pool.imap_unordered(kendall_paire, taches, chunksize=max(1, len(taches) // (8 * workers)))
+    try:
+        for i, j, t, pv in resultats:
+            tau[i, j] = tau[j, i] = t
+            p[i, j] = p[j, i] = pv
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return tau, p
+
+# Fonction principale : dictionnaire de DataFrames k x k
+# "spearman", "spearman_p", "kendall", "kendall_p", "effectifs" (lignes communes de chaque paire)
+def correlations_panel(donnees, colonnes=None, methodes=("spearman", "kendall"), nb_permutations=0,
+                       workers=1, graine=0):
+    if colonnes is None:
+        colonnes = list(donnees.select_dtypes("number").columns)
+    x = donnees[colonnes].to_numpy(dtype=np.float64)
+    tableau = lambda m: pd.DataFrame(m, index=colonnes, columns=colonnes)
+    resultats = {}
+    if "spearman" in methodes:
+        rho, p, effectifs = spearman_matrice(x, nb_permutations, graine)
+        resultats.update({"spearman": tableau(rho), "spearman_p": tableau(p), "effectifs": tableau(effectifs)})
+    if "kendall" in methodes:
+        tau, p = kendall_matrice(x, nb_permutations, graine, workers)
+        resultats.update({"kendall": tableau(tau), "kendall_p": tableau(p)})
+    if "effectifs" not in resultats:
+        presents = (~np.isnan(x)).astype(np.int64)
+        resultats["effectifs"] = tableau(presents.T @ presents)
+    return resultats
@@ -1,163 +1,241 @@
 #coding:utf8
 
+import os
+import sys
+# Paquet commun racine/donnees (monté dans /application/donnees par docker-compose)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+# Mode sans affichage (SANS_AFFICHAGE, moteur Agg) : à importer avant matplotlib
+from donnees.execution import afficher, fin_demarrage
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import scipy
-import scipy.stats
-import math
-
-#Fonction pour ouvrir les fichiers
-def ouvrirUnFichier(nom):
-    with open(nom, "r", encoding="utf-8") as fichier:
-        contenu = pd.read_csv(fichier)
-    return contenu
+from classements import joindre_listes, comparer_classements, ordre_decroissant, table_rangs, top_k
+from rang_taille import ajuster_rang_taille
+from correlations_rangs import correlations_panel
+from donnees import charger_fichier
+from donnees.pipeline import executer
+from donnees.instrumentation import compter
+from donnees.reechantillonnage import intervalle_bootstrap, permutation_correlation
+
+fin_demarrage("seance-06")
+
+# Les étapes sont déclarées dans ETAPES (donnees/pipeline.py) : partie îles et partie États du monde
+# sont indépendantes et exécutées en parallèle avec NB_WORKERS > 1 (à combiner avec SANS_AFFICHAGE=1,
+# les fenêtres de graphiques ne s'ouvrant pas depuis les processus du pool) ; les résultats sont mis
+# en cache et seules les étapes modifiées sont recalculées. 1 processus par défaut (même défaut dans
+# toutes les séances), NB_WORKERS=0 pour tous les cœurs
+NB_WORKERS = int(os.environ.get("NB_WORKERS", 1)) or os.cpu_count() or 1
+# Rééchantillons bootstrap et permutations des corrélations de rangs (p-valeurs sans approximation)
+NB_REECHANTILLONS = int(os.environ.get("NB_REECHANTILLONS", 10_000))
+GRAINE = int(os.environ.get("GRAINE", 2025))
+FICHIER_ILES = "./data/island-index.csv"
+FICHIER_MONDE = "./data/Le-Monde-HS-Etats-du-monde-2007-2025.csv"
+
+#Fonction pour ouvrir les fichiers (schéma du registre commun, cache Parquet ; colonnes = sélection)
+def ouvrirUnFichier(nom, colonnes=None):
+    return charger_fichier(nom, colonnes)
 
 #Fonction pour convertir les données en données logarithmiques
 def conversionLog(liste):
-    log = []
-    for element in liste:
-        log.append(math.log(element))
-    return log
+    return np.log(np.asarray(liste, dtype=np.float64))
 
-#Fonction pour trier par ordre décroissant les listes (îles et populations)
+#Fonction pour trier les surfaces par ordre décroissant : nouveau tableau, la liste d'origine
+#n'est pas modifiée ; valeurs manquantes écartées
 def ordreDecroissant(liste):
-    liste.sort(reverse = True)
-    return liste
+    valeurs = np.asarray(liste, dtype=np.float64)
+    return valeurs[ordre_decroissant(valeurs)]
 
 #Fonction pour obtenir le classement des listes spécifiques aux populations
+#Tableau structuré (rang, nom) par population décroissante, sans les valeurs manquantes ;
+#égalités départagées par nom décroissant
 def ordrePopulation(pop, etat):
-    ordrepop = []
-    for element in range(0, len(pop)):
-        if np.isnan(pop[element]) == False:
-            ordrepop.append([float(pop[element]), etat[element]])
-    ordrepop = ordreDecroissant(ordrepop)
-    for element in range(0, len(ordrepop)):
-        ordrepop[element] = [element + 1, ordrepop[element][1]]
-    return ordrepop
+    return table_rangs(pop, etat)
+
+#Fonction pour l'extrait affiché d'un classement : listes [rang, nom] comme avant la table NumPy
+def extraitListe(ordre, n=10):
+    return [list(ligne) for ligne in ordre[0:n].tolist()]
 
 #Fonction pour obtenir l'ordre défini entre deux classements (listes spécifiques aux populations)
+#Appariement par index de hachage (O(n + m)) : [rang dans ordre1, rang dans ordre2, nom] des pays communs
 def classementPays(ordre1, ordre2):
-    classement = []
-    if len(ordre1) <= len(ordre2):
-        for element1 in range(0, len(ordre2) - 1):
-            for element2 in range(0, len(ordre1) - 1):
-                if ordre2[element1][1] == ordre1[element2][1]:
-                    classement.append([ordre1[element2][0], ordre2[element1][0], ordre1[element2][1]])
-    else:
-        for element1 in range(0, len(ordre1) - 1):
-            for element2 in range(0, len(ordre2) - 1):
-                if ordre2[element2][1] == ordre1[element1][1]:
-                    classement.append([ordre1[element1][0], ordre2[element2][0], ordre1[element][1]])
+    classement, seuls1, seuls2 = joindre_listes(ordre1, ordre2)
+    if seuls1 or seuls2:
+        print("pays sans correspondance :", seuls1, "/", seuls2)
     return classement
 
 #Partie sur les îles
-iles = pd.DataFrame(ouvrirUnFichier("./data/island-index.csv"))
-print(iles.head())
-
-#Isoler la colonne des surfaces
-surfaces = list(iles["Surface (km²)"])
-surfaces = [float(x) for x in surfaces]
-
-
-continents = [
-    85545323, #Afrique / Asie / Europe
-    37856841, #Amérique
-    7768030, #Antarctique
-    7605049, #Australie
-]
-
-surfaces.extend([float(v) for v in continents])
-
-print("ajout ok")
-
-
-#ordre décroissant des surfaces
-surfaces_ordre = ordreDecroissant(surfaces)
-print("Top 10 des plus grandes surfaces d'îles et continents:")
-print(surfaces_ordre[0:10])
-
-#Loi rang-taille
-df = pd.DataFrame(surfaces_ordre, columns=["Surface (km²)"])
-df["rang"] = range(1, len(df) + 1)
-
-plt.figure(figsize=(7,5))
-plt.loglog(df["rang"], df["Surface (km²)"], marker="o")
-plt.title("Loi rang-taille des surfaces des îles et continents")
-plt.xlabel("Rang")
-plt.ylabel("Surface (km²)")
-plt.grid(True, which="both", ls="--", alpha=0.4)
-plt.tight_layout()
-plt.savefig("loi_rang_taille_iles_continents.png")
-plt.show()
-
-print("image rang-taille ok")
-
-#conversion logarithmique des surfaces
-log_rang = conversionLog(df["rang"])
-log_surface = conversionLog(df["Surface (km²)"])
-
-plt.figure(figsize=(7,5))
-plt.scatter(log_rang, log_surface)
-plt.title("Conversion logarithmique des surfaces des îles et continents")
-plt.xlabel("Log(Rang)")
-plt.ylabel("Log(Surface (km²))")
-plt.grid(True, which="both", ls="--", alpha=0.4)
-plt.tight_layout()
-plt.savefig("conversion_logarithmique_iles_continents.png")
-plt.show()
-
-print("image conversion logarithmique ok")
+def lireIles(chemin):
+    iles = pd.DataFrame(ouvrirUnFichier(chemin, ["Surface (km²)"]))
+    print(iles.head())
+
+    #Isoler la colonne des surfaces
+    surfaces = iles["Surface (km²)"].to_numpy(dtype=np.float64)
+
+
+    continents = [
+        85545323, #Afrique / Asie / Europe
+        37856841, #Amérique
+        7768030, #Antarctique
+        7605049, #Australie
+    ]
+
+    surfaces = np.concatenate([surfaces, np.asarray(continents, dtype=np.float64)])
+    compter(len(surfaces))
+
+    print("ajout ok")
+
+
+    #Top 10 sans trier toutes les surfaces (argpartition), puis ordre décroissant pour la loi rang-taille
+    print("Top 10 des plus grandes surfaces d'îles et continents:")
+    print(surfaces[top_k(surfaces, 10)].tolist())
+    surfaces_ordre = ordreDecroissant(surfaces)
+
+    #Loi rang-taille
+    df = pd.DataFrame(surfaces_ordre, columns=["Surface (km²)"])
+    df["rang"] = range(1, len(df) + 1)
+    return df
+
+def graphiquesIles(iles):
+    df = iles
+
+    # import différé : matplotlib n'est chargé qu'au moment de tracer
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(7,5))
+    plt.loglog(df["rang"], df["Surface (km²)"], marker="o")
+    plt.title("Loi rang-taille des surfaces des îles et continents")
+    plt.xlabel("Rang")
+    plt.ylabel("Surface (km²)")
+    plt.grid(True, which="both", ls="--", alpha=0.4)
+    plt.tight_layout()
+    plt.savefig("loi_rang_taille_iles_continents.png")
+    afficher()
+
+    print("image rang-taille ok")
+
+    #conversion logarithmique des surfaces
+    log_rang = conversionLog(df["rang"])
+    log_surface = conversionLog(df["Surface (km²)"])
+
+    plt.figure(figsize=(7,5))
+    plt.scatter(log_rang, log_surface)
+    plt.title("Conversion logarithmique des surfaces des îles et continents")
+    plt.xlabel("Log(Rang)")
+    plt.ylabel("Log(Surface (km²))")
+    plt.grid(True, which="both", ls="--", alpha=0.4)
+    plt.tight_layout()
+    plt.savefig("conversion_logarithmique_iles_continents.png")
+    afficher()
+
+    print("image conversion logarithmique ok")
+
+# Ajustement de la loi rang-taille : exposant de Zipf et intervalle de confiance à 95 %
+def ajustementIles(iles):
+    ajustement = ajuster_rang_taille(iles["Surface (km²)"], niveau=0.95)
+    print("Ajustement de la loi rang-taille des surfaces :")
+    print(ajustement.round(4))
+    return ajustement
 
 # Etape n 7 
 # Les rangs étant issus d’un tri, ils ne sont pas i.i.d. et ne permettent pas de test statistique fiable. Le test doit donc être appliqué aux valeurs brutes de la colonne du CSV.
 
 #Partie sur les populations États du monde
-monde = pd.DataFrame(ouvrirUnFichier("./data/Le-Monde-HS-Etats-du-monde-2007-2025.csv"))
-print(monde.head())
-
-#Isolement colonnes
-colonnes = ["État", "Pop 2007", "Pop 2025", "Densité 2007", "Densité 2025"]
-donnees = monde[colonnes]
-
-etats = list(donnees["État"])
-pop2007 = list(donnees["Pop 2007"])
-pop2025 = list(donnees["Pop 2025"])
-densite2007 = list(donnees["Densité 2007"])
-densite2025 = list(donnees["Densité 2025"])
-print("isolation ok")
-
-# Ordre décroissant
-ordrepop2007 = ordrePopulation(pop2007, etats)
-ordrepop2025 = ordrePopulation(pop2025, etats)
-ordredensite2007 = ordrePopulation(densite2007, etats)
-ordredensite2025 = ordrePopulation(densite2025, etats)
-print("extrait ordre pop 2007", ordrepop2007[0:10])
-print("extrait ordre pop 2025", ordrepop2025[0:10])
-print("extrait ordre densite 2007", ordredensite2007[0:10])
-print("extrait ordre densite 2025", ordredensite2025[0:10])
-
-# Comparaison listes
-comparaison_liste = classementPays(ordrepop2007, ordredensite2025)
-comparaison_liste.sort()
-print("extrait comparaison liste", comparaison_liste[0:10])
-
-# Isolement colonnes
-rangs_pop = []
-rangs_densite = []
-for element in comparaison_liste:
-    rangs_pop.append(element[0])
-    rangs_densite.append(element[1])
-
-print("extrait rangs pop", rangs_pop[0:10])
-print("extrait rangs densite", rangs_densite[0:10])
+def lireMonde(chemin):
+    monde = pd.DataFrame(ouvrirUnFichier(chemin))
+    compter(len(monde))
+    print(monde.head())
+    return monde
+
+def classementsMonde(monde):
+    #Isolement colonnes
+    colonnes = ["État", "Pop 2007", "Pop 2025", "Densité 2007", "Densité 2025"]
+    donnees = monde[colonnes]
+
+    etats = donnees["État"].to_numpy(dtype=str)
+    pop2007 = donnees["Pop 2007"].to_numpy(dtype=np.float64)
+    pop2025 = donnees["Pop 2025"].to_numpy(dtype=np.float64)
+    densite2007 = donnees["Densité 2007"].to_numpy(dtype=np.float64)
+    densite2025 = donnees["Densité 2025"].to_numpy(dtype=np.float64)
+    print("isolation ok")
+
+    # Ordre décroissant
+    ordrepop2007 = ordrePopulation(pop2007, etats)
+    ordrepop2025 = ordrePopulation(pop2025, etats)
+    ordredensite2007 = ordrePopulation(densite2007, etats)
+    ordredensite2025 = ordrePopulation(densite2025, etats)
+    print("extrait ordre pop 2007", extraitListe(ordrepop2007))
+    print("extrait ordre pop 2025", extraitListe(ordrepop2025))
+    print("extrait ordre densite 2007", extraitListe(ordredensite2007))
+    print("extrait ordre densite 2025", extraitListe(ordredensite2025))
+
+    # Comparaison listes
+    comparaison_liste = classementPays(ordrepop2007, ordredensite2025)
+    comparaison_liste.sort()
+    print("extrait comparaison liste", comparaison_liste[0:10])
+
+    # Isolement colonnes
+    rangs_pop = []
+    rangs_densite = []
+    for element in comparaison_liste:
+        rangs_pop.append(element[0])
+        rangs_densite.append(element[1])
+
+    print("extrait rangs pop", rangs_pop[0:10])
+    print("extrait rangs densite", rangs_densite[0:10])
+    return rangs_pop, rangs_densite
+
+# Comparaison de tous les classements de population (2007 ... 2025) en un seul appel, par code ISO
+def comparaisonAnnees(monde):
+    annees_pop = [c for c in monde.columns if c.startswith("Pop ")]
+    rangs_annees, non_apparies = comparer_classements(monde, "Code ISO_3", annees_pop)
+    print("extrait rangs pop 2007 ... 2025")
+    print(rangs_annees.head(10))
+    for annee, codes in non_apparies.items():
+        if codes:
+            print(f"{annee} : {len(codes)} pays absents d'au moins un autre classement", codes[:10])
+    return rangs_annees
 
 # Calcul de la corrélation et de la concordance
-from scipy.stats import spearmanr, kendalltau
-
-correlation_spearman = spearmanr(rangs_pop, rangs_densite)
-concordance_kendall = kendalltau(rangs_pop, rangs_densite)
-
-print("Corrélation de Spearman :", correlation_spearman)
-print("Concordance de Kendall :", concordance_kendall)
-
+def correlationsMonde(monde, classements):
+    from scipy.stats import spearmanr, kendalltau
+
+    rangs_pop, rangs_densite = classements
+    correlation_spearman = spearmanr(rangs_pop, rangs_densite)
+    concordance_kendall = kendalltau(rangs_pop, rangs_densite)
+
+    print("Corrélation de Spearman :", correlation_spearman)
+    print("Concordance de Kendall :", concordance_kendall)
+
+    # p-valeurs par permutations et intervalles de confiance bootstrap (BCa) des deux coefficients
+    couples = np.column_stack([rangs_pop, rangs_densite]).astype(np.float64)
+    for methode in ("spearman", "kendall"):
+        coefficient, p = permutation_correlation(couples[:, 0], couples[:, 1], methode, NB_REECHANTILLONS,
+                                                 graine=GRAINE, workers=NB_WORKERS)
+        intervalle = intervalle_bootstrap(couples, methode, nb_reechantillons=NB_REECHANTILLONS, graine=GRAINE,
+                                          workers=NB_WORKERS).iloc[0]
+        print(f"{methode} : {coefficient:.4f}, p (permutations) = {p:.4g}, "
+              f"IC 95 % (BCa) = [{intervalle['Borne inf']:.4f} ; {intervalle['Borne sup']:.4f}]")
+
+    # Matrices de corrélation de rangs entre toutes les années (19 populations et 19 densités : 38 x 38)
+    colonnes_panel = [c for c in monde.columns if c.startswith("Pop ") or c.startswith("Densité ")]
+    correlations = correlations_panel(monde, colonnes_panel)
+    print("Spearman Pop 2007 / Densité 2007 ... 2025 :")
+    print(correlations["spearman"].loc["Pop 2007", [c for c in colonnes_panel if c.startswith("Densité ")]].round(3))
+    print("Kendall tau-b Pop 2007 / Pop 2007 ... 2025 :")
+    print(correlations["kendall"].loc["Pop 2007", [c for c in colonnes_panel if c.startswith("Pop ")]].round(3))
+    return correlations
+
+ETAPES = {
+    # Îles
+    "iles": {"fonction": lireIles, "parametres": {"chemin": FICHIER_ILES}, "fichiers": [FICHIER_ILES]},
+    "graphiques": {"fonction": graphiquesIles, "entrees": ["iles"],
+                   "sorties": ["loi_rang_taille_iles_continents.png", "conversion_logarithmique_iles_continents.png"]},
+    "ajustement": {"fonction": ajustementIles, "entrees": ["iles"]},
+    # États du monde
+    "monde": {"fonction": lireMonde, "parametres": {"chemin": FICHIER_MONDE}, "fichiers": [FICHIER_MONDE]},
+    "classements": {"fonction": classementsMonde, "entrees": ["monde"]},
+    "comparaison_annees": {"fonction": comparaisonAnnees, "entrees": ["monde"]},
+    "correlations": {"fonction": correlationsMonde, "entrees": ["monde", "classements"],
+                     "environnement": ["NB_REECHANTILLONS", "GRAINE"]},
+}
+
+executer(ETAPES, workers=NB_WORKERS)
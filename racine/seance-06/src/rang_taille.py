@@ -0,0 +1,188 @@
+#coding:utf8
+
+# Loi rang-taille (Zipf) : ajustement de log(taille) = a - b log(rang) sur une colonne numérique
+# - MCO : moindres carrés ordinaires, intervalle de confiance de Student
+# - MCO Gabaix-Ibragimov : rang - 1/2 (réduit le biais de petit échantillon), erreur type |b| sqrt(2/n)
+# - Huber : régression robuste par moindres carrés repondérés (peu sensible aux points extrêmes)
+# - MLE Clauset-Shalizi-Newman : loi de puissance continue p(x) ~ x^(-alpha) au-delà de x_min,
+#   x_min choisi en minimisant la distance de Kolmogorov-Smirnov ; exposant de Zipf = 1 / (alpha - 1)
+# Tout est calculé sur des tableaux NumPy triés une seule fois. Pour la recherche de x_min, les
+# sommes de log(x) de chaque queue viennent d'une somme cumulée (alpha en O(1) par candidat) et
+# la distance KS coûte O(n) vectorisé par candidat. Elle est évaluée pour toutes les valeurs
+# distinctes tant que candidats x n reste sous BUDGET_KS ; au-delà, sur une grille de NB_CANDIDATS
+# valeurs (régulière en rang et en log x), puis sur des grilles de plus en plus fines autour des
+# meilleurs points, jusqu'à des intervalles assez petits pour une recherche exhaustive : O(n log n).
+# quantile_max limite en plus les candidats aux plus petites valeurs, comme le proposent CSN.
+# Les rangs issus d'un tri ne sont pas indépendants : les intervalles des régressions MCO et Huber
+# sont trop étroits ; ceux de Gabaix-Ibragimov et du MLE sont à privilégier.
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtri, stdtrit
+
+QUEUE_MIN = 50
+# Recherche exhaustive de x_min si (nombre de candidats) x (taille de l'échantillon) <= BUDGET_KS,
+# sinon par grilles successives de NB_CANDIDATS candidats, affinées autour des NB_MINIMA meilleurs
+BUDGET_KS = 100_000_000
+NB_CANDIDATS = 128
+NB_MINIMA = 4
+COLONNES = ["Exposant", "IC inf", "IC sup", "Erreur type", "Ordonnée", "R²", "Effectif", "x_min", "KS"]
+
+# Fonction pour les rangs et tailles en logarithmes (valeurs manquantes et non positives écartées)
+# Renvoie les tailles triées par ordre décroissant, log(rang) et log(taille)
+def rangs_tailles(valeurs, decalage=0.0):
+    x = np.asarray(valeurs, dtype=np.float64)
+    x = np.sort(x[np.isfinite(x) & (x > 0)])[::-1]
+    rangs = np.arange(1, len(x) + 1, dtype=np.float64)
+    return x, np.log(rangs - decalage), np.log(x)
+
+# Fonction pour une régression linéaire pondérée y = a + b t (poids égaux = MCO)
+def regression(t, y, poids=None):
+    w = np.ones_like(t) if poids is None else poids
+    sw = w.sum()
+    tm = (w * t).sum() / sw
+    ym = (w * y).sum() / sw
+    stt = (w * (t - tm) ** 2).sum()
+    b = (w * (t - tm) * (y - ym)).sum() / stt
+    a = ym - b * tm
+    return a, b, stt
+
+def ajuster_mco(log_rang, log_taille, niveau=0.95):
+    n = len(log_rang)
+    a, b, stt = regression(log_rang, log_taille)
+    residus = log_taille - a - b * log_rang
+    se = np.sqrt((residus ** 2).sum() / (n - 2) / stt)
+    r2 = 1 - (residus ** 2).sum() / ((log_taille - log_taille.mean()) ** 2).sum()
+    t = stdtrit(n - 2, 1 - (1 - niveau) / 2)
+    return {"Exposant": -b, "IC inf": -b - t * se, "IC sup": -b + t * se, "Erreur type": se,
+            "Ordonnée": a, "R²": r2, "Effectif": n}
+
+def ajuster_gabaix_ibragimov(log_rang_decale, log_taille, niveau=0.95):
+    resultat = ajuster_mco(log_rang_decale, log_taille, niveau)
+    z = ndtri(1 - (1 - niveau) / 2)
+    se = abs(resultat["Exposant"]) * np.sqrt(2 / resultat["Effectif"])
+    resultat.update({"IC inf": resultat["Exposant"] - z * se, "IC sup": resultat["Exposant"] + z * se,
+                     "Erreur type": se})
+    return resultat
+
+# Régression de Huber par moindres carrés repondérés ; échelle des résidus estimée par la MAD
+def ajuster_huber(log_rang, log_taille, niveau=0.95, k=1.345, iterations=50, tolerance=1e-10):
+    n = len(log_rang)
+    a, b, _ = regression(log_rang, log_taille)
+    for _ in range(iterations):
+        residus = log_taille - a - b * log_rang
+        echelle = 1.4826 * np.median(np.abs(residus - np.median(residus))) or 1e-12
+        u = np.abs(residus) / echelle
+        poids = np.minimum(1.0, k / np.maximum(u, 1e-12))
+        a_nouveau, b_nouveau, stt = regression(log_rang, log_taille, poids)
+        converge = abs(b_nouveau - b) < tolerance and abs(a_nouveau - a) < tolerance
+        a, b = a_nouveau, b_nouveau
+        if converge:
+            break
+    residus = log_taille - a - b * log_rang
+    # erreur type asymptotique du M-estimateur : echelle² E[psi²] / E[psi']² / somme (t - t_moyen)²
+    u = residus / echelle
+    psi = np.clip(u, -k, k)
+    derivee = np.mean(np.abs(u) <= k)
+    se = echelle * np.sqrt(np.mean(psi ** 2)) / max(derivee, 1e-12) / np.sqrt(((log_rang - log_rang.mean()) ** 2).sum())
+    r2 = 1 - (residus ** 2).sum() / ((log_taille - log_taille.mean()) ** 2).sum()
+    z = ndtri(1 - (1 - niveau) / 2)
+    return {"Exposant": -b, "IC inf": -b - z * se, "IC sup": -b + z * se, "Erreur type": se,
+            "Ordonnée": a, "R²": r2, "Effectif": n}
+
+# Fonction pour la distance KS entre la queue x[i:] (triée par ordre croissant) et la loi de puissance
+# log_x, rangs : log(x) et 0, 1, ..., n - 1 déjà calculés (pas de nouveau calcul pour chaque candidat)
+# Avec g = m (j / m - F(x_j)), les deux écarts sont (max(g) + 1) / m et -min(g) / m : opérations en place
+def distance_ks(x_croissant, i, alpha, log_x=None, rangs=None):
+    if log_x is None:
+        log_x = np.log(x_croissant)
+    if rangs is None:
+        rangs = np.arange(len(log_x), dtype=np.float64)
+    m = len(log_x) - i
+    g = log_x[i:] - log_x[i]
+    g *= 1 - alpha
+    np.expm1(g, out=g)
+    g *= m
+    g += rangs[:m]
+    return max(g.max() + 1, -g.min()) / m
+
+# Fonction pour choisir, parmi les positions de départ triées `debuts`, celle de plus petite distance KS
+# ks_de : fonction position -> distance KS. La distance n'est pas unimodale en x_min : grille régulière
+# en rang et en log x, puis nouvelle grille sur les intervalles qui encadrent les NB_MINIMA meilleurs
+# points ; recherche exhaustive quand il reste peu de candidats. À égalité, le plus petit x_min.
+def minimum_ks(debuts, log_x, ks_de, exhaustif, nb_candidats=NB_CANDIDATS, nb_minima=NB_MINIMA):
+    calculees = {}
+    while True:
+        if exhaustif or len(debuts) <= nb_candidats:
+            grille = np.arange(len(debuts))
+        else:
+            rangs = np.linspace(0, len(debuts) - 1, nb_candidats // 2).round().astype(np.int64)
+            logs = np.linspace(log_x[debuts[0]], log_x[debuts[-1]], nb_candidats // 2)
+            grille = np.unique(np.r_[rangs, np.searchsorted(log_x[debuts], logs).clip(0, len(debuts) - 1)])
+        for i in debuts[grille].tolist():
+            if i not in calculees:
+                calculees[i] = ks_de(i)
+        if len(grille) == len(debuts):
+            break
+        ks = np.array([calculees[i] for i in debuts[grille].tolist()])
+        garder = np.zeros(len(debuts), dtype=bool)
+        for b in np.argsort(ks, kind="stable")[:nb_minima].tolist():
+            garder[grille[max(b - 1, 0)]:grille[min(b + 1, len(grille) - 1)] + 1] = True
+        debuts = debuts[garder]
+    positions = np.array(sorted(calculees))
+    return int(positions[int(np.argmin([calculees[i] for i in positions.tolist()]))])
+
+# Recherche de x_min (Clauset, Shalizi et Newman 2009)
+# Renvoie alpha, son erreur type, x_min, la taille de la queue et la distance KS
+# exhaustif=True force l'évaluation de toutes les valeurs distinctes, quel que soit BUDGET_KS
+def clauset(valeurs, queue_min=QUEUE_MIN, quantile_max=None, x_min=None, exhaustif=None):
+    x = np.asarray(valeurs, dtype=np.float64)
+    x = np.sort(x[np.isfinite(x) & (x > 0)])
+    n = len(x)
+    log_x = np.log(x)
+    # somme des log(x) de i à la fin, pour chaque i
+    sommes_queue = np.cumsum(log_x[::-1])[::-1]
+
+    def alpha_de(i):
+        m = n - i
+        return 1 + m / (sommes_queue[i] - m * log_x[i])
+
+    if x_min is not None:
+        meilleur = int(np.searchsorted(x, x_min))
+    else:
+        # candidats : premières occurrences des valeurs distinctes, avec une queue assez longue
+        debuts = np.flatnonzero(np.r_[True, x[1:] != x[:-1]])
+        debuts = debuts[n - debuts >= min(queue_min, n // 2)]
+        if quantile_max is not None:
+            debuts = debuts[x[debuts] <= np.quantile(x, quantile_max)]
+        if len(debuts) == 0:
+            raise ValueError("Pas assez de valeurs distinctes pour ajuster une loi de puissance")
+        if exhaustif is None:
+            exhaustif = len(debuts) * n <= BUDGET_KS
+        rangs = np.arange(n, dtype=np.float64)
+        meilleur = minimum_ks(debuts, log_x, lambda i: distance_ks(x, i, alpha_de(i), log_x, rangs), exhaustif)
+    alpha = alpha_de(meilleur)
+    m = n - meilleur
+    return {"alpha": float(alpha), "erreur_type": float((alpha - 1) / np.sqrt(m)), "x_min": float(x[meilleur]),
+            "Effectif": int(m), "KS": float(distance_ks(x, meilleur, alpha, log_x))}
+
+def ajuster_clauset(valeurs, niveau=0.95, **options):
+    resultat = clauset(valeurs, **options)
+    z = ndtri(1 - (1 - niveau) / 2)
+    alpha, se = resultat["alpha"], resultat["erreur_type"]
+    # exposant de Zipf b = 1 / (alpha - 1) : intervalle transformé (fonction décroissante de alpha)
+    return {"Exposant": 1 / (alpha - 1), "IC inf": 1 / (alpha + z * se - 1),
+            "IC sup": 1 / max(alpha - z * se - 1, 1e-12), "Erreur type": se / (alpha - 1) ** 2,
+            "Effectif": resultat["Effectif"], "x_min": resultat["x_min"], "KS": resultat["KS"]}
+
+# Fonction principale : exposant de Zipf et intervalle de confiance pour chaque méthode
+def ajuster_rang_taille(valeurs, niveau=0.95, clauset_options=None):
+    _, log_rang, log_taille = rangs_tailles(valeurs)
+    log_rang_decale = np.log(np.arange(1, len(log_rang) + 1) - 0.5)
+    lignes = {
+        "MCO": ajuster_mco(log_rang, log_taille, niveau),
+        "MCO Gabaix-Ibragimov": ajuster_gabaix_ibragimov(log_rang_decale, log_taille, niveau),
+        "Huber": ajuster_huber(log_rang, log_taille, niveau),
+        "MLE Clauset-Shalizi-Newman": ajuster_clauset(valeurs, niveau, **(clauset_options or {})),
+    }
+    return pd.DataFrame.from_dict(lignes, orient="index").reindex(columns=COLONNES).rename_axis("Méthode")
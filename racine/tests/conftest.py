@@ -0,0 +1,14 @@
+#coding:utf8
+
+# Tests des modules de calcul : paquet commun racine/donnees et modules des séances (src/)
+# Les modules des séances ont des noms distincts : tous les dossiers src/ sont ajoutés au chemin
+# d'import (les scripts main.py ne sont jamais importés).
+
+import os
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for dossier in [RACINE] + [os.path.join(RACINE, f"seance-0{i}", "src") for i in range(1, 7)]:
+    if dossier not in sys.path:
+        sys.path.insert(0, dossier)
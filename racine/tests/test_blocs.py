@@ -0,0 +1,78 @@
+#coding:utf8
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees.blocs import agreger_resultats, histogramme_resultats, partitions
+from donnees.resultats import COLONNES_COMPTES, COLONNES_DEPARTEMENT, lire_resultats, remettre_en_large
+
+CANDIDATS = [("M", "DUPONT", "Jean"), ("F", "MARTIN", "Léa"), ("M", "PETIT", "Éric")]
+
+LIBELLES = {"01": "Ain", "02": "Aisne", "2A": "Corse-du-Sud", "971": "Guadeloupe"}
+
+# Fichier au format data.gouv.fr, un bloc Sexe/Nom/Prénom/Voix par candidat : une ligne par
+# département (nb_lignes=None) ou par bureau de vote (plusieurs lignes par département)
+def ecrire_resultats(chemin, nb_lignes=600):
+    generateur = np.random.default_rng(6)
+    codes = np.array(list(LIBELLES)) if nb_lignes is None else np.sort(generateur.choice(list(LIBELLES), nb_lignes))
+    nb_lignes = len(codes)
+    voix = generateur.integers(0, 300, (nb_lignes, len(CANDIDATS)))
+    exprimes = voix.sum(axis=1)
+    blancs, nuls = generateur.integers(0, 10, nb_lignes), generateur.integers(0, 5, nb_lignes)
+    votants = exprimes + blancs + nuls
+    abstentions = generateur.integers(0, 200, nb_lignes)
+    colonnes = {
+        "Code du département": codes, "Libellé du département": [LIBELLES[c] for c in codes],
+        "Inscrits": votants + abstentions, "Abstentions": abstentions, "Votants": votants,
+        "Blancs": blancs, "Nuls": nuls, "Exprimés": exprimes,
+    }
+    table = pd.DataFrame(colonnes)
+    for i, (sexe, nom, prenom) in enumerate(CANDIDATS):
+        bloc = pd.DataFrame({"Sexe": sexe, "Nom": nom, "Prénom": prenom, "Voix": voix[:, i]})
+        table = pd.concat([table, bloc], axis=1)
+    table.to_csv(chemin, index=False, encoding="utf-8")
+    return table
+
+def test_agregats_par_partitions_comme_pandas(tmp_path):
+    chemin = str(tmp_path / "resultats.csv")
+    table = ecrire_resultats(chemin)
+    assert len(partitions(chemin, 2000)) > 5
+    agregats = agreger_resultats(chemin, workers=2, taille_partition=2000)
+    assert agregats["sommes"].tolist() == table[COLONNES_COMPTES].sum().tolist()
+    attendu = table.groupby(COLONNES_DEPARTEMENT, as_index=False)[COLONNES_COMPTES].sum()
+    departements = agregats["departements"]
+    assert departements["Code du département"].tolist() == attendu["Code du département"].tolist()
+    assert departements[COLONNES_COMPTES].to_numpy().tolist() == attendu[COLONNES_COMPTES].to_numpy().tolist()
+    assert departements["Lignes"].tolist() == table.groupby("Code du département").size().tolist()
+    voix = agregats["voix"].droplevel("Sexe")
+    lu = pd.read_csv(chemin)
+    for i, (_, nom, prenom) in enumerate(CANDIDATS):
+        assert voix[(nom, prenom)] == lu["Voix" if i == 0 else f"Voix.{i}"].sum()
+
+def test_table_large_reconstruite(tmp_path):
+    chemin = str(tmp_path / "departements.csv")
+    ecrire_resultats(chemin, nb_lignes=None)
+    reference = pd.read_csv(chemin, dtype={"Code du département": str})
+    tables = lire_resultats(chemin)
+    large = remettre_en_large(tables["departements"], tables["candidats"])
+    assert list(large.columns) == list(reference.columns)
+    for colonne in reference.columns:
+        assert large[colonne].astype(str).tolist() == reference[colonne].astype(str).tolist(), colonne
+    # mode flux (fichier par bureau) : une ligne par département, voix sommées par département
+    chemin = str(tmp_path / "bureaux.csv")
+    ecrire_resultats(chemin)
+    reference = pd.read_csv(chemin, dtype={"Code du département": str})
+    tables = lire_resultats(chemin)
+    with pytest.raises(ValueError, match="en double"):
+        remettre_en_large(tables["departements"], tables["candidats"])
+    agregats = agreger_resultats(chemin, taille_partition=500)
+    large = remettre_en_large(agregats["departements"].drop(columns="Lignes"), agregats["voix_departements"])
+    attendu = reference.groupby("Code du département")[[c for c in reference.columns if c.startswith("Voix")]].sum()
+    assert large.set_index("Code du département")[attendu.columns].to_numpy().tolist() == attendu.to_numpy().tolist()
+
+def test_histogramme_par_partitions(tmp_path):
+    chemin = str(tmp_path / "resultats.csv")
+    table = ecrire_resultats(chemin)
+    histo = histogramme_resultats(chemin, "Inscrits", "lineaires", nb_classes=8, taille_partition=3000)
+    assert histo["comptes"].tolist() == np.histogram(table["Inscrits"], bins=8)[0].tolist()
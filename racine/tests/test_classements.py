@@ -0,0 +1,59 @@
+#coding:utf8
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats
+
+from classements import (comparer_classements, joindre_listes, ordre_decroissant, rangs, rangs_decroissants,
+                         table_rangs, top_k)
+
+METHODES_SCIPY = {"ordinal": "ordinal", "dense": "dense", "min": "min", "max": "max", "moyen": "average"}
+
+def valeurs():
+    x = np.random.default_rng(7).integers(0, 30, 500).astype(np.float64)
+    x[::50] = np.nan
+    return x
+
+@pytest.mark.parametrize("methode", list(METHODES_SCIPY))
+def test_rangs_comme_rankdata(methode):
+    x = valeurs()
+    presents = ~np.isnan(x)
+    attendu = scipy.stats.rankdata(-x[presents], method=METHODES_SCIPY[methode])
+    obtenu = rangs(x, methode)
+    assert np.array_equal(obtenu[presents], attendu)
+    assert np.isnan(obtenu[~presents]).all()
+
+def test_top_k_comme_tri_complet():
+    x = valeurs()
+    noms = np.array([f"pays {i:03d}" for i in range(len(x))], dtype=object)
+    ordre = ordre_decroissant(x, noms)
+    # tri des listes [valeur, nom] par ordre décroissant (ordrePopulation d'origine)
+    reference = sorted([[x[i], noms[i]] for i in range(len(x)) if not np.isnan(x[i])], reverse=True)
+    assert [noms[i] for i in ordre] == [nom for _, nom in reference]
+    for k in (0, 1, 17, 450, 1000):
+        assert top_k(x, k, noms).tolist() == ordre[:k].tolist()
+
+def test_jointure_des_listes_et_doublons():
+    ordre1 = table_rangs(np.array([5.0, 3.0, 1.0]), np.array(["A", "B", "C"], dtype=object))
+    ordre2 = table_rangs(np.array([1.0, 9.0, 4.0]), np.array(["A", "B", "D"], dtype=object))
+    assert joindre_listes(ordre1, ordre2) == ([[1, 3, "A"], [2, 1, "B"]], ["C"], ["D"])
+    assert joindre_listes(ordre1.tolist(), ordre2.tolist()) == ([[1, 3, "A"], [2, 1, "B"]], ["C"], ["D"])
+    doublons = table_rangs(np.array([1.0, 2.0]), np.array(["A", "A"], dtype=object))
+    with pytest.raises(ValueError, match="Clés en double"):
+        joindre_listes(ordre1, doublons)
+
+def test_rangs_decroissants_et_doublons():
+    rangs = rangs_decroissants([5.0, np.nan, 9.0, 5.0], ["A", "B", "C", "D"])
+    # égalité départagée par clé décroissante, comme le tri des listes [valeur, nom]
+    assert rangs.to_dict() == {"C": 1, "D": 2, "A": 3}
+    with pytest.raises(ValueError, match="Clés en double"):
+        rangs_decroissants([1.0, 2.0], ["A", "A"])
+
+def test_comparer_classements_signale_les_absents():
+    donnees = pd.DataFrame({"Code": ["FRA", "DEU", "ITA", "ESP"], "Pop 2007": [64.0, 82.0, 59.0, np.nan],
+                            "Pop 2025": [66.0, 83.0, np.nan, 48.0]})
+    jointe, non_apparies = comparer_classements(donnees, "Code", ["Pop 2007", "Pop 2025"])
+    assert jointe.index.tolist() == ["DEU", "FRA"]
+    assert jointe.to_numpy().tolist() == [[1, 1], [2, 2]]
+    assert non_apparies == {"Pop 2007": ["ITA"], "Pop 2025": ["ESP"]}
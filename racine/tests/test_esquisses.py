@@ -0,0 +1,38 @@
+#coding:utf8
+
+import numpy as np
+import pytest
+
+from donnees.esquisses import PRECISION, ajouter_esquisse, fusionner_esquisses, nouvelle_esquisse, quantiles_esquisse
+
+# Valeurs de signes mélangés, avec zéros et valeurs manquantes
+def valeurs():
+    generateur = np.random.default_rng(4)
+    x = np.concatenate([generateur.lognormal(3, 1, 6000), -generateur.lognormal(1, 1, 3000), np.zeros(500)])
+    x[::211] = np.nan
+    return generateur.permutation(x)
+
+def test_quantiles_a_la_precision_pres():
+    x = valeurs()
+    esquisse = ajouter_esquisse(nouvelle_esquisse(), x)
+    presents = x[~np.isnan(x)]
+    probabilites = np.linspace(0, 1, 21)
+    estimes = quantiles_esquisse(esquisse, probabilites)
+    # valeur de rang q * (n - 1) arrondi vers le bas, comme method="lower"
+    attendus = np.quantile(presents, probabilites, method="lower")
+    assert np.all(np.abs(estimes - attendus) <= PRECISION * np.abs(attendus) + 1e-12)
+    assert (esquisse["min"], esquisse["max"]) == (presents.min(), presents.max())
+    assert esquisse["zeros"] == np.count_nonzero(presents == 0) and esquisse["manquants"] == np.isnan(x).sum()
+    assert esquisse["min_positif"] == presents[presents > 0].min()
+
+def test_fusion_comme_un_seul_passage():
+    x = valeurs()
+    un_passage = ajouter_esquisse(nouvelle_esquisse(), x)
+    fusion = fusionner_esquisses(ajouter_esquisse(nouvelle_esquisse(), x[:4000]), ajouter_esquisse(nouvelle_esquisse(), x[4000:]))
+    for cle in ("positifs", "negatifs"):
+        assert fusion[cle]["indice_min"] == un_passage[cle]["indice_min"]
+        assert fusion[cle]["comptes"].tolist() == un_passage[cle]["comptes"].tolist()
+    for cle in ("zeros", "manquants", "min", "min_positif", "max"):
+        assert fusion[cle] == un_passage[cle]
+    with pytest.raises(ValueError):
+        fusionner_esquisses(un_passage, nouvelle_esquisse(0.05))
@@ -0,0 +1,35 @@
+#coding:utf8
+
+import numpy as np
+import scipy.stats
+
+import evaluation_lois
+from evaluation_lois import balayage, evaluer, evaluer_gelee, infos_cache, vider_cache
+
+def test_comme_scipy_et_resultat_en_cache():
+    vider_cache()
+    grille = np.linspace(-3, 3, 101)
+    resultat = evaluer_gelee(scipy.stats.norm(1.0, 2.0), grille)
+    assert np.allclose(resultat["valeurs"], scipy.stats.norm(1.0, 2.0).pdf(grille))
+    # même loi, mêmes paramètres, grille égale mais autre tableau : même résultat en cache
+    assert evaluer("norm", grille.copy(), 1.0, 2.0) is resultat
+    grille[0] = -4.0
+    assert evaluer("norm", grille, 1.0, 2.0) is not resultat
+    assert resultat["grille"][0] == -3.0
+    assert infos_cache()["entrees"] == 2
+
+def test_cache_borne_en_octets(monkeypatch):
+    vider_cache()
+    grille = np.arange(0, 200, dtype=np.float64)
+    taille = balayage("poisson", grille, "mu", np.linspace(1, 50, 50))
+    octets = sum(tableau.nbytes for tableau in taille.values())
+    monkeypatch.setattr(evaluation_lois, "TAILLE_CACHE", 3 * octets)
+    vider_cache()
+    resultats = [balayage("poisson", grille, "mu", np.linspace(i, 50 + i, 50)) for i in range(1, 6)]
+    assert infos_cache() == {"entrees": 3, "octets": 3 * octets}
+    # les plus récents restent en cache, les plus anciens sont recalculés
+    assert balayage("poisson", grille, "mu", np.linspace(5, 55, 50)) is resultats[-1]
+    assert balayage("poisson", grille, "mu", np.linspace(1, 51, 50)) is not resultats[0]
+    # courbe plus grande que le cache : calculée, pas gardée
+    balayage("poisson", np.arange(0, 20_000, dtype=np.float64), "mu", np.linspace(1, 50, 50))
+    assert infos_cache()["octets"] <= 3 * octets
@@ -0,0 +1,43 @@
+#coding:utf8
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees.histogrammes import (ajouter, fusionner_histogrammes, histogramme_csv, histogramme_tableau,
+                                  nouvel_histogramme, table_histogramme)
+
+def valeurs():
+    x = np.random.default_rng(5).integers(0, 100, 10_000).astype(np.float64)
+    x[::97] = np.nan
+    return x
+
+def test_classes_lineaires_comme_numpy():
+    x = valeurs()
+    histo = histogramme_tableau(x, "lineaires", nb_classes=10, taille_bloc=999)
+    comptes, bords = np.histogram(x[~np.isnan(x)], bins=10)
+    assert np.allclose(histo["bords"], bords)
+    assert histo["comptes"].tolist() == comptes.tolist()
+    assert histo["manquants"] == np.isnan(x).sum()
+
+def test_classes_fermees_a_droite_comme_pd_cut():
+    x = valeurs()
+    bords = [0, 10, 25, 50, 99]
+    histo = ajouter(nouvel_histogramme(bords, droite=True), x)
+    attendu = pd.Series(pd.cut(x, bords, right=True, include_lowest=True)).value_counts(sort=False)
+    assert histo["comptes"].tolist() == attendu.tolist()
+    assert histo["dessus"] == np.count_nonzero(x > 99)
+
+def test_fusion_et_csv(tmp_path):
+    x = valeurs()
+    chemins = []
+    for i, morceau in enumerate(np.array_split(x, 3)):
+        chemins.append(str(tmp_path / f"partie_{i}.csv"))
+        pd.DataFrame({"Inscrits": morceau}).to_csv(chemins[-1], index=False)
+    bords = np.linspace(0, 100, 6)
+    fusion = fusionner_histogrammes(ajouter(nouvel_histogramme(bords), x[:5000]), ajouter(nouvel_histogramme(bords), x[5000:]))
+    lu = histogramme_csv(chemins, "Inscrits", bords, taille_bloc=1500)
+    assert fusion["comptes"].tolist() == lu["comptes"].tolist() == np.histogram(x[~np.isnan(x)], bins=bords)[0].tolist()
+    assert np.isclose(table_histogramme(lu)["Fréquence"].sum(), 1.0)
+    with pytest.raises(ValueError):
+        fusionner_histogrammes(fusion, nouvel_histogramme(bords, droite=True))
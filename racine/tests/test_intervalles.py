@@ -0,0 +1,32 @@
+#coding:utf8
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats
+
+from intervalles import intervalles_confiance, intervalles_fluctuation, table_intervalles
+
+COMPTES = np.array([[0, 12, 88], [45, 50, 5], [100, 0, 0]])
+
+@pytest.mark.parametrize("methode,reference", [("clopper_pearson", "exact"), ("wilson", "wilson")])
+def test_comme_binomtest(methode, reference):
+    inf, sup = intervalles_confiance(COMPTES, niveau=0.95, methode=methode)
+    for (i, j), x in np.ndenumerate(COMPTES):
+        attendu = scipy.stats.binomtest(int(x), int(COMPTES[i].sum())).proportion_ci(0.95, method=reference)
+        assert np.isclose(inf[i, j], attendu.low, atol=1e-10)
+        assert np.isclose(sup[i, j], attendu.high, atol=1e-10)
+
+def test_wald_formule_du_cours():
+    inf, sup = intervalles_confiance(COMPTES, niveau=0.95)
+    f = COMPTES / COMPTES.sum(axis=1, keepdims=True)
+    marge = scipy.stats.norm.ppf(0.975) * np.sqrt(f * (1 - f) / 100)
+    assert np.allclose(inf, f - marge)
+    assert np.allclose(sup, f + marge)
+
+def test_fluctuation_et_table():
+    inf, sup = intervalles_fluctuation(0.5, 100)
+    assert np.isclose(inf, 0.5 - 1.959964 * 0.05) and np.isclose(sup, 0.5 + 1.959964 * 0.05)
+    table = table_intervalles(pd.DataFrame(COMPTES, columns=["Pour", "Contre", "Sans opinion"]))
+    assert table.shape == (3, 6)
+    assert np.allclose(table[("Contre", "inf")], intervalles_confiance(COMPTES)[0][:, 1])
@@ -0,0 +1,87 @@
+#coding:utf8
+
+import re
+import importlib.util
+
+import pytest
+
+from donnees.pipeline import executer, ordre_topologique
+
+# Script d'étapes écrit dans un fichier : la clé de cache dépend de la source des fonctions
+SCRIPT = '''
+FACTEUR = 2
+
+def doubler(x):
+    return x * FACTEUR
+
+def source():
+    return list(range(5))
+
+def transformer(source):
+    return [doubler(v) for v in source]
+
+def total(transformer, decalage):
+    return sum(transformer) + decalage
+'''
+
+def charger_script(chemin, texte, version):
+    chemin.write_text(texte, encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(f"etapes_test_{version}", chemin)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def etapes(module, decalage=1):
+    return {
+        "source": {"fonction": module.source},
+        "transformer": {"fonction": module.transformer, "entrees": ["source"]},
+        "total": {"fonction": module.total, "entrees": ["transformer"], "parametres": {"decalage": decalage}},
+    }
+
+def en_cache(sortie):
+    return set(re.findall(r"=== (\w+) \(en cache\) ===", sortie))
+
+def test_cache_et_invalidation(tmp_path, capsys, monkeypatch):
+    monkeypatch.delenv("FORCER", raising=False)
+    monkeypatch.delenv("PIPELINE_CACHE", raising=False)
+    chemin, cache = tmp_path / "etapes_test.py", str(tmp_path / "cache")
+    module = charger_script(chemin, SCRIPT, 1)
+    assert executer(etapes(module), dossier_cache=cache)["total"] == 21
+    assert en_cache(capsys.readouterr().out) == set()
+    assert executer(etapes(module), dossier_cache=cache)["total"] == 21
+    assert en_cache(capsys.readouterr().out) == {"source", "transformer", "total"}
+    # paramètre modifié : seule l'étape concernée est recalculée
+    executer(etapes(module, decalage=2), dossier_cache=cache)
+    assert en_cache(capsys.readouterr().out) == {"source", "transformer"}
+    # constante lue par une fonction appelée : l'étape et ses descendantes sont recalculées
+    module = charger_script(chemin, SCRIPT.replace("FACTEUR = 2", "FACTEUR = 3"), 2)
+    assert executer(etapes(module, decalage=2), dossier_cache=cache)["total"] == 32
+    assert en_cache(capsys.readouterr().out) == {"source"}
+    # étape forcée
+    executer(etapes(module, decalage=2), dossier_cache=cache, forcer=["transformer"])
+    assert en_cache(capsys.readouterr().out) == {"source"}
+
+def test_graphe_invalide():
+    with pytest.raises(ValueError, match="inconnues"):
+        ordre_topologique({"a": {"fonction": print, "entrees": ["b"]}})
+    with pytest.raises(ValueError, match="circulaires"):
+        ordre_topologique({"a": {"fonction": print, "entrees": ["b"]}, "b": {"fonction": print, "entrees": ["a"]}})
+
+def test_echec_annule_les_descendantes(tmp_path):
+    module = charger_script(tmp_path / "etapes_echec.py", SCRIPT.replace("list(range(5))", "1 / 0"), 3)
+    with pytest.raises(RuntimeError, match="source"):
+        executer(etapes(module), dossier_cache=str(tmp_path / "cache"), utiliser_cache=False)
+
+# Les entrées de l'étape "a" ne suppriment pas celles de l'étape "a-b" (et inversement)
+def test_cache_des_etapes_prefixees(tmp_path, capsys, monkeypatch):
+    monkeypatch.delenv("FORCER", raising=False)
+    monkeypatch.delenv("PIPELINE_CACHE", raising=False)
+    module = charger_script(tmp_path / "etapes_prefixe.py", SCRIPT, 4)
+    graphe = {"a": {"fonction": module.source}, "a-b": {"fonction": module.source}}
+    cache = str(tmp_path / "cache")
+    executer(graphe, dossier_cache=cache)
+    executer(graphe, dossier_cache=cache, forcer=["a"])
+    sortie = capsys.readouterr().out
+    assert "=== a-b (en cache) ===" in sortie
+    executer(graphe, dossier_cache=cache, forcer=["a-b"])
+    assert "=== a (en cache) ===" in capsys.readouterr().out
@@ -0,0 +1,65 @@
+#coding:utf8
+
+import time
+
+import numpy as np
+import scipy.stats
+
+from rang_taille import QUEUE_MIN, ajuster_rang_taille, clauset, rangs_tailles
+
+# Recherche exhaustive de référence : alpha et distance KS recalculés pour chaque valeur distincte
+def recherche_exhaustive(valeurs):
+    x = np.sort(valeurs)
+    n = len(x)
+    meilleur = (np.inf, None)
+    for i in range(n):
+        if (i and x[i] == x[i - 1]) or n - i < min(QUEUE_MIN, n // 2):
+            continue
+        queue = x[i:]
+        alpha = 1 + len(queue) / np.log(queue / queue[0]).sum()
+        f = 1 - (queue / queue[0]) ** (1 - alpha)
+        m = np.arange(len(queue))
+        ks = max(np.max((m + 1) / len(queue) - f), np.max(f - m / len(queue)))
+        if ks < meilleur[0]:
+            meilleur = (ks, x[i])
+    return meilleur
+
+def test_x_min_exact():
+    for graine in (1, 2):
+        generateur = np.random.default_rng(graine)
+        x = np.concatenate([generateur.lognormal(3, 1, 1500), 50 * (1 + generateur.pareto(1.5, 400))])
+        x = np.concatenate([x, x[:200].round()])
+        ks, x_min = recherche_exhaustive(x)
+        resultat = clauset(x)
+        assert resultat["x_min"] == x_min
+        assert np.isclose(resultat["KS"], ks)
+
+def test_grilles_comme_recherche_exhaustive():
+    generateur = np.random.default_rng(3)
+    x = np.concatenate([generateur.lognormal(3, 1, 10_000), 50 * (1 + generateur.pareto(1.5, 10_000))])
+    assert clauset(x, exhaustif=False) == clauset(x, exhaustif=True)
+
+# Un million de valeurs distinctes : recherche bornée (la recherche exhaustive prendrait des heures)
+def test_echelle_un_million():
+    x = 10 * (1 + np.random.default_rng(4).pareto(1.5, 1_000_000))
+    debut = time.perf_counter()
+    resultat = clauset(x)
+    assert time.perf_counter() - debut < 20
+    assert abs(resultat["alpha"] - 2.5) < 0.02
+    assert resultat["x_min"] < 11
+
+def test_exposant_d_une_loi_de_pareto():
+    x = 10 * (1 + np.random.default_rng(8).pareto(1.0, 20_000))
+    resultat = clauset(x, x_min=10)
+    assert resultat["Effectif"] == len(x)
+    assert abs(resultat["alpha"] - 2.0) < 3 * resultat["erreur_type"]
+
+def test_mco_comme_linregress():
+    x = np.random.default_rng(9).lognormal(5, 2, 500)
+    table = ajuster_rang_taille(x)
+    _, log_rang, log_taille = rangs_tailles(x)
+    reference = scipy.stats.linregress(log_rang, log_taille)
+    assert np.isclose(table.loc["MCO", "Exposant"], -reference.slope)
+    assert np.isclose(table.loc["MCO", "Erreur type"], reference.stderr)
+    assert np.isclose(table.loc["MCO", "R²"], reference.rvalue ** 2)
+    assert (table["IC inf"] < table["Exposant"]).all() and (table["Exposant"] < table["IC sup"]).all()
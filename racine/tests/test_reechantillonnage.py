@@ -0,0 +1,45 @@
+#coding:utf8
+
+import numpy as np
+import scipy.stats
+
+from donnees.reechantillonnage import intervalle_bootstrap, permutation_correlation, permutation_deux_echantillons
+
+def echantillon():
+    return np.random.default_rng(2).gamma(2.0, 10.0, 300)
+
+# Rééchantillons différents de ceux de scipy : bornes égales à une fraction d'erreur type près
+def test_bca_comme_scipy_bootstrap():
+    x = echantillon()
+    table = intervalle_bootstrap(x, "moyenne", niveau=0.95, methode="bca", nb_reechantillons=20_000)
+    reference = scipy.stats.bootstrap((x,), np.mean, confidence_level=0.95, method="BCa", n_resamples=20_000,
+                                      random_state=np.random.default_rng(0))
+    erreur_type = reference.standard_error
+    assert abs(table["Erreur type"].iloc[0] - erreur_type) < 0.05 * erreur_type
+    assert abs(table["Borne inf"].iloc[0] - reference.confidence_interval.low) < 0.1 * erreur_type
+    assert abs(table["Borne sup"].iloc[0] - reference.confidence_interval.high) < 0.1 * erreur_type
+
+def test_resultat_ne_depend_pas_des_processus():
+    x = echantillon()
+    seul = intervalle_bootstrap(x, "mediane", nb_reechantillons=2000, graine=5, taille_lot=300)
+    pool = intervalle_bootstrap(x, "mediane", nb_reechantillons=2000, graine=5, taille_lot=300, workers=2)
+    assert seul.equals(pool)
+
+def test_correlations_de_rangs_comme_scipy():
+    generateur = np.random.default_rng(3)
+    x = generateur.integers(0, 15, 60).astype(np.float64)
+    y = x + generateur.normal(0, 4, 60).round()
+    rho, p_spearman = permutation_correlation(x, y, "spearman", nb_permutations=5000)
+    tau, p_kendall = permutation_correlation(x, y, "kendall", nb_permutations=2000)
+    assert np.isclose(rho, scipy.stats.spearmanr(x, y).statistic)
+    assert np.isclose(tau, scipy.stats.kendalltau(x, y).statistic)
+    # forte corrélation : p-valeur minimale (1 / (1 + permutations))
+    assert p_spearman == 1 / 5001 and p_kendall == 1 / 2001
+
+def test_deux_echantillons_sans_difference():
+    generateur = np.random.default_rng(4)
+    a, b = generateur.normal(0, 1, 80), generateur.normal(0, 1, 90)
+    difference, p = permutation_deux_echantillons(a, b, "moyenne", nb_permutations=4000)
+    assert np.isclose(difference, a.mean() - b.mean())
+    reference = scipy.stats.ttest_ind(a, b).pvalue
+    assert abs(p - reference) < 0.05
@@ -0,0 +1,63 @@
+#coding:utf8
+
+import os
+import multiprocessing
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pytest
+
+import rendu_graphiques
+from rendu_graphiques import rendre_diagrammes
+
+DEPARTEMENTS = np.array(["01", "02", "2A", "971", "75", "13"])
+COLONNES = {
+    "bar": [np.array([400, 120, 90, 300, 1500, 1100]), np.array([300, 100, 60, 150, 1200, 800])],
+    "pie": [np.array([10, 3, 2, 8, 40, 30]), np.array([4, 1, 1, 3, 12, 9]),
+            np.array([286, 96, 57, 139, 1148, 761]), np.array([100, 20, 30, 150, 300, 300])],
+}
+
+def lire_images(dossier):
+    images = {}
+    for nom in sorted(os.listdir(dossier)):
+        with open(os.path.join(dossier, nom), "rb") as fichier:
+            images[nom] = fichier.read()
+    return images
+
+def test_serie_et_pool_identiques(tmp_path):
+    dossiers = {}
+    for workers in (1, 3):
+        dossiers[workers] = tmp_path / f"workers_{workers}"
+        dossiers[workers].mkdir()
+        for type_diagramme, colonnes in COLONNES.items():
+            nb, _ = rendre_diagrammes(type_diagramme, DEPARTEMENTS, colonnes, str(dossiers[workers]), workers=workers)
+            assert nb == len(DEPARTEMENTS)
+    serie, pool = lire_images(dossiers[1]), lire_images(dossiers[3])
+    assert len(serie) == 2 * len(DEPARTEMENTS)
+    assert serie == pool
+
+# Sans fork (Windows, macOS), rendu en série dans le processus principal, mêmes images
+def test_sans_fork_rendu_en_serie(tmp_path, monkeypatch):
+    reference, serie = tmp_path / "reference", tmp_path / "serie"
+    reference.mkdir()
+    serie.mkdir()
+    rendre_diagrammes("bar", DEPARTEMENTS, COLONNES["bar"], str(reference), workers=1)
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    monkeypatch.setattr(multiprocessing, "get_context", lambda methode=None: pytest.fail("pool créé sans fork"))
+    nb, _ = rendre_diagrammes("bar", DEPARTEMENTS, COLONNES["bar"], str(serie), workers=3)
+    assert nb == len(DEPARTEMENTS)
+    assert lire_images(reference) == lire_images(serie)
+
+# La figure réutilisée ne garde rien du diagramme précédent (axes, marges modifiées par tight_layout)
+def test_figure_reutilisee_sans_etat(tmp_path):
+    for premier, second in (("bar", "pie"), ("pie", "bar")):
+        neuve, reutilisee = tmp_path / f"neuve_{second}", tmp_path / f"reutilisee_{second}"
+        neuve.mkdir()
+        reutilisee.mkdir()
+        rendu_graphiques._FIGURE = None
+        rendre_diagrammes(second, DEPARTEMENTS[-1:], [c[-1:] for c in COLONNES[second]], str(neuve), workers=1)
+        rendre_diagrammes(premier, DEPARTEMENTS, COLONNES[premier], str(reutilisee), workers=1)
+        rendre_diagrammes(second, DEPARTEMENTS, COLONNES[second], str(reutilisee), workers=1)
+        nom = f"{second}_{DEPARTEMENTS[-1]}.png"
+        assert lire_images(neuve)[nom] == lire_images(reutilisee)[nom], nom
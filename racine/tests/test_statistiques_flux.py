@@ -0,0 +1,57 @@
+#coding:utf8
+
+import numpy as np
+import pandas as pd
+
+from statistiques_flux import (PRECISION, accumuler_csv, ajouter_bloc, ajouter_compteurs, fusionner, fusionner_compteurs,
+                               mode_compteurs, nouveaux_compteurs, nouvel_accumulateur, parametres_statistiques)
+
+def tableau():
+    generateur = np.random.default_rng(1)
+    return pd.DataFrame({
+        "Inscrits": generateur.lognormal(8, 1, 5000),
+        "Blancs": generateur.integers(0, 20, 5000).astype(np.float64),
+    })
+
+def test_moments_exacts_et_quantiles_a_la_precision_pres():
+    donnees = tableau()
+    accu = nouvel_accumulateur(list(donnees.columns))
+    for debut in range(0, len(donnees), 700):
+        ajouter_bloc(accu, donnees.iloc[debut:debut + 700])
+    parametres = parametres_statistiques(accu)
+    for colonne in donnees.columns:
+        valeurs = donnees[colonne]
+        assert np.isclose(parametres.loc[colonne, "Moyenne"], round(valeurs.mean(), 2))
+        assert np.isclose(parametres.loc[colonne, "Écart type"], round(valeurs.std(ddof=0), 2))
+        assert np.isclose(parametres.loc[colonne, "Étendue"], round(valeurs.max() - valeurs.min(), 2))
+        assert abs(parametres.loc[colonne, "Médiane"] - valeurs.median()) <= PRECISION * valeurs.median() + 0.01
+    # peu de valeurs distinctes : mode exact
+    assert parametres.loc["Blancs", "Mode"] == donnees["Blancs"].mode().iloc[0]
+
+def test_fusion_independante_du_decoupage(tmp_path):
+    donnees = tableau()
+    chemin = tmp_path / "valeurs.csv"
+    donnees.to_csv(chemin, index=False)
+    colonnes = list(donnees.columns)
+    un_bloc = parametres_statistiques(accumuler_csv(chemin, colonnes, taille_bloc=len(donnees)))
+    moities = [ajouter_bloc(nouvel_accumulateur(colonnes), morceau) for morceau in (donnees.iloc[:1234], donnees.iloc[1234:])]
+    fusion = parametres_statistiques(fusionner(*moities))
+    pd.testing.assert_frame_equal(un_bloc, fusion)
+
+# Garanties de Misra-Gries après fusion de blocs : au plus k compteurs, fréquences sous-estimées
+# d'au plus n / (k + 1), toute valeur plus fréquente que n / (k + 1) conservée
+def test_compteurs_misra_gries():
+    x = np.round(np.random.default_rng(2).lognormal(3, 1, 20_000))
+    k = 20
+    blocs = [ajouter_compteurs(nouveaux_compteurs(), morceau, k) for morceau in np.array_split(x, 7)]
+    compteurs = blocs[0]
+    for bloc in blocs[1:]:
+        compteurs = fusionner_compteurs(compteurs, bloc, k)
+    valeurs, frequences = np.unique(x, return_counts=True)
+    reelles = dict(zip(valeurs.tolist(), frequences.tolist()))
+    estimees = dict(zip(compteurs["valeurs"].tolist(), compteurs["comptes"].tolist()))
+    assert len(estimees) <= k
+    for v, c in estimees.items():
+        assert reelles[v] - len(x) / (k + 1) <= c <= reelles[v]
+    assert {v for v, c in reelles.items() if c > len(x) / (k + 1)} <= set(estimees)
+    assert mode_compteurs(compteurs) == valeurs[np.argmax(frequences)]
@@ -0,0 +1,49 @@
+#coding:utf8
+
+import numpy as np
+import pandas as pd
+
+from statistiques_groupes import parametres_par_groupe
+
+def donnees_groupes():
+    generateur = np.random.default_rng(0)
+    n = 2000
+    donnees = pd.DataFrame({
+        "Région": generateur.choice(["Nord", "Sud", "Est", "Ouest"], n),
+        "Département": generateur.choice(["01", "02", "03"], n),
+        "Inscrits": generateur.integers(0, 50, n).astype(np.float64),
+        "Votants": generateur.normal(100, 20, n),
+    })
+    donnees.loc[generateur.choice(n, 50, replace=False), "Votants"] = np.nan
+    return donnees
+
+# Référence : paramètres calculés groupe par groupe avec pandas
+def reference(groupe):
+    valeurs = groupe.dropna()
+    return {
+        "Effectif": len(valeurs),
+        "Moyenne": valeurs.mean(),
+        "Médiane": valeurs.median(),
+        "Mode": valeurs.mode().iloc[0],
+        "Écart type": valeurs.std(ddof=0),
+        "Écart absolu moyen": (valeurs - valeurs.mean()).abs().mean(),
+        "Étendue": valeurs.max() - valeurs.min(),
+        "IQR": valeurs.quantile(0.75) - valeurs.quantile(0.25),
+        "IDR": valeurs.quantile(0.90) - valeurs.quantile(0.10),
+    }
+
+def test_parametres_comme_groupby_pandas():
+    donnees = donnees_groupes()
+    table = parametres_par_groupe(donnees, ["Région", "Département"], ["Inscrits", "Votants"], arrondi=None)
+    assert len(table) == 4 * 3 * 2
+    for (region, departement, variable), ligne in table.set_index(["Région", "Département", "Variable"]).iterrows():
+        groupe = donnees.loc[(donnees["Région"] == region) & (donnees["Département"] == departement), variable]
+        attendu = reference(groupe)
+        for parametre, valeur in attendu.items():
+            assert np.isclose(ligne[parametre], valeur), (region, departement, variable, parametre)
+
+def test_ordre_groupes_puis_variables():
+    donnees = donnees_groupes()
+    table = parametres_par_groupe(donnees, "Région", ["Votants", "Inscrits"])
+    assert table["Région"].tolist() == sorted(["Est", "Nord", "Ouest", "Sud"] * 2)
+    assert table["Variable"].tolist() == ["Votants", "Inscrits"] * 4